@@ -0,0 +1,195 @@
+# IPP project 2
+# @brief Implementation of static analysis of program
+# @author Jakub Kratochvil (xkrato67)
+# @file analysis.py
+
+import check_xml
+
+# Type written to the first argument (variable) by instruction, None when it is known only at runtime
+# @note MOVE writes type of its source and DEFVAR only declares, both are resolved by analysis
+RESULT_TYPES = {
+    "ADD":      "int",
+    "SUB":      "int",
+    "MUL":      "int",
+    "IDIV":     "int",
+    "STRLEN":   "int",
+    "STRI2INT": "int",
+    "LT":       "bool",
+    "GT":       "bool",
+    "EQ":       "bool",
+    "AND":      "bool",
+    "OR":       "bool",
+    "NOT":      "bool",
+    "CONCAT":   "string",
+    "GETCHAR":  "string",
+    "SETCHAR":  "string",
+    "INT2CHAR": "string",
+    "TYPE":     "string",
+    "READ":     None,
+    "POPS":     None,
+}
+
+# Instructions which always continue at their target
+JUMPS = ("JUMP", "CALL")
+# Instructions which continue at their target or at the next instruction
+BRANCHES = ("JUMPIFEQ", "JUMPIFNEQ", "JUMPIFEQS", "JUMPIFNEQS")
+# Instructions after which the next instruction is not executed directly
+# @note Instruction after CALL is reached by RETURN
+TERMINATORS = ("JUMP", "CALL", "RETURN", "EXIT")
+
+# Control flow graph of program, instructions are split to basic blocks
+class ControlFlowGraph:
+    # ControlFlowGraph constructor
+    # @param instructions Sorted and linked instructions
+    def __init__(self, instructions):
+        self.instructions : list = instructions
+        # Every RETURN can continue after any CALL
+        self._return_sites : list = [address + 1 for address, instr in enumerate(instructions)
+                                     if instr.get_opcode() == "CALL" and address + 1 < len(instructions)]
+        leaders = {0}
+        for address, instr in enumerate(instructions):
+            opcode = instr.get_opcode()
+            if opcode in JUMPS or opcode in BRANCHES:
+                leaders.add(instr.get_target())
+            if opcode in TERMINATORS or opcode in BRANCHES:
+                leaders.add(address + 1)
+        leaders = sorted(leader for leader in leaders if leader < len(instructions))
+        # Maps start of every block to its end (exclusive)
+        self.blocks : dict = dict(zip(leaders, leaders[1:] + [len(instructions)]))
+
+    # Get addresses of blocks which may be executed after block
+    # @param start Start of block
+    # @return List of start addresses of successor blocks
+    def successors(self, start):
+        end = self.blocks[start]
+        last = self.instructions[end - 1]
+        opcode = last.get_opcode()
+        if opcode in JUMPS:
+            addresses = [last.get_target()]
+        elif opcode == "RETURN":
+            addresses = self._return_sites
+        elif opcode == "EXIT":
+            addresses = []
+        elif opcode in BRANCHES:
+            addresses = [last.get_target(), end]
+        else:
+            addresses = [end]
+        # Jump to label at the end of program or the last instruction ends the program
+        return [address for address in addresses if address < len(self.instructions)]
+
+    # Get blocks which can be executed, program starts at the first instruction
+    # @return Set of start addresses of reachable blocks
+    def reachable(self):
+        if not self.blocks:
+            return set()
+        reached = {0}
+        worklist = [0]
+        while worklist:
+            for successor in self.successors(worklist.pop()):
+                if successor not in reached:
+                    reached.add(successor)
+                    worklist.append(successor)
+        return reached
+
+# States of global variable in addition to its type, every type also means the variable is defined
+# @note Missing state means nothing is known (variable may not be declared)
+DECLARED = "declared"
+DEFINED  = "defined"
+
+# Checks if argument is global variable, only global variables are tracked by analysis
+# @param arg Argument object
+# @return True if argument is global variable
+def is_global(arg):
+    return arg.get_type() == "var" and arg.get_frame_type() == "GF"
+
+# Joins states of variable from two paths
+# @param state1 State of variable (type, DEFINED or DECLARED)
+# @param state2 State of variable (type, DEFINED or DECLARED)
+# @return State which is true on both paths, None if nothing is known
+def join_states(state1, state2):
+    if state1 is None or state2 is None:
+        return None
+    if state1 == state2:
+        return state1
+    if state1 == DECLARED or state2 == DECLARED:
+        return DECLARED
+    return DEFINED
+
+# Updates states of global variables by one instruction
+# @param instr Instruction object
+# @param states States of global variables by their slot, updated in place
+# @note When instruction fails, program ends, so after it every variable it read is declared
+#       and defined and the result always has the written type
+def transfer_states(instr, states):
+    opcode = instr.get_opcode()
+    signature = check_xml.OPCODE_SIGNATURES[opcode]
+    for arg, operand in zip(instr.args, signature):
+        if operand == "symb" and is_global(arg):
+            slot = arg.get_slot()
+            # TYPE only needs its symbol to be declared
+            if opcode == "TYPE":
+                states.setdefault(slot, DECLARED)
+            elif states.get(slot) in (None, DECLARED):
+                states[slot] = DEFINED
+    if opcode == "MOVE":
+        dest = instr.get_arg(0)
+        source = instr.get_arg(1)
+        if not is_global(dest):
+            return
+        if source.get_type() != "var":
+            states[dest.get_slot()] = source.get_type()
+        elif is_global(source):
+            states[dest.get_slot()] = states[source.get_slot()]
+        else:
+            states[dest.get_slot()] = DEFINED
+    elif opcode == "DEFVAR":
+        dest = instr.get_arg(0)
+        if is_global(dest):
+            states[dest.get_slot()] = DECLARED
+    elif opcode in RESULT_TYPES:
+        dest = instr.get_arg(0)
+        if is_global(dest):
+            states[dest.get_slot()] = RESULT_TYPES[opcode] or DEFINED
+
+# Infers states of global variables (declared, defined or type) which are the same on every path to instruction
+# @param instructions Sorted and linked instructions
+# @return Dictionary of instructions and tuples with known state of every argument
+#         (None when nothing is known), only instructions using known global variable are included
+def analyze_variables(instructions):
+    if not instructions:
+        return {}
+    cfg = ControlFlowGraph(instructions)
+    # Known states at start of every reached block, missing state is not known
+    entry = {0: {}}
+    worklist = [0]
+    while worklist:
+        start = worklist.pop()
+        states = dict(entry[start])
+        for address in range(start, cfg.blocks[start]):
+            transfer_states(instructions[address], states)
+        for successor in cfg.successors(start):
+            if successor not in entry:
+                entry[successor] = dict(states)
+                worklist.append(successor)
+                continue
+            # Only states which are true on both paths are kept
+            known = entry[successor]
+            merged = {}
+            for slot, state in known.items():
+                state = join_states(state, states.get(slot))
+                if state is not None:
+                    merged[slot] = state
+            if merged != known:
+                entry[successor] = merged
+                worklist.append(successor)
+
+    known_states = {}
+    for start, states in entry.items():
+        states = dict(states)
+        for address in range(start, cfg.blocks[start]):
+            instr = instructions[address]
+            arg_states = tuple(states.get(arg.get_slot()) if is_global(arg) else None for arg in instr.args)
+            if any(arg_states):
+                known_states[instr] = arg_states
+            transfer_states(instr, states)
+    return known_states
@@ -0,0 +1,328 @@
+# IPP project 2
+# @brief Benchmarks of stack-form against variable-form code, of recursive calls and of loading
+# @author Jakub Kratochvil (xkrato67)
+# @file benchmark.py
+
+import argparse, os, random, subprocess, sys, tempfile, time, tracemalloc
+import xml.etree.ElementTree as ET
+
+import check_xml, interpret
+
+# Loop computing sum of (i * 3 - 1) / 2 for i from 0 to count, written with stack instructions
+# @note Instructions are tuples of opcode and arguments (type, value)
+STACK_FORM = [
+    ("DEFVAR", ("var", "GF@i")),
+    ("DEFVAR", ("var", "GF@sum")),
+    ("MOVE", ("var", "GF@i"), ("int", "0")),
+    ("MOVE", ("var", "GF@sum"), ("int", "0")),
+    ("LABEL", ("label", "loop")),
+    ("PUSHS", ("var", "GF@sum")),
+    ("PUSHS", ("var", "GF@i")),
+    ("PUSHS", ("int", "3")),
+    ("MULS",),
+    ("PUSHS", ("int", "1")),
+    ("SUBS",),
+    ("PUSHS", ("int", "2")),
+    ("IDIVS",),
+    ("ADDS",),
+    ("POPS", ("var", "GF@sum")),
+    ("PUSHS", ("var", "GF@i")),
+    ("PUSHS", ("int", "1")),
+    ("ADDS",),
+    ("POPS", ("var", "GF@i")),
+    ("PUSHS", ("var", "GF@i")),
+    ("PUSHS", ("int", "{count}")),
+    ("JUMPIFNEQS", ("label", "loop")),
+    ("WRITE", ("var", "GF@sum")),
+]
+
+# The same loop written with variables only, operands of stack instructions go through POPS and PUSHS
+VARIABLE_FORM = [
+    ("DEFVAR", ("var", "GF@i")),
+    ("DEFVAR", ("var", "GF@sum")),
+    ("DEFVAR", ("var", "GF@a")),
+    ("DEFVAR", ("var", "GF@b")),
+    ("MOVE", ("var", "GF@i"), ("int", "0")),
+    ("MOVE", ("var", "GF@sum"), ("int", "0")),
+    ("LABEL", ("label", "loop")),
+    ("PUSHS", ("var", "GF@sum")),
+    ("PUSHS", ("var", "GF@i")),
+    ("PUSHS", ("int", "3")),
+    ("POPS", ("var", "GF@b")),
+    ("POPS", ("var", "GF@a")),
+    ("MUL", ("var", "GF@a"), ("var", "GF@a"), ("var", "GF@b")),
+    ("PUSHS", ("var", "GF@a")),
+    ("PUSHS", ("int", "1")),
+    ("POPS", ("var", "GF@b")),
+    ("POPS", ("var", "GF@a")),
+    ("SUB", ("var", "GF@a"), ("var", "GF@a"), ("var", "GF@b")),
+    ("PUSHS", ("var", "GF@a")),
+    ("PUSHS", ("int", "2")),
+    ("POPS", ("var", "GF@b")),
+    ("POPS", ("var", "GF@a")),
+    ("IDIV", ("var", "GF@a"), ("var", "GF@a"), ("var", "GF@b")),
+    ("PUSHS", ("var", "GF@a")),
+    ("POPS", ("var", "GF@b")),
+    ("POPS", ("var", "GF@a")),
+    ("ADD", ("var", "GF@a"), ("var", "GF@a"), ("var", "GF@b")),
+    ("PUSHS", ("var", "GF@a")),
+    ("POPS", ("var", "GF@sum")),
+    ("ADD", ("var", "GF@i"), ("var", "GF@i"), ("int", "1")),
+    ("JUMPIFNEQ", ("label", "loop"), ("var", "GF@i"), ("int", "{count}")),
+    ("WRITE", ("var", "GF@sum")),
+]
+
+# Recursive fibonacci, every call creates frame with its variables, argument and result go through data stack
+FIBONACCI = [
+    ("DEFVAR", ("var", "GF@result")),
+    ("PUSHS", ("int", "{count}")),
+    ("CALL", ("label", "fib")),
+    ("POPS", ("var", "GF@result")),
+    ("WRITE", ("var", "GF@result")),
+    ("EXIT", ("int", "0")),
+    ("LABEL", ("label", "fib")),
+    ("CREATEFRAME",),
+    ("DEFVAR", ("var", "TF@n")),
+    ("DEFVAR", ("var", "TF@a")),
+    ("DEFVAR", ("var", "TF@b")),
+    ("POPS", ("var", "TF@n")),
+    ("PUSHFRAME",),
+    ("JUMPIFEQ", ("label", "base"), ("var", "LF@n"), ("int", "0")),
+    ("JUMPIFEQ", ("label", "base"), ("var", "LF@n"), ("int", "1")),
+    ("SUB", ("var", "LF@a"), ("var", "LF@n"), ("int", "1")),
+    ("PUSHS", ("var", "LF@a")),
+    ("CALL", ("label", "fib")),
+    ("POPS", ("var", "LF@a")),
+    ("SUB", ("var", "LF@b"), ("var", "LF@n"), ("int", "2")),
+    ("PUSHS", ("var", "LF@b")),
+    ("CALL", ("label", "fib")),
+    ("POPS", ("var", "LF@b")),
+    ("ADD", ("var", "LF@a"), ("var", "LF@a"), ("var", "LF@b")),
+    ("PUSHS", ("var", "LF@a")),
+    ("POPFRAME",),
+    ("RETURN",),
+    ("LABEL", ("label", "base")),
+    ("PUSHS", ("var", "LF@n")),
+    ("POPFRAME",),
+    ("RETURN",),
+]
+
+# Instructions of large generated programs, {index} is replaced by position of instruction
+MIXED = [
+    ("DEFVAR", ("var", "GF@v{index}")),
+    ("MOVE", ("var", "GF@v{index}"), ("int", "{index}")),
+    ("ADD", ("var", "LF@a"), ("var", "GF@v{index}"), ("int", "0x1F")),
+    ("CONCAT", ("var", "TF@s"), ("var", "TF@s"), ("string", "ab\\032c")),
+    ("JUMPIFEQ", ("label", "end"), ("var", "GF@v{index}"), ("bool", "true")),
+    ("PUSHS", ("nil", "nil")),
+    ("READ", ("var", "LF@x"), ("type", "string")),
+    ("WRITE", ("string", "value\\010")),
+    ("CREATEFRAME",),
+]
+
+# Loop writing string literal with escape sequences twice in every iteration,
+# {literal} is replaced after the source is generated
+ESCAPES = [
+    ("DEFVAR", ("var", "GF@i")),
+    ("DEFVAR", ("var", "GF@s")),
+    ("MOVE", ("var", "GF@i"), ("int", "0")),
+    ("LABEL", ("label", "loop")),
+    ("MOVE", ("var", "GF@s"), ("string", "{{literal}}")),
+    ("WRITE", ("var", "GF@s")),
+    ("WRITE", ("var", "GF@s")),
+    ("ADD", ("var", "GF@i"), ("var", "GF@i"), ("int", "1")),
+    ("JUMPIFNEQ", ("label", "loop"), ("var", "GF@i"), ("int", "{count}")),
+]
+
+# Generates XML source of program
+# @param instructions Instructions of program (see STACK_FORM)
+# @param count Number of iterations of the loop
+# @param orders Order attributes of instructions, by default they follow document order
+# @return XML source
+def gen_source(instructions, count, orders=None):
+    root = ET.Element("program", language="IPPcode23")
+    for order, (opcode, *args) in zip(orders or range(1, len(instructions) + 1), instructions):
+        instr = ET.SubElement(root, "instruction", order=str(order), opcode=opcode)
+        for index, (type, value) in enumerate(args, 1):
+            ET.SubElement(instr, "arg" + str(index), type=type).text = value.format(count=count)
+    return ET.tostring(root, encoding="unicode")
+
+# Generates instructions of large program, it is only loaded, never run
+# @param count Number of instructions
+# @return Instructions (see STACK_FORM)
+def gen_mixed(count):
+    instructions = []
+    for index in range(count):
+        opcode, *args = MIXED[index % len(MIXED)]
+        instructions.append((opcode, *((type, value.replace("{index}", str(index))) for type, value in args)))
+    return instructions
+
+# Runs program by interpreter and measures its time
+# @param path Path to XML source
+# @param options Options of interpreter
+# @return Tuple of time in seconds, output of program and its statistics (see Program.print_stats)
+def measure(path, options):
+    interpret = os.path.join(os.path.dirname(os.path.abspath(__file__)), "interpret.py")
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, interpret, "--source", path, "--stats", *options],
+                            stdin=subprocess.DEVNULL, capture_output=True)
+    seconds = time.perf_counter() - start
+    if result.returncode != 0:
+        print(result.stderr.decode(), file=sys.stderr, end="")
+        exit(1)
+    stats = dict(line.rsplit(": ", 1) for line in result.stderr.decode().splitlines())
+    return (seconds, result.stdout, stats)
+
+# Compares stack-form and variable-form code
+# @param directory Directory for generated sources
+# @param count Number of iterations of the loop
+# @param engines Measured engines
+def bench_stack(directory, count, engines):
+    paths = {}
+    for name, instructions in (("stack", STACK_FORM), ("variable", VARIABLE_FORM)):
+        paths[name] = os.path.join(directory, name + ".xml")
+        with open(paths[name], "w") as source_file:
+            source_file.write(gen_source(instructions, count))
+    for engine in engines:
+        outputs = set()
+        for name, path in paths.items():
+            seconds, output, _ = measure(path, ["--engine", engine])
+            outputs.add(output)
+            print(f"{engine:10} {name:10} {seconds:8.3f} s")
+        if len(outputs) != 1:
+            print("ERROR: Outputs of both forms differ", file=sys.stderr)
+            exit(1)
+
+# Measures calls per second and garbage collector runs of recursive fibonacci
+# @param directory Directory for generated sources
+# @param count Argument of fibonacci
+# @param engines Measured engines
+def bench_recursion(directory, count, engines):
+    path = os.path.join(directory, "fibonacci.xml")
+    with open(path, "w") as source_file:
+        source_file.write(gen_source(FIBONACCI, count))
+    # fib(n) is called fib(n+1) * 2 - 1 times
+    fib = [0, 1]
+    while len(fib) < count + 2:
+        fib.append(fib[-1] + fib[-2])
+    calls = fib[count + 1] * 2 - 1
+    for engine in engines:
+        seconds, _, stats = measure(path, ["--engine", engine])
+        print(f"{engine:10} {calls / seconds:12.0f} calls/s  {stats.get('garbage collections', '?'):>6} collections"
+              f"  {stats.get('allocated frames', '0'):>4} frames")
+
+# Measures stages of loading program whose instructions have shuffled order attributes
+# @param directory Directory for generated sources
+# @param count Number of instructions
+def bench_load(directory, count):
+    orders = list(range(1, count + 1))
+    random.Random(0).shuffle(orders)
+    path = os.path.join(directory, "shuffled.xml")
+    with open(path, "w") as source_file:
+        source_file.write(gen_source(gen_mixed(count), 0, orders))
+    start = time.perf_counter()
+    program = interpret.load_program(path)
+    loaded = time.perf_counter()
+    interpret.sort_by_order(program)
+    ordered = time.perf_counter()
+    print(f"parse, check and generate {loaded - start:8.3f} s")
+    print(f"order                     {ordered - loaded:8.3f} s")
+    print(f"total                     {ordered - start:8.3f} s")
+
+# Measures throughput of XML checker on mixed program
+# @param count Number of instructions
+def bench_validate(count):
+    root = ET.fromstring(gen_source(gen_mixed(count), 0))
+    start = time.perf_counter()
+    check_xml.check_root(root)
+    for instr in root:
+        check_xml.check_instr(instr)
+    seconds = time.perf_counter() - start
+    print(f"validation {count / seconds:12.0f} instructions/s")
+
+# Number of variables in every frame measured by bench_memory
+FRAME_SIZE = 1000
+
+# Measures memory of loaded instructions and of variables in frames by tracemalloc
+# @param directory Directory for generated sources
+# @param count Number of instructions, the same number of variables is created in frames
+def bench_memory(directory, count):
+    path = os.path.join(directory, "mixed.xml")
+    with open(path, "w") as source_file:
+        source_file.write(gen_source(gen_mixed(count), 0))
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    program = interpret.load_program(path)
+    loaded, peak = tracemalloc.get_traced_memory()
+    print(f"per instruction (with its arguments) {(loaded - start) / count:8.0f} B")
+    print(f"peak while loading                   {(peak - start) / 2**20:8.0f} MB")
+
+    frames = []
+    start = tracemalloc.get_traced_memory()[0]
+    for _ in range(max(1, count // FRAME_SIZE)):
+        frame = interpret.Program.Frame(interpret.TypeFrame.LOCAL, ("v",) * FRAME_SIZE)
+        for slot in range(FRAME_SIZE):
+            frame.add_var(slot, "int")
+            frame.get_var(slot).set_value(slot)
+        frames.append(frame)
+    variables = tracemalloc.get_traced_memory()[0]
+    print(f"per variable                         {(variables - start) / (len(frames) * FRAME_SIZE):8.0f} B")
+    tracemalloc.stop()
+
+# Generates string literal with escape sequences, decoded text contains backslashes too
+# @param count Number of escape sequences
+# @return String literal as in XML source
+def gen_escapes(count):
+    return "".join(f"x\\{32 + index % 95:03d}" for index in range(count))
+
+# Measures decoder of escape sequences and a loop using string literal with them
+# @param directory Directory for generated sources
+# @param engines Measured engines
+def bench_escapes(directory, engines):
+    for count in (1000, 5000, 20000):
+        literal = gen_escapes(count)
+        seconds = []
+        for _ in range(3):
+            start = time.perf_counter()
+            interpret.replace_escaped_chars(literal)
+            seconds.append(time.perf_counter() - start)
+        print(f"decoder    {count:6} escapes {min(seconds) * 1000:8.2f} ms")
+    path = os.path.join(directory, "escapes.xml")
+    with open(path, "w") as source_file:
+        source_file.write(gen_source(ESCAPES, 200).replace("{literal}", gen_escapes(4000)))
+    for engine in engines:
+        seconds, _, _ = measure(path, ["--engine", engine])
+        print(f"{engine:10} loop           {seconds:8.3f} s")
+
+# Main function
+if __name__ == "__main__":
+    args = argparse.ArgumentParser(description="Benchmarks of interpreter")
+    args.add_argument("-n", "--count", type=int, default=100000, help="number of iterations of the loop")
+    args.add_argument("-r", "--recursion", type=int, metavar="N",
+                      help="measure recursive fibonacci of N instead of the loop")
+    args.add_argument("-l", "--load", type=int, metavar="N",
+                      help="measure loading of N instructions with shuffled order instead of the loop")
+    args.add_argument("-c", "--check", type=int, metavar="N",
+                      help="measure validation of N instructions instead of the loop")
+    args.add_argument("-m", "--memory", type=int, metavar="N",
+                      help="measure memory of N instructions and N variables instead of the loop")
+    args.add_argument("-x", "--escapes", action="store_true",
+                      help="measure decoding of escape sequences instead of the loop")
+    args.add_argument("-e", "--engine", action="append", choices=["class", "closure", "transpile"],
+                      help="measured engine, can be given more times (default all)")
+    args = args.parse_args()
+
+    engines = args.engine or ["class", "closure", "transpile"]
+    with tempfile.TemporaryDirectory() as directory:
+        if args.recursion is not None:
+            bench_recursion(directory, args.recursion, engines)
+        elif args.load is not None:
+            bench_load(directory, args.load)
+        elif args.check is not None:
+            bench_validate(args.check)
+        elif args.memory is not None:
+            bench_memory(directory, args.memory)
+        elif args.escapes:
+            bench_escapes(directory, engines)
+        else:
+            bench_stack(directory, args.count, engines)
@@ -3,241 +3,162 @@
 # @author Jakub Kratochvil (xkrato67)
 # @file check_xml.py
 
-import sys, re
+import re
+
+# Operands of every instruction, checker is driven only by this table
+OPCODE_SIGNATURES = {
+    "MOVE":        ("var", "symb"),
+    "NOT":         ("var", "symb"),
+    "INT2CHAR":    ("var", "symb"),
+    "STRLEN":      ("var", "symb"),
+    "TYPE":        ("var", "symb"),
+    "CREATEFRAME": (),
+    "PUSHFRAME":   (),
+    "POPFRAME":    (),
+    "RETURN":      (),
+    "BREAK":       (),
+    "DEFVAR":      ("var",),
+    "POPS":        ("var",),
+    "CALL":        ("label",),
+    "LABEL":       ("label",),
+    "JUMP":        ("label",),
+    "PUSHS":       ("symb",),
+    "WRITE":       ("symb",),
+    "EXIT":        ("symb",),
+    "DPRINT":      ("symb",),
+    "ADD":         ("var", "symb", "symb"),
+    "SUB":         ("var", "symb", "symb"),
+    "MUL":         ("var", "symb", "symb"),
+    "IDIV":        ("var", "symb", "symb"),
+    "LT":          ("var", "symb", "symb"),
+    "GT":          ("var", "symb", "symb"),
+    "EQ":          ("var", "symb", "symb"),
+    "AND":         ("var", "symb", "symb"),
+    "OR":          ("var", "symb", "symb"),
+    "STRI2INT":    ("var", "symb", "symb"),
+    "CONCAT":      ("var", "symb", "symb"),
+    "GETCHAR":     ("var", "symb", "symb"),
+    "SETCHAR":     ("var", "symb", "symb"),
+    "READ":        ("var", "type"),
+    "JUMPIFEQ":    ("label", "symb", "symb"),
+    "JUMPIFNEQ":   ("label", "symb", "symb"),
+    # STACK extension, operands are taken from data stack
+    "CLEARS":      (),
+    "ADDS":        (),
+    "SUBS":        (),
+    "MULS":        (),
+    "IDIVS":       (),
+    "LTS":         (),
+    "GTS":         (),
+    "EQS":         (),
+    "ANDS":        (),
+    "ORS":         (),
+    "NOTS":        (),
+    "INT2CHARS":   (),
+    "STRI2INTS":   (),
+    "JUMPIFEQS":   ("label",),
+    "JUMPIFNEQS":  ("label",),
+}
+
+# Argument types (type attribute) allowed for every kind of operand
+OPERAND_TYPES = {
+    "var":   ("var",),
+    "symb":  ("var", "int", "string", "bool", "nil"),
+    "label": ("label",),
+    "type":  ("type",),
+}
+
+# Position of argument element by its tag
+ARG_TAGS = {"arg1": 0, "arg2": 1, "arg3": 2}
+
+ORDER_RE = re.compile(r"[1-9][0-9]*")
+IDENTIFIER = r"[a-zA-Z_\-$&%*!?][a-zA-Z0-9_\-$&%*!?]*"
+
+# Regex and error message for value of every argument type
+VALUE_CHECKS = {
+    "var":    (re.compile(r"(GF|LF|TF)@" + IDENTIFIER), "Invalid variable value"),
+    "int":    (re.compile(r"[+-]?(0[xX][\da-fA-F]+(_[\da-fA-F]+)*"   # hexadecimal
+                          r"|0[oO]?[0-7]+(_[0-7]+)*"                  # octal with prefix
+                          r"|0+[0-7]*(_[0-7]+)*"                      # octal with leading zeros
+                          r"|[1-9]\d*(_\d+)*)"),                      # decimal
+               "Invalid integer value"),
+    "string": (re.compile(r"(\\[0-9]{3}|[^\\#\s])*"), "Invalid string value"),
+    "bool":   (re.compile(r"true|false"), "Invalid boolean value"),
+    "nil":    (re.compile(r"nil"), "Invalid nil value"),
+    "label":  (re.compile(IDENTIFIER), "Invalid label value"),
+    "type":   (re.compile(r"int|string|bool"), "Invalid type value"),
+}
+
+# Error in structure of well-formed XML, raised by checks, so caller decides when it's reported
+class StructureError(Exception):
+    pass
 
 # Checks if XML is valid
 # @param xml_root XML root element
 def check_xml(xml_root):
-    # check root element
-    if xml_root.tag != "program":
-        print("ERROR: Root element is not program", file=sys.stderr)
-        exit(32)
-    
-    if "language" not in xml_root.attrib or xml_root.attrib["language"] != "IPPcode23":
-        print("ERROR: Missing or invalid attribute (language)", file=sys.stderr)
-        exit(32)
-
+    check_root(xml_root)
     for instr in xml_root:
         check_instr(instr)
 
+# Checks if XML root element is valid
+# @param xml_root XML root element
+# @note Only tag and attributes are checked, so it can be used before children are parsed
+def check_root(xml_root):
+    if xml_root.tag != "program":
+        raise StructureError("Root element is not program")
+
+    if "language" not in xml_root.attrib or xml_root.attrib["language"] != "IPPcode23":
+        raise StructureError("Missing or invalid attribute (language)")
+
 # Checks if XML instruction is valid
 # @param instr XML instruction element
+# @return List of argument elements ordered by their position
 def check_instr(instr):
     if instr.tag != "instruction":
-        print("ERROR: Element is not instruction", file=sys.stderr)
-        exit(32)
-    if "order" not in instr.attrib or re.match(r"^[1-9][0-9]*$", instr.attrib["order"]) is None:
-        print("ERROR: Missing or invalid attribute (order)", file=sys.stderr)
-        exit(32)
+        raise StructureError("Element is not instruction")
+    if "order" not in instr.attrib or ORDER_RE.fullmatch(instr.attrib["order"]) is None:
+        raise StructureError("Missing or invalid attribute (order)")
 
     if "opcode" not in instr.attrib:
-        print("ERROR: Missing attribute (opcode)", file=sys.stderr)
-        exit(32)
-
-    match instr.attrib["opcode"].upper():
-        case "MOVE"|"NOT"|"INT2CHAR"|"STRLEN"|"TYPE":
-            check_var_symb(instr)
-        case "CREATEFRAME"|"PUSHFRAME"|"POPFRAME"|"RETURN"|"BREAK":
-            check_empty(instr)
-        case "DEFVAR"|"POPS":
-            check_var(instr)
-        case "CALL"|"LABEL"|"JUMP":
-            check_label(instr)
-        case "PUSHS"|"WRITE"|"EXIT"|"DPRINT":
-            check_symb(instr)
-        case "ADD"|"SUB"|"MUL"|"IDIV"|"LT"|"GT"|"EQ"|"AND"|"OR"|"STRI2INT"|"CONCAT"|"GETCHAR"|"SETCHAR":
-            check_var_2symb(instr)
-        case "READ":
-            check_var_type(instr)
-        case "JUMPIFEQ"|"JUMPIFNEQ":
-            check_label_2symb(instr)
-        case _:
-            print("ERROR: Invalid opcode", file=sys.stderr)
-            exit(32)
-
-# Checks if XML arguments (var, symb) are valid
-# @param instr XML instruction element
-def check_var_symb(instr):
-    instr = check_xml_arguments(instr, 2)
-    # Check first argument (var)
-    check_xml_attrib_type(instr[0], r"^(var)$")
-    check_var_re(instr[0].text)
-    # Check second argument (symb)
-    symb_type = check_xml_attrib_type(instr[1], r"^(var|int|string|bool|nil)$")
-    check_symb_re(instr[1].text, symb_type)
-
-# Checks if XML arguments (var, symb, symb) are valid
-# @param instr XML instruction element
-def check_var_2symb(instr):
-    instr = check_xml_arguments(instr, 3) 
-    # Check first argument (var)
-    check_xml_attrib_type(instr[0], r"^(var)$")
-    check_var_re(instr[0].text)
-    # Check second argument (symb)
-    symb_type = check_xml_attrib_type(instr[1], r"^(var|int|string|bool|nil)$")
-    check_symb_re(instr[1].text, symb_type)
-    # Check third argument (symb)
-    symb_type = check_xml_attrib_type(instr[2], r"^(var|int|string|bool|nil)$")
-    check_symb_re(instr[2].text, symb_type)
-
-# Checks if XML arguments (var, type) are valid
-# @param instr XML instruction element
-def check_var_type(instr):
-    instr = check_xml_arguments(instr, 2) 
-    # Check first argument (var)
-    check_xml_attrib_type(instr[0], r"^(var)$")
-    check_var_re(instr[0].text)
-    # Check second argument (type)
-    check_xml_attrib_type(instr[1], r"^(type)$")
-    check_type_re(instr[1].text)
-
-# Checks if XML arguments (label, symb, symb) are valid
-# @param instr XML instruction element
-def check_label_2symb(instr):
-    instr = check_xml_arguments(instr, 3) 
-    # Check first argument (label)
-    check_xml_attrib_type(instr[0], r"^(label)$")
-    check_label_re(instr[0].text)
-    # Check second argument (symb)
-    symb_type = check_xml_attrib_type(instr[1], r"^(var|int|string|bool|nil)$")
-    check_symb_re(instr[1].text, symb_type)
-    # Check third argument (symb)
-    symb_type = check_xml_attrib_type(instr[2], r"^(var|int|string|bool|nil)$")
-    check_symb_re(instr[2].text, symb_type)
-
-# Checks if XML without arguments is valid
-# @param instr XML instruction element
-def check_empty(instr):
-    # check number of arguments
-    if len(instr) != 0:
-        print("ERROR: Invalid number of arguments", file=sys.stderr)
-        exit(32)
+        raise StructureError("Missing attribute (opcode)")
 
-# Checks if XML argument (var) is valid
-# @param instr XML instruction element
-def check_var(instr):
-    check_xml_arguments(instr, 1)
-    # Check first argument (var)
-    check_xml_attrib_type(instr[0], r"^(var)$")
-    check_var_re(instr[0].text)
+    signature = OPCODE_SIGNATURES.get(instr.attrib["opcode"].upper())
+    if signature is None:
+        raise StructureError("Invalid opcode")
 
-# Checks if XML argument (label) is valid
-# @param instr XML instruction element
-def check_label(instr):
-    check_xml_arguments(instr, 1)
-    # Check first argument (label)
-    check_xml_attrib_type(instr[0], r"^(label)$")
-    check_label_re(instr[0].text)
-
-# Checks if XML argument (symb) is valid
-# @param instr XML instruction element
-def check_symb(instr):
-    check_xml_arguments(instr, 1)
-    # Check first argument (symb)
-    symb_type = check_xml_attrib_type(instr[0], r"^(var|int|string|bool|nil)$")
-    check_symb_re(instr[0].text, symb_type)
+    args = check_xml_arguments(instr, len(signature))
+    for arg, operand in zip(args, signature):
+        check_arg(arg, operand)
+    return args
 
-# Checks if XML argument (type) is valid
-# @param instr XML instruction element
-def check_type(instr):
-    check_xml_arguments(instr, 1)
-    # Check first argument (type)
-    check_xml_attrib_type(instr[0], r"^(type)&")
-    check_type_re(instr[0].text)
-
-# Checks var name with regex
-# @param var_value Variable value
-def check_var_re(var_value):
-    var_value = var_value.strip()
-    if re.match(r"^(GF|LF|TF)@([a-zA-Z]|_|-|\$|&|%|\*|!|\?)([a-zA-Z0-9]|_|-|\$|&|%|\*|!|\?)*$", var_value) is None:
-        print("ERROR: Invalid variable value", file=sys.stderr)
-        exit(32)
-
-# Checks symb name with regex
-# @param symb_value Symb value
-# @param symb_type Symb type
-def check_symb_re(symb_value, symb_type):
-    # if symb_value is None, we set it to empty string
-    symb_value = "" if symb_value is None else symb_value.strip()
-    match symb_type:
-        case "var":
-            if re.match(r"^(GF|LF|TF)@([a-zA-Z]|_|-|\$|&|%|\*|!|\?)([a-zA-Z0-9]|_|-|\$|&|%|\*|!|\?)*$", symb_value) is None:
-                print("ERROR: Invalid variable value", file=sys.stderr)
-                exit(32)
-        case "int":
-            valid_int = False
-            if re.match(r"^[+-]?(0x|0X)[\da-fA-F]+(_[\da-fA-F]+)*$", symb_value) is not None:
-                valid_int = True
-            elif 'o' in symb_value or 'O' in symb_value:
-                if re.match(r"^[+-]?0(o|O)?[0-7]+(_[0-7]+)*$", symb_value) is not None:
-                    valid_int = True
-            elif re.match(r"^[+-]?0+[0-7]*(_[0-7]+)*$", symb_value) is not None:
-                valid_int = True
-            elif re.match(r"^[+-]?[1-9][\d]*(_[\d]+)*$", symb_value) is not None:
-                valid_int = True
-            if not valid_int:
-                print("ERROR: Invalid integer value", file=sys.stderr)
-                exit(32)
-        case "string":
-            if re.match(r"^(\\[0-9]{3}|[^\\#\s])*$", symb_value) is None:
-                print("ERROR: Invalid string value", file=sys.stderr)
-                exit(32)
-        case "bool":
-            if re.match(r"^(true|false)$", symb_value) is None:
-                print("ERROR: Invalid boolean value", file=sys.stderr)
-                exit(32)
-        case "nil":
-            if re.match(r"^nil$", symb_value) is None:
-                print("ERROR: Invalid nil value", file=sys.stderr)
-                exit(32)
-
-# Checks label name with regex
-# @param label_value Label value
-def check_label_re(label_value):
-    label_value = label_value.strip()
-    if re.match(r"^([a-zA-Z]|_|-|\$|&|%|\*|!|\?)([a-zA-Z0-9]|_|-|\$|&|%|\*|!|\?)*$", label_value) is None:
-        print("ERROR: Invalid label value", file=sys.stderr)
-        exit(32)
-
-# Checks type name with regex
-# @param type_value Type value
-def check_type_re(type_value):
-    type_value = type_value.strip()
-    if re.match(r"^(int|string|bool)$", type_value) is None:
-        print("ERROR: Invalid type value", file=sys.stderr)
-        exit(32)
-
-# Checks if XML attribute (type) is valid
+# Checks type attribute and value of XML argument
 # @param arg XML argument element
-# @param regex Regex to match
-def check_xml_attrib_type(arg, regex):
-    if "type" not in arg.attrib or re.match(regex, arg.attrib["type"]) is None:
-        print("ERROR: Invalid or missing argument type", file=sys.stderr)
-        exit(32) 
-    return arg.attrib["type"]
+# @param operand Kind of operand (var, symb, label, type)
+def check_arg(arg, operand):
+    arg_type = arg.attrib.get("type")
+    if arg_type not in OPERAND_TYPES[operand]:
+        raise StructureError("Invalid or missing argument type")
+    # if value is None, we set it to empty string
+    value = "" if arg.text is None else arg.text.strip()
+    regex, error_msg = VALUE_CHECKS[arg_type]
+    if regex.fullmatch(value) is None:
+        raise StructureError(error_msg)
 
 # Checks if XML arguments are valid
 # @param instr XML instruction element
 # @param number_of_args Number of arguments
+# @return List of argument elements ordered by their position
 def check_xml_arguments(instr, number_of_args):
     # check number of arguments
     if len(instr) != number_of_args:
-        print("ERROR: Invalid number of arguments", file=sys.stderr)
-        exit(32)
-
-    # check argument elements, doesn't check duplicate arguments
-    if number_of_args == 1:
-        if instr.find("arg1") is None:
-            print("ERROR: Instruction is missing an argument", file=sys.stderr)
-            exit(32)
-    elif number_of_args == 2:
-        if instr.find("arg1") is None or instr.find("arg2") is None:
-            print("ERROR: Instruction is missing an argument", file=sys.stderr)
-            exit(32)
-    else:
-        if instr.find("arg1") is None or instr.find("arg2") is None or instr.find("arg3") is None:
-            print("ERROR: Instruction is missing an argument", file=sys.stderr)
-            exit(32)
-
-    return sorted(instr, key=lambda arg: arg.tag)
-    
\ No newline at end of file
+        raise StructureError("Invalid number of arguments")
+
+    # every position has to be taken exactly once, otherwise some argument is missing
+    args = [None] * number_of_args
+    for arg in instr:
+        index = ARG_TAGS.get(arg.tag)
+        if index is not None and index < number_of_args:
+            args[index] = arg
+    if None in args:
+        raise StructureError("Instruction is missing an argument")
+    return args
@@ -5,11 +5,115 @@
 # @file interpret.py
 
 import argparse, re, os.path, sys
+import gc, hashlib, io, marshal, mmap, operator
 import xml.etree.ElementTree as ET
 from collections import deque
 from enum import Enum
 
-import check_xml
+import analysis, check_xml
+
+# Operations of comparison instructions
+COMPARISONS = {"LT": operator.lt, "GT": operator.gt, "EQ": operator.eq}
+
+# Instructions which close loop when they jump backward
+LOOP_JUMPS = ("JUMP", "JUMPIFEQ", "JUMPIFNEQ", "JUMPIFEQS", "JUMPIFNEQS")
+
+# Default size of output buffer (in characters)
+OUTPUT_BUFFER_SIZE = 65536
+
+# Output of running program, flushed before error messages are printed
+output = None
+
+# Buffered writer of program output, text is encoded and written to binary stream in blocks
+class Output:
+    # Output constructor
+    # @param stream Binary stream to write to
+    # @param size Size of buffer in characters, 0 writes every text immediately
+    def __init__(self, stream, size=OUTPUT_BUFFER_SIZE):
+        self._stream = stream
+        self._buffer = []
+        self._length = 0
+        self._size = size
+
+    # Set size of buffer
+    # @param size Size of buffer in characters
+    def set_size(self, size):
+        self._size = size
+
+    # Write text to buffer, buffer is flushed when it is full
+    # @param text Text to write
+    def write(self, text):
+        self._buffer.append(text)
+        self._length += len(text)
+        if self._length >= self._size:
+            self.flush()
+
+    # Write buffered text to stream and flush the stream
+    def flush(self):
+        if self._buffer:
+            self._stream.write("".join(self._buffer).encode("utf-8"))
+            self._buffer.clear()
+            self._length = 0
+        self._stream.flush()
+
+# Mutable value of string variable, edited in place by SETCHAR and CONCAT
+# @note Buffer is owned by a single variable, every other instruction gets it materialized as str
+# @note Appended strings are kept as chunks and joined only when the value is needed,
+#       list of characters is made only when buffer is indexed or character is set
+class StringBuffer:
+    __slots__ = ("_chunks", "_chars", "_length", "_string")
+
+    # StringBuffer constructor
+    # @param string Initial value
+    def __init__(self, string):
+        self._chunks : list = [string]
+        self._chars  : list = None
+        self._length : int  = len(string)
+        self._string : str  = string
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if self._string is not None:
+            return self._string[index]
+        return self._get_chars()[index]
+
+    # Converts buffer to list of characters
+    # @return List of characters
+    def _get_chars(self):
+        if self._chars is None:
+            self._chars = list(str(self))
+            self._chunks = None
+        return self._chars
+
+    # Sets (replaces) character at index
+    # @param char Character to be set
+    # @param index Index of character to be replaced
+    def set_char(self, char, index):
+        self._get_chars()[index] = char
+        self._string = None
+
+    # Appends string to the end of buffer
+    # @param string String or StringBuffer to be appended
+    def append(self, string):
+        string = str(string)
+        if self._chars is None:
+            self._chunks.append(string)
+        else:
+            self._chars.extend(string)
+        self._length += len(string)
+        self._string = None
+
+    # Materializes buffer, str is built only once after every change
+    def __str__(self):
+        if self._string is None:
+            if self._chars is None:
+                self._string = "".join(self._chunks)
+                self._chunks = [self._string]
+            else:
+                self._string = "".join(self._chars)
+        return self._string
 
 # Stack implementation using deque
 class Stack:
@@ -42,24 +146,107 @@ class Program:
     # Program constructor
     def  __init__(self):
         self.instructions       : list          = []
-        self._data_stack        : Stack         = Stack()
+        # Data stack is a plain list, stack instructions use it directly
+        self._data_stack        : list          = []
         self._frame_stack       : Stack         = Stack()
-        self._call_stack        : Stack         = Stack()
+        # Call stack is a plain list of return addresses used directly by CALL and RETURN
+        self._call_stack        : list          = []
+        # CALL checks depth of call stack only when it grows over its peak (see grow_call_depth)
+        self._peak_call_depth   : int           = 0
+        self._max_call_depth    : int           = None
         self._global_frame      : self.Frame    = self.Frame(TypeFrame.GLOBAL) 
-        self._label_frame       : self.Frame    = self.Frame(TypeFrame.LABEL)
+        self._labels            : dict          = {}
+        self._local_shape       : list          = []
         self._temp_frame        : self.Frame    = None
+        # Dropped frames (cleared), reused by CREATEFRAME instead of allocating new ones
+        self._frame_pool        : list          = []
         self._program_counter   : int           = None
+        self._output            : Output        = Output(sys.stdout.buffer)
+        self._constant_pool     : dict          = {}
+        self._var_states        : dict          = {}
+        self._stats             : dict          = {}
 
     # Add instruction to program
     # @param instr instruction to add
     def add_instr(self, instr):
         self.instructions.append(instr)
 
+    # Get argument from constant pool, identical arguments (literals, variables, labels) are created
+    # and parsed only once and then shared by all instructions
+    # @param type Argument type
+    # @param value Argument value as text from XML
+    # @param decoded Value is already converted (loaded from compiled program)
+    # @return Argument object
+    def get_argument(self, type, value, decoded=False):
+        key = (type, value)
+        arg = self._constant_pool.get(key)
+        if arg is None:
+            arg = self._constant_pool[key] = self.Instruction.Argument(type, value, decoded)
+        return arg
+
+    # Set states of variable arguments proven by static analysis (see analysis.analyze_variables)
+    # @param var_states Dictionary of instructions and tuples with known state of every argument
+    def set_var_states(self, var_states):
+        self._var_states = var_states
+
+    # Get state of variable argument proven by static analysis
+    # @param instr Instruction object
+    # @param arg_index Index of argument
+    # @return Type of variable, analysis.DEFINED, analysis.DECLARED or None if nothing is known
+    def get_var_state(self, instr, arg_index):
+        arg_states = self._var_states.get(instr)
+        return None if arg_states is None else arg_states[arg_index]
+
+    # Get type of variable argument proven by static analysis
+    # @param instr Instruction object
+    # @param arg_index Index of argument
+    # @return Type of variable, None if it is not known
+    def get_known_type(self, instr, arg_index):
+        state = self.get_var_state(instr, arg_index)
+        return None if state in (analysis.DECLARED, analysis.DEFINED) else state
+
+    # Check if variable argument is proven to be declared
+    # @param instr Instruction object
+    # @param arg_index Index of argument
+    # @return True if variable is always declared when instruction is executed
+    def is_known_declared(self, instr, arg_index):
+        return self.get_var_state(instr, arg_index) is not None
+
+    # Check if variable argument is proven to be defined
+    # @param instr Instruction object
+    # @param arg_index Index of argument
+    # @return True if variable is always defined when instruction is executed
+    def is_known_defined(self, instr, arg_index):
+        return self.get_var_state(instr, arg_index) not in (None, analysis.DECLARED)
+
+    # Add value to statistics counter
+    # @param name Name of counter
+    # @param count Value to add
+    def add_stat(self, name, count=1):
+        self._stats[name] = self._stats.get(name, 0) + count
+
+    # Print statistics counters to stderr, with number of runs of garbage collector
+    def print_stats(self):
+        for name, count in self._stats.items():
+            print(name + ": " + str(count), file=sys.stderr)
+        collections = sum(generation["collections"] for generation in gc.get_stats())
+        print("garbage collections: " + str(collections), file=sys.stderr)
+
+    # Drop constant pool, it is needed only while instructions are generated
+    # @note Shared arguments are kept by instructions, pool would only add memory for every unique literal
+    def drop_constant_pool(self):
+        self._constant_pool = {}
+
     # Get global frame
     # @return global frame
     def gf(self):
         return self._global_frame
 
+    # Get program output
+    # @return Output object
+    def get_output(self):
+        return self._output
+
     # Get local frame
     # @return local frame
     def lf(self):
@@ -75,50 +262,41 @@ class Program:
     def set_tf(self, frame):
         self._temp_frame = frame
 
-    # Push data to selected stack
-    # @param data Data to push
-    # @param stack_type Type of stack
-    def push_stack(self, data, stack_type):
-        match stack_type:
-            case TypeStack.DATA:
-                self._data_stack.push(data)
-            case TypeStack.FRAME:
-                self._frame_stack.push(data)
-            case TypeStack.CALL:
-                self._call_stack.push(data)
-            case _:
-                print("ERROR: Invalid stack type", file=sys.stderr)
-                exit(99)
+    # Create new empty temp frame, the current temp frame or a frame from pool is reused when there is one
+    # @note Dropped frame is never referenced again (data stack holds copies of values), so it is only cleared
+    def create_tf(self):
+        frame = self._temp_frame
+        if frame is not None:
+            frame.clear()
+        elif self._frame_pool:
+            frame = self._frame_pool.pop()
+        else:
+            frame = self.Frame(TypeFrame.TEMP, self._local_shape)
+            self.add_stat("allocated frames")
+        self._temp_frame = frame
 
-    # Pop data from selected stack
-    # @param stack_type Type of stack
-    # @return Popped data
-    def pop_stack(self, stack_type):
-        match stack_type:
-            case TypeStack.DATA:
-                return self._data_stack.pop()
-            case TypeStack.FRAME:
-                return self._frame_stack.pop()
-            case TypeStack.CALL:
-                return self._call_stack.pop()
-            case _:
-                print("ERROR: Invalid stack type", file=sys.stderr)
-                exit(99)
+    # Replace temp frame by frame popped from frame stack, the dropped temp frame is kept for reuse
+    # @param frame Popped local frame
+    def pop_tf(self, frame):
+        if self._temp_frame is not None:
+            self._temp_frame.clear()
+            self._frame_pool.append(self._temp_frame)
+        self._temp_frame = frame
 
-    # Get top data from selected stack
-    # @param stack_type Type of stack
-    # @return Top data from stack
-    def top_stack(self, stack_type):
-        match stack_type:
-            case TypeStack.DATA:
-                return self._data_stack.top()
-            case TypeStack.FRAME:
-                return self._frame_stack.top()
-            case TypeStack.CALL:
-                return self._call_stack.top()
-            case _:
-                print("ERROR: Invalid stack type", file=sys.stderr)
-                exit(99)
+    # Set maximal depth of call stack
+    # @param depth Maximal number of nested calls, None for no limit
+    def set_max_call_depth(self, depth):
+        self._max_call_depth = depth
+
+    # Record new peak depth of call stack, CALL calls it only when the stack grows over its previous peak,
+    # so the limit is checked once per new depth and not on every call
+    # @param instr CALL instruction
+    def grow_call_depth(self, instr):
+        depth = len(self._call_stack) + 1
+        if self._max_call_depth is not None and depth > self._max_call_depth:
+            print_error(instr, "Maximal call depth exceeded", 99)
+        self._peak_call_depth = depth
+        self._stats["peak call depth"] = depth
 
     # Get program counter
     # @return Program counter
@@ -130,16 +308,65 @@ class Program:
     def set_pc(self, value):
         self._program_counter = value
 
-    # Get label frame
-    # @return Label frame
-    def get_label_frame(self):
-        return self._label_frame
+    # Get labels
+    # @return Dictionary of label names and addresses
+    def get_labels(self):
+        return self._labels
+
+    # Get shape of local and temp frames
+    # @return Names of local variables by their slot
+    def local_shape(self):
+        return self._local_shape
+
+    # Set shapes of frames, global frame is created again with its shape
+    # @param global_shape Names of global variables by their slot
+    # @param local_shape Names of local variables by their slot
+    def set_shapes(self, global_shape, local_shape):
+        self._global_frame = self.Frame(TypeFrame.GLOBAL, global_shape)
+        self._local_shape = local_shape
 
     # Run all instructions
-    def run(self):
+    # @param jit_threshold Number of backward jumps to loop header after which the loop is traced
+    #                      and compiled (see TraceJit), None runs every instruction by interpreter
+    # @note Every instruction is already an instance of its opcode class (see gen_program),
+    #       so each step is a single direct call of its execute method
+    def run(self, jit_threshold=None):
+        instructions = self.instructions
+        instr_count = len(instructions)
         self.set_pc(0)
-        while self.get_pc() < len(self.instructions):
-            self.instructions[self.get_pc()].execute(self)
+        if jit_threshold is None:
+            while self._program_counter < instr_count:
+                instructions[self._program_counter].execute(self)
+            return
+        jit = TraceJit(self, jit_threshold)
+        while self._program_counter < instr_count:
+            pc = self._program_counter
+            instr = instructions[pc]
+            instr.execute(self)
+            # Only jumps are counted, CALL and RETURN don't make loops
+            if self._program_counter <= pc and instr.get_opcode() in LOOP_JUMPS:
+                jit.backward_jump(self._program_counter)
+
+    # Compile all instructions to closures with their operands resolved
+    # @return List of compiled instructions, each returns address of next instruction
+    def compile(self):
+        return [instr.compile(self, index+1) for index, instr in enumerate(self.instructions)]
+
+    # Run all instructions compiled to closures
+    def run_compiled(self):
+        code = self.compile()
+        instr_count = len(code)
+        pc = 0
+        while pc < instr_count:
+            pc = code[pc](self)
+
+    # Run program transpiled to Python source, source is compiled as one function (see Transpiler)
+    def run_transpiled(self):
+        transpiler = Transpiler(self)
+        code = compile(transpiler.generate(), "<transpiled>", "exec")
+        namespace = transpiler.namespace()
+        exec(code, namespace)
+        namespace["run"](self)
 
     # For debugging
     def print_frames(self):
@@ -156,19 +383,24 @@ class Program:
         else:
             print("-> not initialized", file=sys.stderr)
         print("\n[LABEL FRAME]", file=sys.stderr)
-        self.get_label_frame().print()
+        for label, address in self.get_labels().items():
+            print("-> type: label, [\"" + label + "\" : " + str(address) + "]", file=sys.stderr)
 
     # For debugging
     def __str__(self):
         return f"{self.instructions}"
 
     class Instruction:
+        # Instructions don't have __dict__, there is one object for every instruction of the program
+        __slots__ = ("args", "_address", "_opcode", "_order", "_target")
+
         # Instruction constructor
         def __init__(self, address=None, opcode=None, order=None):
             self.args       : list  = []
             self._address   : int   = address
             self._opcode    : str   = opcode
             self._order     : int   = order
+            self._target    : int   = None
 
         # Get instruction address
         # @return Instruction address
@@ -185,6 +417,16 @@ class Program:
         def get_order(self):
             return self._order
         
+        # Get target address of jump instruction
+        # @return Address of instruction after label, set by link_labels
+        def get_target(self):
+            return self._target
+
+        # Set target address of jump instruction
+        # @param target Address of instruction after label
+        def set_target(self, target):
+            self._target = target
+
         # Add argument to instruction
         # @param arg Argument to add
         def add_arg(self, arg, index=None):
@@ -203,54 +445,37 @@ class Program:
                 return self.args[index]
             return None
 
-        # Execute instruction
-        # @param program Program object
-        def execute(self, program):
-            # Maps opcode to specific instruction child class
-            opcode_to_class = {
-                "MOVE": program.Move,
-                "NOT": program.Not,
-                "INT2CHAR": program.Int2char,
-                "STRLEN": program.Strlen,
-                "TYPE": program.Type,
-                "CREATEFRAME": program.Createframe,
-                "PUSHFRAME": program.Pushframe,
-                "POPFRAME": program.Popframe,
-                "RETURN": program.Return,
-                "BREAK": program.Break,
-                "DEFVAR": program.Defvar,
-                "POPS": program.Pops,
-                "CALL": program.Call,
-                "LABEL": program.Label,
-                "JUMP": program.Jump,
-                "PUSHS": program.Pushs,
-                "WRITE": program.Write,
-                "EXIT": program.Exit,
-                "DPRINT": program.Dprint,
-                "ADD": program.Add,
-                "SUB": program.Sub,
-                "MUL": program.Mul,
-                "IDIV": program.Idiv,
-                "LT": program.Lt,
-                "GT": program.Gt,
-                "EQ": program.Eq,
-                "AND": program.And,
-                "OR": program.Or,
-                "STRI2INT": program.Str2int,
-                "CONCAT": program.Concat,
-                "GETCHAR": program.Getchar,
-                "SETCHAR": program.Setchar,
-                "READ": program.Read,
-                "JUMPIFEQ": program.Jumpifeq,
-                "JUMPIFNEQ": program.Jumpifneq
-            }
-            # Calls execute method of specific instruction child class
-            opcode_to_class[self.get_opcode()].execute(self,program)
+        # Fold instruction with constant operands to its result (see fold_constants)
+        # @param symbs Constant arguments of instruction (all arguments after the result variable)
+        # @return Tuple of type and value of result, None if instruction can't be folded
+        # @note Instruction is never folded when it would fail, so the error is still raised when it runs
+        def fold(self, symbs):
+            return None
+
+        # Transpile instruction to Python source (see Transpiler), by default its compiled closure is called
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            gen.fallback(self, next_pc)
+
+        # Dump instruction to tuple of builtin types (used by compiled program format)
+        # @return Tuple of address, opcode, order and dumped arguments
+        def dump(self):
+            return (self._address, self._opcode, self._order, tuple(arg.dump() for arg in self.args))
 
         class Argument:
+            __slots__ = ("_type", "_value", "_slot")
+
             # Argument constructor
-            def __init__(self, type=None, value=None):
+            # @param type Argument type
+            # @param value Argument value as text from XML
+            # @param decoded Value is already converted (loaded from compiled program)
+            def __init__(self, type=None, value=None, decoded=False):
                 self._type : str = type
+                self._slot : int = None
+                if decoded:
+                    self._value = value
+                    return
                 match self._type:
                     case "int":
                         self._value : int   = set_int(value)
@@ -258,8 +483,11 @@ class Program:
                         self._value : bool  = True if value == "true" else False
                     case "nil":
                         self._value : None  = None
-                    case _:
+                    case "string":
+                        # escape sequences are decoded only here, values are used as they are when running
                         self._value : str   = replace_escaped_chars(value)
+                    case _:
+                        self._value : str   = value
 
             # Get argument type
             # @return Argument type
@@ -273,6 +501,16 @@ class Program:
                 if self._type == "var":
                     return self._value[:2]
 
+            # Get slot of variable in its frame
+            # @return Slot of variable, set by resolve_slots
+            def get_slot(self):
+                return self._slot
+
+            # Set slot of variable in its frame
+            # @param slot Slot of variable
+            def set_slot(self, slot):
+                self._slot = slot
+
             # Get argument value
             # @return Argument value
             def get_value(self):
@@ -281,11 +519,18 @@ class Program:
                 else:
                     return self._value
 
+            # Dump argument to tuple of builtin types (used by compiled program format)
+            # @return Tuple of type and converted value
+            def dump(self):
+                return (self._type, self._value)
+
             # For debugging
             def __str__(self):
                 return f"{self._type} {self._value}"
 
     class Move(Instruction):
+        __slots__ = ()
+
         # Execute MOVE instruction
         # @param program Program object
         def execute(self, program):
@@ -296,8 +541,8 @@ class Program:
             match arg.get_type():
                 case "var":
                     frame = check_frame_both(self, program, 1)
-                    temp_var.set_type(frame.get_var(arg.get_value()).get_type())
-                    temp_var.set_value(frame.get_var(arg.get_value()).get_value())
+                    temp_var.set_type(frame.get_var(arg.get_slot()).get_type())
+                    temp_var.set_value(frame.get_var(arg.get_slot()).get_value())
                 case "int":
                     temp_var.set_type(arg.get_type())
                     temp_var.set_value(int(arg.get_value()))
@@ -306,17 +551,54 @@ class Program:
                     temp_var.set_value(bool(arg.get_value()))
                 case "string":
                     temp_var.set_type(arg.get_type())
-                    temp_var.set_value(replace_escaped_chars(str(arg.get_value())))
+                    temp_var.set_value(arg.get_value())
                 case "nil":
                     temp_var.set_type(arg.get_type())
                     temp_var.set_value(None)
 
             # Check if variable is declared and setting value
             frame = check_frame_declare(self, program, 0)
-            frame.set_var(self.get_arg(0).get_value(), temp_var)
+            frame.set_var(self.get_arg(0).get_slot(), temp_var)
             program.set_pc(program.get_pc() + 1)
-        
+
+        # Compile MOVE instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            arg = self.get_arg(1)
+            slot = self.get_arg(0).get_slot()
+            dest_frame = compile_frame(self, program, 0)
+            Var = Program.Frame.Var
+            if arg.get_type() == "var":
+                source = compile_var(self, program, 1)
+                def move(program):
+                    var = source(program)
+                    dest_frame(program).vars[slot] = Var(var._type, var._value)
+                    return next_pc
+            else:
+                type = arg.get_type()
+                value = arg.get_value()
+                def move(program):
+                    dest_frame(program).vars[slot] = Var(type, value)
+                    return next_pc
+            return move
+
+        # Transpile MOVE instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            type, value = gen.symb(self, 1)
+            dest = self.get_arg(0)
+            if gen.is_local(dest):
+                gen.assign(gen.result(self, 0), type, value)
+            else:
+                vars = gen.declared(self, 0)
+                gen.emit(f"{vars}[{dest.get_slot()}] = Var({type}, {value})")
+
     class Not(Instruction):
+        __slots__ = ()
+
         # Execute NOT instruction
         # @param program Program object
         def execute(self, program):
@@ -324,11 +606,42 @@ class Program:
             value = check_selected_type_arg(self, program, 1, "bool")
             # Check if variable is declared and setting value
             frame = check_frame_declare(self, program, 0)
-            frame.get_var(self.get_arg(0).get_value()).set_type("bool")
-            frame.get_var(self.get_arg(0).get_value()).set_value(not value)
+            frame.get_var(self.get_arg(0).get_slot()).set_type("bool")
+            frame.get_var(self.get_arg(0).get_slot()).set_value(not value)
             program.set_pc(program.get_pc() + 1)
-        
+
+        # Compile NOT instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            value1 = compile_typed_symb(self, program, 1, "bool")
+            result = compile_var(self, program, 0, False)
+            def not_(program):
+                value = value1(program)
+                var = result(program)
+                var._type = "bool"
+                var._value = not value
+                return next_pc
+            return not_
+
+        # Transpile NOT instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            value = gen.typed(self, 1, "bool")
+            gen.assign(gen.result(self, 0), "'bool'", f"not {value}")
+
+        # Fold NOT instruction with constant operands
+        # @param symbs Constant arguments of instruction
+        # @return Tuple of type and value of result, None if instruction can't be folded
+        def fold(self, symbs):
+            if symbs[0].get_type() == "bool":
+                return ("bool", not symbs[0].get_value())
+
     class Int2char(Instruction):
+        __slots__ = ()
+
         # Execute INT2CHAR instruction
         # @param program Program object
         def execute(self, program):
@@ -336,14 +649,55 @@ class Program:
             value = check_selected_type_arg(self, program, 1, "int")
             # Check if variable is declared and setting value
             frame = check_frame_declare(self, program, 0)
-            frame.get_var(self.get_arg(0).get_value()).set_type("string")
+            frame.get_var(self.get_arg(0).get_slot()).set_type("string")
             try:
-                frame.get_var(self.get_arg(0).get_value()).set_value(chr(value))
+                frame.get_var(self.get_arg(0).get_slot()).set_value(chr(value))
             except ValueError:
                 print_error(self, "Wrong value of variable", 58)
             program.set_pc(program.get_pc() + 1)
-        
+
+        # Compile INT2CHAR instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            value1 = compile_typed_symb(self, program, 1, "int")
+            result = compile_var(self, program, 0, False)
+            def int2char(program):
+                value = value1(program)
+                var = result(program)
+                var._type = "string"
+                try:
+                    var._value = chr(value)
+                except ValueError:
+                    print_error(self, "Wrong value of variable", 58)
+                return next_pc
+            return int2char
+
+        # Transpile INT2CHAR instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            value = gen.typed(self, 1, "int")
+            dest = gen.result(self, 0)
+            gen.begin("try:")
+            gen.emit(f"{dest[1]} = chr({value})")
+            gen.end()
+            gen.begin("except ValueError:")
+            gen.error(self, "Wrong value of variable", 58)
+            gen.end()
+            gen.emit(f"{dest[0]} = 'string'")
+
+        # Fold INT2CHAR instruction with constant operands
+        # @param symbs Constant arguments of instruction
+        # @return Tuple of type and value of result, None if instruction can't be folded
+        def fold(self, symbs):
+            if symbs[0].get_type() == "int" and 0 <= symbs[0].get_value() <= 0x10FFFF:
+                return ("string", chr(symbs[0].get_value()))
+
     class Strlen(Instruction):
+        __slots__ = ()
+
         # Execute STRLEN instruction
         # @param program Program object
         def execute(self, program):
@@ -351,11 +705,42 @@ class Program:
             value = check_selected_type_arg(self, program, 1, "string")
             # Check if variable is declared and setting value
             frame = check_frame_declare(self, program, 0)
-            frame.get_var(self.get_arg(0).get_value()).set_type("int")
-            frame.get_var(self.get_arg(0).get_value()).set_value(len(value))
+            frame.get_var(self.get_arg(0).get_slot()).set_type("int")
+            frame.get_var(self.get_arg(0).get_slot()).set_value(len(value))
             program.set_pc(program.get_pc() + 1)
-        
+
+        # Compile STRLEN instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            value1 = compile_typed_symb(self, program, 1, "string")
+            result = compile_var(self, program, 0, False)
+            def strlen(program):
+                value = value1(program)
+                var = result(program)
+                var._type = "int"
+                var._value = len(value)
+                return next_pc
+            return strlen
+
+        # Transpile STRLEN instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            value = gen.typed(self, 1, "string")
+            gen.assign(gen.result(self, 0), "'int'", f"len({value})")
+
+        # Fold STRLEN instruction with constant operands
+        # @param symbs Constant arguments of instruction
+        # @return Tuple of type and value of result, None if instruction can't be folded
+        def fold(self, symbs):
+            if symbs[0].get_type() == "string":
+                return ("int", len(symbs[0].get_value()))
+
     class Type(Instruction):
+        __slots__ = ()
+
         # Execute TYPE instruction
         # @param program Program object
         def execute(self, program):
@@ -363,67 +748,223 @@ class Program:
             arg = self.get_arg(1)
             if arg.get_type() == "var":
                 frame = check_frame_declare(self, program, 1)
-                if frame.get_var(arg.get_value()).get_value() != None:
-                    type = frame.get_var(arg.get_value()).get_type()
-                elif frame.get_var(arg.get_value()).get_type() == "var":
+                if frame.get_var(arg.get_slot()).get_value() != None:
+                    type = frame.get_var(arg.get_slot()).get_type()
+                elif frame.get_var(arg.get_slot()).get_type() == "var":
                     type = ""
                 else:
-                    type = frame.get_var(arg.get_value()).get_type()
+                    type = frame.get_var(arg.get_slot()).get_type()
 
             else:
                 type = arg.get_type()
             # Check if variable is declared and setting value
             frame = check_frame_declare(self, program, 0)
-            frame.get_var(self.get_arg(0).get_value()).set_type("string")
-            frame.get_var(self.get_arg(0).get_value()).set_value(str(type))
+            frame.get_var(self.get_arg(0).get_slot()).set_type("string")
+            frame.get_var(self.get_arg(0).get_slot()).set_value(str(type))
             program.set_pc(program.get_pc() + 1)
 
+        # Compile TYPE instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            arg = self.get_arg(1)
+            result = compile_var(self, program, 0, False)
+            if arg.get_type() == "var":
+                source = compile_var(self, program, 1, False)
+                def type_(program):
+                    var = source(program)
+                    if var._value is not None:
+                        type = var._type
+                    elif var._type == "var":
+                        type = ""
+                    else:
+                        type = var._type
+                    var = result(program)
+                    var._type = "string"
+                    var._value = type
+                    return next_pc
+            else:
+                type = arg.get_type()
+                def type_(program):
+                    var = result(program)
+                    var._type = "string"
+                    var._value = type
+                    return next_pc
+            return type_
+
+        # Transpile TYPE instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            arg = self.get_arg(1)
+            if arg.get_type() != "var":
+                type = repr(arg.get_type())
+            elif gen.get_known_type(self, 1) is not None:
+                # Type is proven by static analysis
+                type = repr(gen.get_known_type(self, 1))
+            else:
+                var_type, value = gen.symb(self, 1, False)
+                type = gen.temp("r")
+                gen.emit(f"{type} = {var_type} if {value} is not None else '' if {var_type} == 'var' else {var_type}")
+            gen.assign(gen.result(self, 0), "'string'", type)
+
+        # Fold TYPE instruction with constant operands
+        # @param symbs Constant arguments of instruction
+        # @return Tuple of type and value of result, None if instruction can't be folded
+        def fold(self, symbs):
+            return ("string", symbs[0].get_type())
+
     class Createframe(Instruction):
+        __slots__ = ()
+
         # Execute CREATEFRAME instruction
         # @param program Program object
         def execute(self, program):
             # Create new temp frame
-            program.set_tf(program.Frame(TypeFrame.TEMP))
+            program.create_tf()
             program.set_pc(program.get_pc() + 1)
-    
+
+        # Compile CREATEFRAME instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            def createframe(program):
+                program.create_tf()
+                return next_pc
+            return createframe
+
+        # Transpile CREATEFRAME instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            gen.emit("program.create_tf()")
+
     class Pushframe(Instruction):
+        __slots__ = ()
+
         # Execute PUSHFRAME instruction
         # @param program Program object
         def execute(self, program):
             # Push temp frame to local frame stack
             if program.tf() is None:
                 print_error(self, "Temp frame not initialized", 55)
-            program.push_stack(program.tf(), TypeStack.FRAME)
+            program._frame_stack.push(program.tf())
             program.set_tf(None)
             program.set_pc(program.get_pc() + 1)
-        
+
+        # Compile PUSHFRAME instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            frame_stack = program._frame_stack
+            def pushframe(program):
+                if program._temp_frame is None:
+                    print_error(self, "Temp frame not initialized", 55)
+                frame_stack.push(program._temp_frame)
+                program._temp_frame = None
+                return next_pc
+            return pushframe
+
+        # Transpile PUSHFRAME instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            gen.check(self, "program._temp_frame is None", "Temp frame not initialized", 55)
+            gen.emit("frame_stack.push(program._temp_frame)")
+            gen.emit("program._temp_frame = None")
+
     class Popframe(Instruction):
+        __slots__ = ()
+
         def execute(self, program):
             # Pop local frame to temp frame
             if program.lf() is None:
                 print_error(self, "Local frame not initialized", 55)
-            program.set_tf(program.lf())
-            program.pop_stack(TypeStack.FRAME)
+            program.pop_tf(program._frame_stack.pop())
             program.set_pc(program.get_pc() + 1)
-        
+
+        # Compile POPFRAME instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            frame_stack = program._frame_stack
+            def popframe(program):
+                frame = frame_stack.pop()
+                if frame is None:
+                    print_error(self, "Local frame not initialized", 55)
+                program.pop_tf(frame)
+                return next_pc
+            return popframe
+
+        # Transpile POPFRAME instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            frame = gen.temp("f")
+            gen.emit(f"{frame} = frame_stack.pop()")
+            gen.check(self, f"{frame} is None", "Local frame not initialized", 55)
+            gen.emit(f"program.pop_tf({frame})")
+
     class Return(Instruction):
+        __slots__ = ()
+
         # Execute RETURN instruction
         # @param program Program object
         def execute(self, program):
             # Pop call stack and set program counter
-            if program.top_stack(TypeStack.CALL) is None:
+            if not program._call_stack:
                 print_error(self, "Call stack is empty", 56)
-            program.set_pc(program.pop_stack(TypeStack.CALL))
-        
+            program.set_pc(program._call_stack.pop())
+
+        # Compile RETURN instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            call_stack = program._call_stack
+            def return_(program):
+                if not call_stack:
+                    print_error(self, "Call stack is empty", 56)
+                return call_stack.pop()
+            return return_
+
+        # Transpile RETURN instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            gen.check(self, "not call_stack", "Call stack is empty", 56)
+            gen.emit("pc = call_stack.pop()")
+
     class Break(Instruction):
+        __slots__ = ()
+
         # Execute BREAK instruction
         # @param program Program object
         def execute(self, program):
-            print("Program is on line: ", program.get_pc()+1, file=sys.stderr)
+            # Output written so far has to come before the state of interpreter
+            program.get_output().flush()
+            print("Program is on line: ", self.get_address()+1, file=sys.stderr)
             program.print_frames()
             program.set_pc(program.get_pc() + 1)
 
-    class Defvar(Instruction): 
+        # Compile BREAK instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            def break_(program):
+                program.set_pc(next_pc - 1)
+                self.execute(program)
+                return next_pc
+            return break_
+
+    class Defvar(Instruction):
+        __slots__ = ()
+
         # Execute DEFVAR instruction
         # @param program Program object
         def execute(self, program):
@@ -438,97 +979,337 @@ class Program:
                 print_error(self, f"{frame_name} not initialized", 55)
             # Check if variable already exists and add it to frame
             check_var_exists(self, frame, 0)
-            frame.add_var(self.get_arg(0).get_value(), "var")
+            frame.add_var(self.get_arg(0).get_slot(), "var")
             program.set_pc(program.get_pc() + 1)
 
+        # Compile DEFVAR instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            slot = self.get_arg(0).get_slot()
+            Var = Program.Frame.Var
+            match self.get_arg(0).get_frame_type():
+                case "GF":
+                    gf_vars = program.gf().vars
+                    def defvar(program):
+                        if gf_vars[slot] is not None:
+                            print_error(self, "Variable already declared", 52)
+                        gf_vars[slot] = Var("var")
+                        return next_pc
+                case "LF":
+                    frame_stack = program._frame_stack
+                    def defvar(program):
+                        frame = frame_stack.top()
+                        if frame is None:
+                            print_error(self, "LF not initialized", 55)
+                        if frame.vars[slot] is not None:
+                            print_error(self, "Variable already declared", 52)
+                        frame.vars[slot] = Var("var")
+                        return next_pc
+                case _:
+                    def defvar(program):
+                        frame = program._temp_frame
+                        if frame is None:
+                            print_error(self, "TF not initialized", 55)
+                        if frame.vars[slot] is not None:
+                            print_error(self, "Variable already declared", 52)
+                        frame.vars[slot] = Var("var")
+                        return next_pc
+            return defvar
+
+        # Transpile DEFVAR instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            arg = self.get_arg(0)
+            if gen.is_local(arg):
+                type, value = gen.local(arg)
+                gen.check(self, f"{type} is not None", "Variable already declared", 52)
+                gen.emit(f"{type} = 'var'")
+                gen.emit(f"{value} = None")
+                return
+            match arg.get_frame_type():
+                case "GF":
+                    vars = "gf_vars"
+                case "LF":
+                    frame = gen.temp("f")
+                    gen.emit(f"{frame} = frame_stack.top()")
+                    gen.check(self, f"{frame} is None", "LF not initialized", 55)
+                    vars = frame + ".vars"
+                case _:
+                    frame = gen.temp("f")
+                    gen.emit(f"{frame} = program._temp_frame")
+                    gen.check(self, f"{frame} is None", "TF not initialized", 55)
+                    vars = frame + ".vars"
+            gen.check(self, f"{vars}[{arg.get_slot()}] is not None", "Variable already declared", 52)
+            gen.emit(f"{vars}[{arg.get_slot()}] = Var('var')")
+
     class Pops(Instruction):
+        __slots__ = ()
+
         # Execute POPS instruction
         # @param program Program object
         def execute(self, program):
             # Check if variable is declared in frame
             frame = check_frame_declare(self, program, 0)
-            var = frame.get_var(self.get_arg(0).get_value())
-            if program.top_stack(TypeStack.DATA) is None:
+            var = frame.get_var(self.get_arg(0).get_slot())
+            if not program._data_stack:
                 print_error(self, "Data stack is empty", 56)
-            # Set type of variable
-            var.set_type(program.top_stack(TypeStack.DATA).get_type())
-            # Pop data stack and set value of variable
-            if program.top_stack(TypeStack.DATA).get_type() == "var":
-                var.set_value(program.pop_stack(TypeStack.DATA).get_value())
-            else:
-                var.set_value(program.pop_stack(TypeStack.DATA).get_value())
+            # Pop type and value of variable at once
+            var._type, var._value = program._data_stack.pop()
             program.set_pc(program.get_pc() + 1)
-        
+
+        # Compile POPS instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            result = compile_var(self, program, 0, False)
+            data_stack = program._data_stack
+            def pops(program):
+                var = result(program)
+                if not data_stack:
+                    print_error(self, "Data stack is empty", 56)
+                var._type, var._value = data_stack.pop()
+                return next_pc
+            return pops
+
+        # Transpile POPS instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            dest = gen.result(self, 0)
+            gen.check(self, "not data_stack", "Data stack is empty", 56)
+            gen.emit(f"{dest[0]}, {dest[1]} = data_stack.pop()")
+
     class Call(Instruction):
+        __slots__ = ()
+
         # Execute CALL instruction
         # @param program Program object
         def execute(self, program):
-            arg = self.get_arg(0)
-            # Check if argument is label and if it exists
-            if arg.get_type() != "label" or program.get_label_frame().get_var(arg.get_value()) is None:
-                print_error(self, "Invalid label", 52)
             # Saving address of next instruction to call stack and setting pc to label address
-            program.push_stack(program.get_pc()+1, TypeStack.CALL)
-            program.set_pc(program.get_label_frame().get_var(arg.get_value()).get_value())
-    
+            if len(program._call_stack) >= program._peak_call_depth:
+                program.grow_call_depth(self)
+            program._call_stack.append(program.get_pc()+1)
+            program.set_pc(self.get_target())
+
+        # Compile CALL instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            target = self.get_target()
+            call_stack = program._call_stack
+            def call(program):
+                if len(call_stack) >= program._peak_call_depth:
+                    program.grow_call_depth(self)
+                call_stack.append(next_pc)
+                return target
+            return call
+
+        # Transpile CALL instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            gen.emit(f"if len(call_stack) >= program._peak_call_depth: program.grow_call_depth({gen.ref(self)})")
+            gen.emit(f"call_stack.append({next_pc})")
+            gen.emit(f"pc = {self.get_target()}")
+
     class Label(Instruction):
+        __slots__ = ()
+
         # Execute LABEL instruction
         # @param program Program object
         def execute(self, program):
             # Does nothing but is needed as point of jump
             program.set_pc(program.get_pc() + 1)
 
+        # Compile LABEL instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            def label(program):
+                return next_pc
+            return label
+
+        # Transpile LABEL instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            # Label is only start of block
+            pass
+
     class Jump(Instruction):
+        __slots__ = ()
+
         # Execute JUMP instruction
         # @param program Program object
         def execute(self, program):
-            arg = self.get_arg(0)
-            # Check if label exists
-            if arg.get_type() != "label" or program.get_label_frame().get_var(arg.get_value()) is None:
-                print_error(self, "Invalid label", 52)
-            program.set_pc(program.get_label_frame().get_var(arg.get_value()).get_value())
-        
+            program.set_pc(self.get_target())
+
+        # Compile JUMP instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            target = self.get_target()
+            def jump(program):
+                return target
+            return jump
+
+        # Transpile JUMP instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            gen.emit(f"pc = {self.get_target()}")
+
     class Pushs(Instruction):
+        __slots__ = ()
+
         # Execute PUSHS instruction
         # @param program Program object
         def execute(self, program):
             arg = self.get_arg(0)
-            # Check if argument is variable or constant and push it to data stack
+            # Check if argument is variable or constant and push copy of its type and value to data stack
             if arg.get_type() == "var":
                 frame = check_frame_both(self, program, 0)
-                program.push_stack(frame.get_var(arg.get_value()), TypeStack.DATA)
+                var = frame.get_var(arg.get_slot())
+                program._data_stack.append((var.get_type(), var.get_value()))
             else:
-                program.push_stack(arg, TypeStack.DATA)
+                program._data_stack.append((arg.get_type(), arg.get_value()))
             program.set_pc(program.get_pc() + 1)
-        
+
+        # Compile PUSHS instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            arg = self.get_arg(0)
+            data_stack = program._data_stack
+            if arg.get_type() != "var":
+                data = (arg.get_type(), arg.get_value())
+                def pushs(program):
+                    data_stack.append(data)
+                    return next_pc
+                return pushs
+            source = compile_var(self, program, 0)
+            def pushs(program):
+                var = source(program)
+                data_stack.append((var._type, var._value))
+                return next_pc
+            return pushs
+
+        # Transpile PUSHS instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            type, value = gen.symb(self, 0)
+            gen.emit(f"data_stack.append(({type}, {value}))")
+
     class Write(Instruction):
+        __slots__ = ()
+
         # Execute WRITE instruction
         # @param program Program object
         def execute(self, program):
             arg = self.get_arg(0)
-            # Check if argument is variable or constant and print it
+            output = program.get_output()
+            # Check if argument is variable or constant and write it to output (nil is written as empty string)
             if arg.get_type() == "var":
                 frame = check_frame_both(self, program, 0)
-                var = frame.get_var(arg.get_value())
+                var = frame.get_var(arg.get_slot())
                 if var.get_type() == "bool":
-                    print("true" if var.get_value() else "false", end='')
-                elif var.get_type() == "nil":
-                    print("", end='')
+                    output.write("true" if var.get_value() else "false")
                 elif var.get_type() == "string":
-                    print(replace_escaped_chars(var.get_value()), end='')
-                else:
-                    print(var.get_value(), end='')
+                    output.write(var.get_value())
+                elif var.get_type() != "nil":
+                    output.write(str(var.get_value()))
             elif arg.get_type() == "bool":
-                print("true" if arg.get_value() else "false", end='')
-            elif arg.get_type() == "nil":
-                print("", end='')
+                output.write("true" if arg.get_value() else "false")
             elif arg.get_type() == "string":
-                print(replace_escaped_chars(arg.get_value()), end='')
-            else:
-                print(arg.get_value(), end='')
+                output.write(arg.get_value())
+            elif arg.get_type() != "nil":
+                output.write(str(arg.get_value()))
             program.set_pc(program.get_pc() + 1)
 
+        # Compile WRITE instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            arg = self.get_arg(0)
+            output_write = program.get_output().write
+            if arg.get_type() == "var":
+                source = compile_var(self, program, 0)
+                def write(program):
+                    var = source(program)
+                    type = var._type
+                    if type == "bool":
+                        output_write("true" if var._value else "false")
+                    elif type == "string":
+                        output_write(var._value)
+                    elif type != "nil":
+                        output_write(str(var._value))
+                    return next_pc
+            else:
+                # Output of constant is known at compile time
+                match arg.get_type():
+                    case "bool":
+                        text = "true" if arg.get_value() else "false"
+                    case "nil":
+                        text = ""
+                    case "string":
+                        text = arg.get_value()
+                    case _:
+                        text = str(arg.get_value())
+                def write(program):
+                    output_write(text)
+                    return next_pc
+            return write
+
+        # Transpile WRITE instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            arg = self.get_arg(0)
+            if arg.get_type() != "var":
+                # Output of constant is known when program is transpiled
+                match arg.get_type():
+                    case "bool":
+                        text = "true" if arg.get_value() else "false"
+                    case "nil":
+                        text = ""
+                    case "string":
+                        text = arg.get_value()
+                    case _:
+                        text = str(arg.get_value())
+                gen.emit(f"output_write({text!r})")
+                return
+            type, value = gen.symb(self, 0)
+            writes = {"bool": f"output_write('true' if {value} else 'false')",
+                      "string": f"output_write({value})",
+                      "int": f"output_write(str({value}))"}
+            known = gen.get_known_type(self, 0)
+            if known is not None:
+                if known in writes:
+                    gen.emit(writes[known])
+                return
+            gen.begin(f"if {type} == 'bool':")
+            gen.emit(writes["bool"])
+            gen.end()
+            gen.begin(f"elif {type} == 'string':")
+            gen.emit(writes["string"])
+            gen.end()
+            gen.begin(f"elif {type} != 'nil':")
+            gen.emit(writes["int"])
+            gen.end()
+
     class Exit(Instruction):
+        __slots__ = ()
+
         # Execute EXIT instruction
         # @param program Program object
         def execute(self, program):
@@ -537,17 +1318,46 @@ class Program:
             # Check if exit code is in range
             if not 0 <= int(arg_val) <= 49:
                 print_error(self, "Wrong exit code", 57)
+            program.get_output().flush()
             exit(int(arg_val))
 
+        # Compile EXIT instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            value0 = compile_typed_symb(self, program, 0, "int")
+            output = program.get_output()
+            def exit_(program):
+                value = value0(program)
+                if not 0 <= value <= 49:
+                    print_error(self, "Wrong exit code", 57)
+                output.flush()
+                exit(value)
+            return exit_
+
+        # Transpile EXIT instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            value = gen.typed(self, 0, "int")
+            gen.check(self, f"not 0 <= {value} <= 49", "Wrong exit code", 57)
+            gen.emit("output.flush()")
+            gen.emit(f"exit({value})")
+
     class Dprint(Instruction):
+        __slots__ = ()
+
         # Execute DPRINT instruction
         # @param program Program object
         def execute(self, program):
             arg_type = self.get_arg(0).get_type()
+            # Output written so far has to come before the debug print
+            program.get_output().flush()
             # Check if argument is variable or constant and print it to stderr
             if arg_type == "var":
                 frame = check_frame_both(self, program, 0)
-                var = frame.get_var(self.get_arg(0).get_value())
+                var = frame.get_var(self.get_arg(0).get_slot())
                 if var.get_type() == "bool":
                     print("true" if var.get_value() else "false", file=sys.stderr, end='')
                 else:
@@ -560,7 +1370,60 @@ class Program:
                 print(self.get_arg(0).get_value(), file=sys.stderr, end='')
             program.set_pc(program.get_pc() + 1)
 
+        # Compile DPRINT instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            arg = self.get_arg(0)
+            output = program.get_output()
+            if arg.get_type() == "var":
+                source = compile_var(self, program, 0)
+                def dprint(program):
+                    var = source(program)
+                    output.flush()
+                    if var._type == "bool":
+                        print("true" if var._value else "false", file=sys.stderr, end='')
+                    else:
+                        print(var._value, file=sys.stderr, end='')
+                    return next_pc
+            else:
+                match arg.get_type():
+                    case "bool":
+                        text = "true" if arg.get_value() else "false"
+                    case "nil":
+                        text = ""
+                    case _:
+                        text = str(arg.get_value())
+                def dprint(program):
+                    output.flush()
+                    print(text, file=sys.stderr, end='')
+                    return next_pc
+            return dprint
+
+        # Transpile DPRINT instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            arg = self.get_arg(0)
+            if arg.get_type() == "var":
+                type, value = gen.symb(self, 0)
+                gen.emit("output.flush()")
+                gen.emit(f"print(('true' if {value} else 'false') if {type} == 'bool' else {value}, file=sys.stderr, end='')")
+                return
+            match arg.get_type():
+                case "bool":
+                    text = "true" if arg.get_value() else "false"
+                case "nil":
+                    text = ""
+                case _:
+                    text = str(arg.get_value())
+            gen.emit("output.flush()")
+            gen.emit(f"print({text!r}, file=sys.stderr, end='')")
+
     class Add(Instruction):
+        __slots__ = ()
+
         # Execute ADD instruction
         # @param program Program object
         def execute(self, program):
@@ -569,11 +1432,45 @@ class Program:
             value1 = check_selected_type_arg(self, program, 1, "int")
             # Check if variable is declared and set its value to sum of arguments
             frame = check_frame_declare(self, program, 0)
-            frame.get_var(self.get_arg(0).get_value()).set_type("int")
-            frame.get_var(self.get_arg(0).get_value()).set_value(int(value1 + value2))
+            frame.get_var(self.get_arg(0).get_slot()).set_type("int")
+            frame.get_var(self.get_arg(0).get_slot()).set_value(int(value1 + value2))
             program.set_pc(program.get_pc() + 1)
 
+        # Compile ADD instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            value2 = compile_typed_symb(self, program, 2, "int")
+            value1 = compile_typed_symb(self, program, 1, "int")
+            result = compile_var(self, program, 0, False)
+            def add(program):
+                v2 = value2(program)
+                v1 = value1(program)
+                var = result(program)
+                var._type = "int"
+                var._value = int(v1 + v2)
+                return next_pc
+            return add
+
+        # Transpile ADD instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            value2 = gen.typed(self, 2, "int")
+            value1 = gen.typed(self, 1, "int")
+            gen.assign(gen.result(self, 0), "'int'", f"{value1} + {value2}")
+
+        # Fold ADD instruction with constant operands
+        # @param symbs Constant arguments of instruction
+        # @return Tuple of type and value of result, None if instruction can't be folded
+        def fold(self, symbs):
+            if symbs[0].get_type() == "int" and symbs[1].get_type() == "int":
+                return ("int", int(symbs[0].get_value() + symbs[1].get_value()))
+
     class Sub(Instruction):
+        __slots__ = ()
+
         # Execute SUB instruction
         # @param program Program object
         def execute(self, program):
@@ -582,11 +1479,45 @@ class Program:
             value1 = check_selected_type_arg(self, program, 1, "int")
             # Check if variable is declared and set its value to difference of arguments
             frame = check_frame_declare(self, program, 0)
-            frame.get_var(self.get_arg(0).get_value()).set_type("int")
-            frame.get_var(self.get_arg(0).get_value()).set_value(int(value1 - value2))
+            frame.get_var(self.get_arg(0).get_slot()).set_type("int")
+            frame.get_var(self.get_arg(0).get_slot()).set_value(int(value1 - value2))
             program.set_pc(program.get_pc() + 1)
 
+        # Compile SUB instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            value2 = compile_typed_symb(self, program, 2, "int")
+            value1 = compile_typed_symb(self, program, 1, "int")
+            result = compile_var(self, program, 0, False)
+            def sub(program):
+                v2 = value2(program)
+                v1 = value1(program)
+                var = result(program)
+                var._type = "int"
+                var._value = int(v1 - v2)
+                return next_pc
+            return sub
+
+        # Transpile SUB instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            value2 = gen.typed(self, 2, "int")
+            value1 = gen.typed(self, 1, "int")
+            gen.assign(gen.result(self, 0), "'int'", f"{value1} - {value2}")
+
+        # Fold SUB instruction with constant operands
+        # @param symbs Constant arguments of instruction
+        # @return Tuple of type and value of result, None if instruction can't be folded
+        def fold(self, symbs):
+            if symbs[0].get_type() == "int" and symbs[1].get_type() == "int":
+                return ("int", int(symbs[0].get_value() - symbs[1].get_value()))
+
     class Mul(Instruction):
+        __slots__ = ()
+
         # Execute MUL instruction
         # @param program Program object
         def execute(self, program):
@@ -595,11 +1526,45 @@ class Program:
             value1 = check_selected_type_arg(self, program, 1, "int")
             # Check if variable is declared and set its value to product of arguments
             frame = check_frame_declare(self, program, 0)
-            frame.get_var(self.get_arg(0).get_value()).set_type("int")
-            frame.get_var(self.get_arg(0).get_value()).set_value(int(value1 * value2))
+            frame.get_var(self.get_arg(0).get_slot()).set_type("int")
+            frame.get_var(self.get_arg(0).get_slot()).set_value(int(value1 * value2))
             program.set_pc(program.get_pc() + 1)
 
+        # Compile MUL instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            value2 = compile_typed_symb(self, program, 2, "int")
+            value1 = compile_typed_symb(self, program, 1, "int")
+            result = compile_var(self, program, 0, False)
+            def mul(program):
+                v2 = value2(program)
+                v1 = value1(program)
+                var = result(program)
+                var._type = "int"
+                var._value = int(v1 * v2)
+                return next_pc
+            return mul
+
+        # Transpile MUL instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            value2 = gen.typed(self, 2, "int")
+            value1 = gen.typed(self, 1, "int")
+            gen.assign(gen.result(self, 0), "'int'", f"{value1} * {value2}")
+
+        # Fold MUL instruction with constant operands
+        # @param symbs Constant arguments of instruction
+        # @return Tuple of type and value of result, None if instruction can't be folded
+        def fold(self, symbs):
+            if symbs[0].get_type() == "int" and symbs[1].get_type() == "int":
+                return ("int", int(symbs[0].get_value() * symbs[1].get_value()))
+
     class Idiv(Instruction):
+        __slots__ = ()
+
         # Execute IDIV instruction
         # @param program Program object
         def execute(self, program):
@@ -610,11 +1575,49 @@ class Program:
             value1 = check_selected_type_arg(self, program, 1, "int")
             # Check if variable is declared and set its value to quotient of arguments
             frame = check_frame_declare(self, program, 0)
-            frame.get_var(self.get_arg(0).get_value()).set_type("int")
-            frame.get_var(self.get_arg(0).get_value()).set_value(int(value1 / value2))
+            frame.get_var(self.get_arg(0).get_slot()).set_type("int")
+            frame.get_var(self.get_arg(0).get_slot()).set_value(int(value1 / value2))
             program.set_pc(program.get_pc() + 1)
 
+        # Compile IDIV instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            value2 = compile_typed_symb(self, program, 2, "int")
+            value1 = compile_typed_symb(self, program, 1, "int")
+            result = compile_var(self, program, 0, False)
+            def idiv(program):
+                v2 = value2(program)
+                if v2 == 0:
+                    print_error(self, "Division by zero", 57)
+                v1 = value1(program)
+                var = result(program)
+                var._type = "int"
+                var._value = int(v1 / v2)
+                return next_pc
+            return idiv
+
+        # Transpile IDIV instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            value2 = gen.typed(self, 2, "int")
+            if self.get_arg(2).get_type() == "var" or self.get_arg(2).get_value() == 0:
+                gen.check(self, f"{value2} == 0", "Division by zero", 57)
+            value1 = gen.typed(self, 1, "int")
+            gen.assign(gen.result(self, 0), "'int'", f"int({value1} / {value2})")
+
+        # Fold IDIV instruction with constant operands
+        # @param symbs Constant arguments of instruction
+        # @return Tuple of type and value of result, None if instruction can't be folded
+        def fold(self, symbs):
+            if symbs[0].get_type() == "int" and symbs[1].get_type() == "int" and symbs[1].get_value() != 0:
+                return ("int", int(symbs[0].get_value() / symbs[1].get_value()))
+
     class Lt(Instruction):
+        __slots__ = ()
+
         # Execute LT instruction
         # @param program Program object
         def execute(self, program):
@@ -628,12 +1631,60 @@ class Program:
                 print_error(self, "Arguments are not the same type", 53)
             # Check if variable is declared and set its value to True if arg1 < arg2
             frame = check_frame_declare(self, program, 0)
-            result_var = frame.get_var(self.get_arg(0).get_value())
+            result_var = frame.get_var(self.get_arg(0).get_slot())
             result_var.set_type("bool")
             result_var.set_value(arg1_val < arg2_val)
             program.set_pc(program.get_pc() + 1)
 
+        # Compile LT instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            symb1 = compile_symb(self, program, 1)
+            symb2 = compile_symb(self, program, 2)
+            result = compile_var(self, program, 0, False)
+            if known_ordered(self, program):
+                value1 = compile_value(self, program, 1)
+                value2 = compile_value(self, program, 2)
+                def lt(program):
+                    v1 = value1(program)
+                    v2 = value2(program)
+                    var = result(program)
+                    var._type = "bool"
+                    var._value = v1 < v2
+                    return next_pc
+                return lt
+            def lt(program):
+                arg1 = symb1(program)
+                arg2 = symb2(program)
+                if arg1._type == "nil" or arg2._type == "nil":
+                    print_error(self, "Wrong type of argument, argument can't be nil", 53)
+                if arg1._type != arg2._type:
+                    print_error(self, "Arguments are not the same type", 53)
+                var = result(program)
+                var._type = "bool"
+                var._value = arg1._value < arg2._value
+                return next_pc
+            return lt
+
+        # Transpile LT instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            value1, value2 = gen.ordered(self)
+            gen.assign(gen.result(self, 0), "'bool'", f"{value1} < {value2}")
+
+        # Fold LT instruction with constant operands
+        # @param symbs Constant arguments of instruction
+        # @return Tuple of type and value of result, None if instruction can't be folded
+        def fold(self, symbs):
+            if symbs[0].get_type() == symbs[1].get_type() != "nil":
+                return ("bool", symbs[0].get_value() < symbs[1].get_value())
+
     class Gt(Instruction):
+        __slots__ = ()
+
         # Execute GT instruction
         # @param program Program object
         def execute(self, program):
@@ -647,12 +1698,60 @@ class Program:
                 print_error(self, "Arguments are not the same type", 53)
             # Check if variable is declared and set its value to True if arg1 > arg2
             frame = check_frame_declare(self, program, 0)
-            result_var = frame.get_var(self.get_arg(0).get_value())
+            result_var = frame.get_var(self.get_arg(0).get_slot())
             result_var.set_type("bool")
             result_var.set_value(arg1_val > arg2_val)
             program.set_pc(program.get_pc() + 1)
 
+        # Compile GT instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            symb1 = compile_symb(self, program, 1)
+            symb2 = compile_symb(self, program, 2)
+            result = compile_var(self, program, 0, False)
+            if known_ordered(self, program):
+                value1 = compile_value(self, program, 1)
+                value2 = compile_value(self, program, 2)
+                def gt(program):
+                    v1 = value1(program)
+                    v2 = value2(program)
+                    var = result(program)
+                    var._type = "bool"
+                    var._value = v1 > v2
+                    return next_pc
+                return gt
+            def gt(program):
+                arg1 = symb1(program)
+                arg2 = symb2(program)
+                if arg1._type == "nil" or arg2._type == "nil":
+                    print_error(self, "Wrong type of argument, argument can't be nil", 53)
+                if arg1._type != arg2._type:
+                    print_error(self, "Arguments are not the same type", 53)
+                var = result(program)
+                var._type = "bool"
+                var._value = arg1._value > arg2._value
+                return next_pc
+            return gt
+
+        # Transpile GT instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            value1, value2 = gen.ordered(self)
+            gen.assign(gen.result(self, 0), "'bool'", f"{value1} > {value2}")
+
+        # Fold GT instruction with constant operands
+        # @param symbs Constant arguments of instruction
+        # @return Tuple of type and value of result, None if instruction can't be folded
+        def fold(self, symbs):
+            if symbs[0].get_type() == symbs[1].get_type() != "nil":
+                return ("bool", symbs[0].get_value() > symbs[1].get_value())
+
     class Eq(Instruction):
+        __slots__ = ()
+
         # Execute EQ instruction
         # @param program Program object
         def execute(self, program):
@@ -666,12 +1765,58 @@ class Program:
                 print_error(self, "Arguments are not the same type and neither is nil", 53)
             # Check if variable is declared and set its value to True if arg1 == arg2
             frame = check_frame_declare(self, program, 0)
-            result_var = frame.get_var(self.get_arg(0).get_value())
+            result_var = frame.get_var(self.get_arg(0).get_slot())
             result_var.set_type("bool")
             result_var.set_value(arg1_val == arg2_val)
             program.set_pc(program.get_pc() + 1)
 
+        # Compile EQ instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            symb1 = compile_symb(self, program, 1)
+            symb2 = compile_symb(self, program, 2)
+            result = compile_var(self, program, 0, False)
+            if known_equatable(self, program):
+                value1 = compile_value(self, program, 1)
+                value2 = compile_value(self, program, 2)
+                def eq(program):
+                    v1 = value1(program)
+                    v2 = value2(program)
+                    var = result(program)
+                    var._type = "bool"
+                    var._value = v1 == v2
+                    return next_pc
+                return eq
+            def eq(program):
+                arg1 = symb1(program)
+                arg2 = symb2(program)
+                if arg1._type != arg2._type and arg1._type != "nil" and arg2._type != "nil":
+                    print_error(self, "Arguments are not the same type and neither is nil", 53)
+                var = result(program)
+                var._type = "bool"
+                var._value = arg1._value == arg2._value
+                return next_pc
+            return eq
+
+        # Transpile EQ instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            value1, value2 = gen.equatable(self, "Arguments are not the same type and neither is nil")
+            gen.assign(gen.result(self, 0), "'bool'", f"{value1} == {value2}")
+
+        # Fold EQ instruction with constant operands
+        # @param symbs Constant arguments of instruction
+        # @return Tuple of type and value of result, None if instruction can't be folded
+        def fold(self, symbs):
+            if symbs[0].get_type() == symbs[1].get_type() or "nil" in (symbs[0].get_type(), symbs[1].get_type()):
+                return ("bool", symbs[0].get_value() == symbs[1].get_value())
+
     class And(Instruction):
+        __slots__ = ()
+
         # Execute AND instruction
         # @param program Program object
         def execute(self, program):
@@ -680,11 +1825,45 @@ class Program:
             value1 = check_selected_type_arg(self, program, 1, "bool")
             # Check if variable is declared and set its value to logical AND of arguments
             frame = check_frame_declare(self, program, 0)
-            frame.get_var(self.get_arg(0).get_value()).set_type("bool")
-            frame.get_var(self.get_arg(0).get_value()).set_value(value1 and value2)
+            frame.get_var(self.get_arg(0).get_slot()).set_type("bool")
+            frame.get_var(self.get_arg(0).get_slot()).set_value(value1 and value2)
             program.set_pc(program.get_pc() + 1)
 
+        # Compile AND instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            value2 = compile_typed_symb(self, program, 2, "bool")
+            value1 = compile_typed_symb(self, program, 1, "bool")
+            result = compile_var(self, program, 0, False)
+            def and_(program):
+                v2 = value2(program)
+                v1 = value1(program)
+                var = result(program)
+                var._type = "bool"
+                var._value = v1 and v2
+                return next_pc
+            return and_
+
+        # Transpile AND instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            value2 = gen.typed(self, 2, "bool")
+            value1 = gen.typed(self, 1, "bool")
+            gen.assign(gen.result(self, 0), "'bool'", f"{value1} and {value2}")
+
+        # Fold AND instruction with constant operands
+        # @param symbs Constant arguments of instruction
+        # @return Tuple of type and value of result, None if instruction can't be folded
+        def fold(self, symbs):
+            if symbs[0].get_type() == "bool" and symbs[1].get_type() == "bool":
+                return ("bool", symbs[0].get_value() and symbs[1].get_value())
+
     class Or(Instruction):
+        __slots__ = ()
+
         # Execute OR instruction
         # @param program Program object
         def execute(self, program):
@@ -693,11 +1872,45 @@ class Program:
             value1 = check_selected_type_arg(self, program, 1, "bool")
             # Check if variable is declared and set its value to logical OR of arguments
             frame = check_frame_declare(self, program, 0)
-            frame.get_var(self.get_arg(0).get_value()).set_type("bool")
-            frame.get_var(self.get_arg(0).get_value()).set_value(value1 or value2)
+            frame.get_var(self.get_arg(0).get_slot()).set_type("bool")
+            frame.get_var(self.get_arg(0).get_slot()).set_value(value1 or value2)
             program.set_pc(program.get_pc() + 1)
 
+        # Compile OR instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            value2 = compile_typed_symb(self, program, 2, "bool")
+            value1 = compile_typed_symb(self, program, 1, "bool")
+            result = compile_var(self, program, 0, False)
+            def or_(program):
+                v2 = value2(program)
+                v1 = value1(program)
+                var = result(program)
+                var._type = "bool"
+                var._value = v1 or v2
+                return next_pc
+            return or_
+
+        # Transpile OR instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            value2 = gen.typed(self, 2, "bool")
+            value1 = gen.typed(self, 1, "bool")
+            gen.assign(gen.result(self, 0), "'bool'", f"{value1} or {value2}")
+
+        # Fold OR instruction with constant operands
+        # @param symbs Constant arguments of instruction
+        # @return Tuple of type and value of result, None if instruction can't be folded
+        def fold(self, symbs):
+            if symbs[0].get_type() == "bool" and symbs[1].get_type() == "bool":
+                return ("bool", symbs[0].get_value() or symbs[1].get_value())
+
     class Str2int(Instruction):
+        __slots__ = ()
+
         # Execute STR2INT instruction
         # @param program Program object
         def execute(self, program):
@@ -708,29 +1921,118 @@ class Program:
             value = check_selected_type_arg(self, program, 1, "string")
             # Check if variable is declared and set its value to int value of char at index
             frame = check_frame_declare(self, program, 0)
-            frame.get_var(self.get_arg(0).get_value()).set_type("int")
+            frame.get_var(self.get_arg(0).get_slot()).set_type("int")
             try:
-                frame.get_var(self.get_arg(0).get_value()).set_value(ord(value[index]))
+                frame.get_var(self.get_arg(0).get_slot()).set_value(ord(value[index]))
             except IndexError:
                 print_error(self, "Index out of range", 58)
             except ValueError:
                 print_error(self, "Invalid value of argument", 58)
             program.set_pc(program.get_pc() + 1)
-            
-    class Concat(Instruction):
-        # Execute CONCAT instruction
+
+        # Compile STRI2INT instruction
         # @param program Program object
-        def execute(self, program):
-            # Check both arguments
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            value2 = compile_typed_symb(self, program, 2, "int")
+            value1 = compile_typed_symb(self, program, 1, "string")
+            result = compile_var(self, program, 0, False)
+            def stri2int(program):
+                index = value2(program)
+                if index < 0:
+                    print_error(self, "Index value of index", 58)
+                value = value1(program)
+                var = result(program)
+                var._type = "int"
+                try:
+                    var._value = ord(value[index])
+                except IndexError:
+                    print_error(self, "Index out of range", 58)
+                except ValueError:
+                    print_error(self, "Invalid value of argument", 58)
+                return next_pc
+            return stri2int
+
+        # Transpile STRI2INT instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            index = gen.typed(self, 2, "int")
+            gen.check(self, f"{index} < 0", "Index value of index", 58)
+            value = gen.typed(self, 1, "string")
+            dest = gen.result(self, 0)
+            gen.begin("try:")
+            gen.emit(f"{dest[1]} = ord({value}[{index}])")
+            gen.end()
+            gen.begin("except IndexError:")
+            gen.error(self, "Index out of range", 58)
+            gen.end()
+            gen.begin("except ValueError:")
+            gen.error(self, "Invalid value of argument", 58)
+            gen.end()
+            gen.emit(f"{dest[0]} = 'int'")
+
+        # Fold STRI2INT instruction with constant operands
+        # @param symbs Constant arguments of instruction
+        # @return Tuple of type and value of result, None if instruction can't be folded
+        def fold(self, symbs):
+            if symbs[0].get_type() == "string" and symbs[1].get_type() == "int" \
+                    and 0 <= symbs[1].get_value() < len(symbs[0].get_value()):
+                return ("int", ord(symbs[0].get_value()[symbs[1].get_value()]))
+
+    class Concat(Instruction):
+        __slots__ = ()
+
+        # Execute CONCAT instruction
+        # @param program Program object
+        def execute(self, program):
+            # Check both arguments
             value2 = check_selected_type_arg(self, program, 2, "string")
             value1 = check_selected_type_arg(self, program, 1, "string")
             # Check if variable is declared and set its value to concatenation of arguments
             frame = check_frame_declare(self, program, 0)
-            frame.get_var(self.get_arg(0).get_value()).set_type("string")
-            frame.get_var(self.get_arg(0).get_value()).set_value(value1 + value2)
+            frame.get_var(self.get_arg(0).get_slot()).concat(value1, value2)
             program.set_pc(program.get_pc() + 1)
 
+        # Compile CONCAT instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            value2 = compile_typed_symb(self, program, 2, "string")
+            value1 = compile_typed_symb(self, program, 1, "string")
+            result = compile_var(self, program, 0, False)
+            def concat(program):
+                v2 = value2(program)
+                v1 = value1(program)
+                result(program).concat(v1, v2)
+                return next_pc
+            return concat
+
+        # Transpile CONCAT instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            # Variable in frame is extended in place, global variable in locals is extended by str
+            in_frame = not gen.is_local(self.get_arg(0))
+            value2 = gen.typed(self, 2, "string", in_frame)
+            value1 = gen.typed(self, 1, "string", in_frame)
+            if in_frame:
+                gen.emit(f"{gen.var(self, 0, False)}.concat({value1}, {value2})")
+            else:
+                gen.assign(gen.result(self, 0), "'string'", f"{value1} + {value2}")
+
+        # Fold CONCAT instruction with constant operands
+        # @param symbs Constant arguments of instruction
+        # @return Tuple of type and value of result, None if instruction can't be folded
+        def fold(self, symbs):
+            if symbs[0].get_type() == "string" and symbs[1].get_type() == "string":
+                return ("string", symbs[0].get_value() + symbs[1].get_value())
+
     class Getchar(Instruction):
+        __slots__ = ()
+
         # Execute GETCHAR instruction
         # @param program Program object
         def execute(self, program):
@@ -741,36 +2043,122 @@ class Program:
             value = check_selected_type_arg(self, program, 1, "string")
             # Check if variable is declared and set its value to char at index
             frame = check_frame_declare(self, program, 0)
-            frame.get_var(self.get_arg(0).get_value()).set_type("string")
+            frame.get_var(self.get_arg(0).get_slot()).set_type("string")
             try:
-                frame.get_var(self.get_arg(0).get_value()).set_value(value[index])
+                frame.get_var(self.get_arg(0).get_slot()).set_value(value[index])
             except IndexError:
                 print_error(self, "Index out of range", 58)
             program.set_pc(program.get_pc() + 1)
 
+        # Compile GETCHAR instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            value2 = compile_typed_symb(self, program, 2, "int")
+            value1 = compile_typed_symb(self, program, 1, "string")
+            result = compile_var(self, program, 0, False)
+            def getchar(program):
+                index = value2(program)
+                if index < 0:
+                    print_error(self, "Invalid value of index", 58)
+                value = value1(program)
+                var = result(program)
+                var._type = "string"
+                try:
+                    var._value = value[index]
+                except IndexError:
+                    print_error(self, "Index out of range", 58)
+                return next_pc
+            return getchar
+
+        # Transpile GETCHAR instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            index = gen.typed(self, 2, "int")
+            gen.check(self, f"{index} < 0", "Invalid value of index", 58)
+            value = gen.typed(self, 1, "string")
+            dest = gen.result(self, 0)
+            gen.begin("try:")
+            gen.emit(f"{dest[1]} = {value}[{index}]")
+            gen.end()
+            gen.begin("except IndexError:")
+            gen.error(self, "Index out of range", 58)
+            gen.end()
+            gen.emit(f"{dest[0]} = 'string'")
+
+        # Fold GETCHAR instruction with constant operands
+        # @param symbs Constant arguments of instruction
+        # @return Tuple of type and value of result, None if instruction can't be folded
+        def fold(self, symbs):
+            if symbs[0].get_type() == "string" and symbs[1].get_type() == "int" \
+                    and 0 <= symbs[1].get_value() < len(symbs[0].get_value()):
+                return ("string", symbs[0].get_value()[symbs[1].get_value()])
+
     class Setchar(Instruction):
+        __slots__ = ()
+
         # Execute SETCHAR instruction
         # @param program Program object
         def execute(self, program):
             # Check both arguments
             char = check_selected_type_arg(self, program, 2, "string")
-            if char == "":
+            # char can be string buffer, so its length is checked
+            if len(char) == 0:
                 print_error(self, "Empty character", 58)
             index = check_selected_type_arg(self, program, 1, "int")
             # Check if variable is declared and replaces character at index with char
             frame = check_frame_both(self, program, 0)
-            arg_val = self.get_arg(0).get_value()
+            arg_val = self.get_arg(0).get_slot()
             if frame.get_var(arg_val).get_type() != "string":
                 print_error(self, "Wrong type of argument, argument is not a string", 53)
-            if len(frame.get_var(arg_val).get_value()) <= index or index < 0:
+            if len(frame.get_var(arg_val).get_string()) <= index or index < 0:
                 print_error(self, "Index out of range", 58)
             try:
-                frame.get_var(self.get_arg(0).get_value()).set_char(char, index)
+                frame.get_var(self.get_arg(0).get_slot()).set_char(char, index)
             except IndexError:
                 print_error(self, "Index out of range", 58)
             program.set_pc(program.get_pc() + 1)
 
+        # Compile SETCHAR instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            value2 = compile_typed_symb(self, program, 2, "string")
+            value1 = compile_typed_symb(self, program, 1, "int")
+            result = compile_var(self, program, 0, buffered=True)
+            def setchar(program):
+                char = value2(program)
+                if len(char) == 0:
+                    print_error(self, "Empty character", 58)
+                index = value1(program)
+                var = result(program)
+                if var._type != "string":
+                    print_error(self, "Wrong type of argument, argument is not a string", 53)
+                if len(var._value) <= index or index < 0:
+                    print_error(self, "Index out of range", 58)
+                var.set_char(char, index)
+                return next_pc
+            return setchar
+
+        # Transpile SETCHAR instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            # Result variable is never kept in locals, it is edited in place (see Transpiler.choose_locals)
+            char = gen.typed(self, 2, "string")
+            gen.check(self, f"len({char}) == 0", "Empty character", 58)
+            index = gen.typed(self, 1, "int")
+            var = gen.var(self, 0, buffered=True)
+            gen.check(self, f"{var}._type != 'string'", "Wrong type of argument, argument is not a string", 53)
+            gen.check(self, f"len({var}._value) <= {index} or {index} < 0", "Index out of range", 58)
+            gen.emit(f"{var}.set_char({char}, {index})")
+
     class Read(Instruction):
+        __slots__ = ()
+
         # Execute READ instruction
         # @param program Program object
         def execute(self, program):
@@ -778,7 +2166,7 @@ class Program:
             value = check_selected_type_arg(self, program, 1, "type")
             # Check if variable is declared and set its value to input based on type
             frame = check_frame_declare(self, program, 0)
-            var = frame.get_var(self.get_arg(0).get_value())
+            var = frame.get_var(self.get_arg(0).get_slot())
             try:
                 line = input.readline()
                 if line == "":
@@ -801,7 +2189,30 @@ class Program:
                 var.set_value(None)
             program.set_pc(program.get_pc() + 1)
 
+        # Compile READ instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            type = self.get_arg(1).get_value()
+            result = compile_var(self, program, 0, False)
+            def read(program):
+                var = result(program)
+                var._type, var._value = read_value(type)
+                return next_pc
+            return read
+
+        # Transpile READ instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            type = self.get_arg(1).get_value()
+            dest = gen.result(self, 0)
+            gen.emit(f"{dest[0]}, {dest[1]} = read_value({type!r})")
+
     class Jumpifeq(Instruction):
+        __slots__ = ()
+
         # Execute JUMPIFEQ instruction
         # @param program Program object
         def execute(self, program):
@@ -814,16 +2225,48 @@ class Program:
                 pass
             elif type1 != type2:
                 print_error(self, "Arguments are not the same type", 53)
-            # Check if label is declared and set program counter to label address if values are equal
-            arg = self.get_arg(0)
-            if arg.get_type() != "label" or program.get_label_frame().get_var(arg.get_value()) is None:
-                print_error(self, "Invalid label", 52)
+            # Set program counter to label address if values are equal
             if value1 == value2:
-                program.set_pc(program.get_label_frame().get_var(arg.get_value()).get_value())
+                program.set_pc(self.get_target())
             else:
                 program.set_pc(program.get_pc() + 1)
 
+        # Compile JUMPIFEQ instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            symb2 = compile_symb(self, program, 2)
+            symb1 = compile_symb(self, program, 1)
+            target = self.get_target()
+            if known_equatable(self, program):
+                value1 = compile_value(self, program, 1)
+                value2 = compile_value(self, program, 2)
+                def jumpifeq(program):
+                    if value1(program) == value2(program):
+                        return target
+                    return next_pc
+                return jumpifeq
+            def jumpifeq(program):
+                arg2 = symb2(program)
+                arg1 = symb1(program)
+                if arg1._type != arg2._type and arg1._type != "nil" and arg2._type != "nil":
+                    print_error(self, "Arguments are not the same type", 53)
+                if arg1._value == arg2._value:
+                    return target
+                return next_pc
+            return jumpifeq
+
+        # Transpile JUMPIFEQ instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            value1, value2 = gen.equatable(self, "Arguments are not the same type", True)
+            gen.emit(f"pc = {self.get_target()} if {value1} == {value2} else {next_pc}")
+
     class Jumpifneq(Instruction):
+        __slots__ = ()
+
         # Execute JUMPIFNEQ instruction
         # @param program Program object
         def execute(self, program):
@@ -836,51 +2279,492 @@ class Program:
                 pass
             elif type1 != type2:
                 print_error(self, "Arguments are not the same type and neither is nil", 53)
-            # Check if label is declared and set program counter to label address if values are not equal
-            arg = self.get_arg(0)
-            if arg.get_type() != "label" or program.get_label_frame().get_var(arg.get_value()) is None:
-                print_error(self, "Invalid label", 52)
+            # Set program counter to label address if values are not equal
             if value1 != value2:
-                program.set_pc(program.get_label_frame().get_var(arg.get_value()).get_value())
+                program.set_pc(self.get_target())
+            else:
+                program.set_pc(program.get_pc() + 1)
+
+        # Compile JUMPIFNEQ instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            symb2 = compile_symb(self, program, 2)
+            symb1 = compile_symb(self, program, 1)
+            target = self.get_target()
+            if known_equatable(self, program):
+                value1 = compile_value(self, program, 1)
+                value2 = compile_value(self, program, 2)
+                def jumpifneq(program):
+                    if value1(program) != value2(program):
+                        return target
+                    return next_pc
+                return jumpifneq
+            def jumpifneq(program):
+                arg2 = symb2(program)
+                arg1 = symb1(program)
+                if arg1._type != arg2._type and arg1._type != "nil" and arg2._type != "nil":
+                    print_error(self, "Arguments are not the same type and neither is nil", 53)
+                if arg1._value != arg2._value:
+                    return target
+                return next_pc
+            return jumpifneq
+
+        # Transpile JUMPIFNEQ instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            value1, value2 = gen.equatable(self, "Arguments are not the same type and neither is nil", True)
+            gen.emit(f"pc = {self.get_target()} if {value1} != {value2} else {next_pc}")
+
+    # Instruction of STACK extension, its operands are popped from data stack and its result is pushed back
+    # @note Every subclass defines operate(self, *symbs), which gets popped operands (tuples of type and value,
+    #       the first one was pushed first) and returns result as tuple of type and value
+    class StackInstruction(Instruction):
+        __slots__ = ()
+
+        # Number of operands popped from data stack
+        arity = 2
+
+        # Execute stack instruction
+        # @param program Program object
+        def execute(self, program):
+            data_stack = program._data_stack
+            symbs = pop_operands(self, data_stack, self.arity)
+            data_stack.append(self.operate(*symbs))
+            program.set_pc(program.get_pc() + 1)
+
+        # Compile stack instruction, data stack is used directly as list
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            data_stack = program._data_stack
+            operate = self.operate
+            if self.arity == 1:
+                def stack_instruction(program):
+                    if not data_stack:
+                        print_error(self, "Data stack is empty", 56)
+                    data_stack.append(operate(data_stack.pop()))
+                    return next_pc
+                return stack_instruction
+            def stack_instruction(program):
+                if len(data_stack) < 2:
+                    print_error(self, "Data stack is empty", 56)
+                symb2 = data_stack.pop()
+                data_stack.append(operate(data_stack.pop(), symb2))
+                return next_pc
+            return stack_instruction
+
+        # Transpile stack instruction, it never touches variables, so its compiled closure is called
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            gen.emit(gen.ref(self.compile(gen.program, next_pc)) + "(program)")
+
+    class Clears(StackInstruction):
+        __slots__ = ()
+
+        # Execute CLEARS instruction
+        # @param program Program object
+        def execute(self, program):
+            program._data_stack.clear()
+            program.set_pc(program.get_pc() + 1)
+
+        # Compile CLEARS instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            data_stack = program._data_stack
+            def clears(program):
+                data_stack.clear()
+                return next_pc
+            return clears
+
+        # Transpile CLEARS instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            gen.emit("data_stack.clear()")
+
+    class Adds(StackInstruction):
+        __slots__ = ()
+
+        # Compute result of ADDS instruction
+        # @param symb1 First operand
+        # @param symb2 Second operand
+        # @return Tuple of type and value of result
+        def operate(self, symb1, symb2):
+            value1, value2 = stack_typed_values(self, symb1, symb2, "int")
+            return ("int", value1 + value2)
+
+    class Subs(StackInstruction):
+        __slots__ = ()
+
+        # Compute result of SUBS instruction
+        # @param symb1 First operand
+        # @param symb2 Second operand
+        # @return Tuple of type and value of result
+        def operate(self, symb1, symb2):
+            value1, value2 = stack_typed_values(self, symb1, symb2, "int")
+            return ("int", value1 - value2)
+
+    class Muls(StackInstruction):
+        __slots__ = ()
+
+        # Compute result of MULS instruction
+        # @param symb1 First operand
+        # @param symb2 Second operand
+        # @return Tuple of type and value of result
+        def operate(self, symb1, symb2):
+            value1, value2 = stack_typed_values(self, symb1, symb2, "int")
+            return ("int", value1 * value2)
+
+    class Idivs(StackInstruction):
+        __slots__ = ()
+
+        # Compute result of IDIVS instruction
+        # @param symb1 First operand
+        # @param symb2 Second operand
+        # @return Tuple of type and value of result
+        def operate(self, symb1, symb2):
+            value1, value2 = stack_typed_values(self, symb1, symb2, "int")
+            if value2 == 0:
+                print_error(self, "Division by zero", 57)
+            return ("int", int(value1 / value2))
+
+    class Lts(StackInstruction):
+        __slots__ = ()
+
+        # Compute result of LTS instruction
+        # @param symb1 First operand
+        # @param symb2 Second operand
+        # @return Tuple of type and value of result
+        def operate(self, symb1, symb2):
+            value1, value2 = stack_ordered_values(self, symb1, symb2)
+            return ("bool", value1 < value2)
+
+    class Gts(StackInstruction):
+        __slots__ = ()
+
+        # Compute result of GTS instruction
+        # @param symb1 First operand
+        # @param symb2 Second operand
+        # @return Tuple of type and value of result
+        def operate(self, symb1, symb2):
+            value1, value2 = stack_ordered_values(self, symb1, symb2)
+            return ("bool", value1 > value2)
+
+    class Eqs(StackInstruction):
+        __slots__ = ()
+
+        # Compute result of EQS instruction
+        # @param symb1 First operand
+        # @param symb2 Second operand
+        # @return Tuple of type and value of result
+        def operate(self, symb1, symb2):
+            value1, value2 = stack_equatable_values(self, symb1, symb2)
+            return ("bool", value1 == value2)
+
+    class Ands(StackInstruction):
+        __slots__ = ()
+
+        # Compute result of ANDS instruction
+        # @param symb1 First operand
+        # @param symb2 Second operand
+        # @return Tuple of type and value of result
+        def operate(self, symb1, symb2):
+            value1, value2 = stack_typed_values(self, symb1, symb2, "bool")
+            return ("bool", value1 and value2)
+
+    class Ors(StackInstruction):
+        __slots__ = ()
+
+        # Compute result of ORS instruction
+        # @param symb1 First operand
+        # @param symb2 Second operand
+        # @return Tuple of type and value of result
+        def operate(self, symb1, symb2):
+            value1, value2 = stack_typed_values(self, symb1, symb2, "bool")
+            return ("bool", value1 or value2)
+
+    class Nots(StackInstruction):
+        __slots__ = ()
+
+        arity = 1
+
+        # Compute result of NOTS instruction
+        # @param symb Operand
+        # @return Tuple of type and value of result
+        def operate(self, symb):
+            if symb[0] != "bool":
+                print_error(self, "Wrong type of argument", 53)
+            return ("bool", not symb[1])
+
+    class Int2chars(StackInstruction):
+        __slots__ = ()
+
+        arity = 1
+
+        # Compute result of INT2CHARS instruction
+        # @param symb Operand
+        # @return Tuple of type and value of result
+        def operate(self, symb):
+            if symb[0] != "int":
+                print_error(self, "Wrong type of argument", 53)
+            try:
+                return ("string", chr(symb[1]))
+            except ValueError:
+                print_error(self, "Wrong value of variable", 58)
+
+    class Stri2ints(StackInstruction):
+        __slots__ = ()
+
+        # Compute result of STRI2INTS instruction
+        # @param symb1 String operand
+        # @param symb2 Index operand
+        # @return Tuple of type and value of result
+        def operate(self, symb1, symb2):
+            if symb2[0] != "int":
+                print_error(self, "Wrong type of argument", 53)
+            index = symb2[1]
+            if index < 0:
+                print_error(self, "Index value of index", 58)
+            if symb1[0] != "string":
+                print_error(self, "Wrong type of argument", 53)
+            try:
+                return ("int", ord(symb1[1][index]))
+            except IndexError:
+                print_error(self, "Index out of range", 58)
+
+    class Jumpifeqs(StackInstruction):
+        __slots__ = ()
+
+        # Jump is taken when popped operands are equal (JUMPIFEQS) or different (JUMPIFNEQS)
+        jump_on = True
+
+        # Execute JUMPIFEQS instruction
+        # @param program Program object
+        def execute(self, program):
+            symb1, symb2 = pop_operands(self, program._data_stack, 2)
+            value1, value2 = stack_equatable_values(self, symb1, symb2)
+            if (value1 == value2) == self.jump_on:
+                program.set_pc(self.get_target())
             else:
                 program.set_pc(program.get_pc() + 1)
 
+        # Compile JUMPIFEQS instruction
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            data_stack = program._data_stack
+            target = self.get_target()
+            jump_on = self.jump_on
+            def jumpifeqs(program):
+                if len(data_stack) < 2:
+                    print_error(self, "Data stack is empty", 56)
+                symb2 = data_stack.pop()
+                value1, value2 = stack_equatable_values(self, data_stack.pop(), symb2)
+                if (value1 == value2) == jump_on:
+                    return target
+                return next_pc
+            return jumpifeqs
+
+        # Transpile JUMPIFEQS instruction
+        # @param gen Transpiler object
+        # @param next_pc Address of next instruction
+        def transpile(self, gen, next_pc):
+            gen.emit("pc = " + gen.ref(self.compile(gen.program, next_pc)) + "(program)")
+
+    class Jumpifneqs(Jumpifeqs):
+        __slots__ = ()
+
+        jump_on = False
+
+    # Superinstruction made of two following instructions (see fuse_instructions), every part reports
+    # its errors with its own address, so the program fails the same way as without fusion
+    class Fused(Instruction):
+        __slots__ = ("_first", "_second")
+
+        # Fused instruction constructor
+        # @param first First instruction, it never jumps
+        # @param second Second instruction
+        def __init__(self, first, second):
+            super().__init__(first.get_address(), first.get_opcode() + "+" + second.get_opcode(), first.get_order())
+            self._first  : Program.Instruction = first
+            self._second : Program.Instruction = second
+
+        # Get target address of jump instruction
+        # @return Target address of the second instruction
+        def get_target(self):
+            return self._second.get_target()
+
+        # Set target address of jump instruction
+        # @param target Target address of the second instruction
+        def set_target(self, target):
+            self._second.set_target(target)
+
+        # Execute both instructions
+        # @param program Program object
+        def execute(self, program):
+            pc = program.get_pc()
+            self._first.execute(program)
+            program.set_pc(pc)
+            self._second.execute(program)
+
+        # Compile both instructions to one closure
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            first = self._first.compile(program, next_pc)
+            second = self._second.compile(program, next_pc)
+            def fused(program):
+                first(program)
+                return second(program)
+            return fused
+
+    # LT, GT or EQ followed by JUMPIFEQ or JUMPIFNEQ comparing its result with bool constant
+    class CompareBranch(Fused):
+        __slots__ = ()
+
+        # Compile comparison which jumps by its result, the result is still stored to its variable
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            compare = self._first
+            target = self._second.get_target()
+            constant = branch_constant(self._second, compare.get_arg(0))
+            # Jump when result equals to constant (JUMPIFEQ) or differs from it (JUMPIFNEQ)
+            jump_on = constant.get_value() == (self._second.get_opcode() == "JUMPIFEQ")
+            operation = COMPARISONS[compare.get_opcode()]
+            result = compile_var(compare, program, 0, False)
+            ordered = compare.get_opcode() != "EQ"
+            if known_ordered(compare, program) if ordered else known_equatable(compare, program):
+                value1 = compile_value(compare, program, 1)
+                value2 = compile_value(compare, program, 2)
+                def compare_branch(program):
+                    value = operation(value1(program), value2(program))
+                    var = result(program)
+                    var._type = "bool"
+                    var._value = value
+                    return target if value == jump_on else next_pc
+                return compare_branch
+            symb1 = compile_symb(compare, program, 1)
+            symb2 = compile_symb(compare, program, 2)
+            def compare_branch(program):
+                arg1 = symb1(program)
+                arg2 = symb2(program)
+                if ordered:
+                    if arg1._type == "nil" or arg2._type == "nil":
+                        print_error(compare, "Wrong type of argument, argument can't be nil", 53)
+                    if arg1._type != arg2._type:
+                        print_error(compare, "Arguments are not the same type", 53)
+                elif arg1._type != arg2._type and arg1._type != "nil" and arg2._type != "nil":
+                    print_error(compare, "Arguments are not the same type and neither is nil", 53)
+                value = operation(arg1._value, arg2._value)
+                var = result(program)
+                var._type = "bool"
+                var._value = value
+                return target if value == jump_on else next_pc
+            return compare_branch
+
+    # ADD or SUB of constant to variable followed by JUMPIFEQ or JUMPIFNEQ comparing it with int constant
+    class IncrementBranch(Fused):
+        __slots__ = ()
+
+        # Compile increment of variable which jumps by its new value
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        def compile(self, program, next_pc):
+            increment = self._first
+            target = self._second.get_target()
+            limit = branch_constant(self._second, increment.get_arg(0)).get_value()
+            jump_on = self._second.get_opcode() == "JUMPIFEQ"
+            step = increment.get_arg(2).get_value()
+            if increment.get_opcode() == "SUB":
+                step = -step
+            source = compile_typed_symb(increment, program, 1, "int")
+            result = compile_var(increment, program, 0, False)
+            def increment_branch(program):
+                value = source(program) + step
+                var = result(program)
+                var._type = "int"
+                var._value = value
+                return target if (value == limit) == jump_on else next_pc
+            return increment_branch
+
+    # PUSHS followed by POPS, value is moved directly without data stack
+    class PushsPops(Fused):
+        __slots__ = ()
+
+        # Compile move of value from PUSHS argument to POPS variable
+        # @param program Program object
+        # @param next_pc Address of next instruction
+        # @return Compiled instruction
+        # @note Unlike MOVE, the source is checked first and the variable is changed in place, as POPS does
+        def compile(self, program, next_pc):
+            source = compile_symb(self._first, program, 0)
+            result = compile_var(self._second, program, 0, False)
+            def pushs_pops(program):
+                data = source(program)
+                var = result(program)
+                var._type = data._type
+                var._value = data.get_value()
+                return next_pc
+            return pushs_pops
+
     class Frame:
+        __slots__ = ("vars", "_shape", "_type")
+
         # Frame constructor
-        def __init__(self,type):
-            self.vars   : dict      = {}
+        # @param type Type of frame
+        # @param shape Names of variables by their slot (see resolve_slots)
+        def __init__(self, type, shape=()):
+            self.vars   : list      = [None] * len(shape)
+            self._shape : list      = shape
             self._type  : TypeFrame = type
 
+        # Remove all variables from frame, so it can be used again
+        def clear(self):
+            self.vars[:] = (None,) * len(self.vars)
+
         # Add variable to frame
-        # @param var_value Variable value
+        # @param slot Slot of variable
         # @param type Variable type
-        def add_var(self, var_value, type=None):
-            self.vars[var_value] = self.Var(type)
+        def add_var(self, slot, type=None):
+            self.vars[slot] = self.Var(type)
 
         # Get variable from frame
-        # @param var_value Variable value
-        # @return Variable object
-        def get_var(self, var_value):
-            if var_value in self.vars:
-                return self.vars[var_value]
-            return None
+        # @param slot Slot of variable
+        # @return Variable object, None if variable is not declared
+        def get_var(self, slot):
+            return self.vars[slot]
 
         # Set variable in frame
-        # @param var_value Variable value
+        # @param slot Slot of variable
         # @param var Variable object
-        def set_var(self, var_value, var):
-            self.vars[var_value] = var
+        def set_var(self, slot, var):
+            self.vars[slot] = var
         
         # Print frame
         def print(self):
-            for var in self.vars:
-                print("-> type: " + self.vars[var].get_type() + ", [\"" + var + "\" : " + str(self.vars[var].get_value()) + "]")
+            for slot, var in enumerate(self.vars):
+                if var is not None:
+                    print("-> type: " + var.get_type() + ", [\"" + self._shape[slot] + "\" : " + str(var.get_value()) + "]", file=sys.stderr)
 
         # for debugging
         def __str__(self):
             return f"{self.vars}"
 
         class Var:
+            __slots__ = ("_type", "_value")
+
             # Variable constructor
             def __init__(self, type=None, value=None):
                 self._type  : str = type
@@ -903,7 +2787,15 @@ class Program:
 
             # Get variable value
             # @return Variable value
+            # @note String buffer is materialized, so the value can be used as str
             def get_value(self):
+                if self._value.__class__ is StringBuffer:
+                    self._value = str(self._value)
+                return self._value
+
+            # Get value of string variable as it is stored
+            # @return str or StringBuffer, only for instructions which work with both
+            def get_string(self):
                 return self._value
 
             # Set variable value
@@ -911,65 +2803,143 @@ class Program:
             def set_value(self, value):
                 self._value = value
 
+            # Check if variable is defined
+            # @return True if variable has value (nil is value too)
+            def is_defined(self):
+                return self._value is not None or self._type == "nil"
+
             # Sets (replaces) character at index with char
             # @param char Character to be set
             # @param index Index of character to be replaced
             def set_char(self, char, index):
                 char = char[0] if len(char) > 0 else ""
-                self._value = self._value[:index] + char + self._value[index+1:]
+                if self._value.__class__ is not StringBuffer:
+                    self._value = StringBuffer(self._value)
+                self._value.set_char(char, index)
+
+            # Sets value to concatenation of strings
+            # @param first First string
+            # @param second Second string
+            # @note When first string is value of this variable, it is extended in place
+            def concat(self, first, second):
+                if self._value is first:
+                    if first.__class__ is not StringBuffer:
+                        self._value = StringBuffer(first)
+                    self._value.append(second)
+                else:
+                    self._value = str(first) + str(second)
+                self._type = "string"
 
             def __str__(self):
                 return f"{self._value}"
 
+    # Maps opcode to specific instruction child class, used when the program is generated
+    opcode_to_class = {
+        "MOVE": Move,
+        "NOT": Not,
+        "INT2CHAR": Int2char,
+        "STRLEN": Strlen,
+        "TYPE": Type,
+        "CREATEFRAME": Createframe,
+        "PUSHFRAME": Pushframe,
+        "POPFRAME": Popframe,
+        "RETURN": Return,
+        "BREAK": Break,
+        "DEFVAR": Defvar,
+        "POPS": Pops,
+        "CALL": Call,
+        "LABEL": Label,
+        "JUMP": Jump,
+        "PUSHS": Pushs,
+        "WRITE": Write,
+        "EXIT": Exit,
+        "DPRINT": Dprint,
+        "ADD": Add,
+        "SUB": Sub,
+        "MUL": Mul,
+        "IDIV": Idiv,
+        "LT": Lt,
+        "GT": Gt,
+        "EQ": Eq,
+        "AND": And,
+        "OR": Or,
+        "STRI2INT": Str2int,
+        "CONCAT": Concat,
+        "GETCHAR": Getchar,
+        "SETCHAR": Setchar,
+        "READ": Read,
+        "JUMPIFEQ": Jumpifeq,
+        "JUMPIFNEQ": Jumpifneq,
+        "CLEARS": Clears,
+        "ADDS": Adds,
+        "SUBS": Subs,
+        "MULS": Muls,
+        "IDIVS": Idivs,
+        "LTS": Lts,
+        "GTS": Gts,
+        "EQS": Eqs,
+        "ANDS": Ands,
+        "ORS": Ors,
+        "NOTS": Nots,
+        "INT2CHARS": Int2chars,
+        "STRI2INTS": Stri2ints,
+        "JUMPIFEQS": Jumpifeqs,
+        "JUMPIFNEQS": Jumpifneqs
+    }
+
 # Types of frames
 class TypeFrame(Enum):
     GLOBAL = 0
     LOCAL = 1
     TEMP = 2
-    LABEL = 3
-
-# Types of stacks
-class TypeStack(Enum):
-    DATA = 0
-    CALL = 1
-    FRAME = 2
 
 # Parsing script arguments
-# @return tuple of xml_root and input data
+# @return tuple of source (path or binary file object), input data and parsed script arguments
 def parse_sc_args():
     sc_args = argparse.ArgumentParser(description="Interprets code in XML format")
     sc_args.add_argument("-s","--source", type=str)
     sc_args.add_argument("-i","--input", type=str)
+    sc_args.add_argument("-e","--engine", choices=["class", "closure", "transpile"], default="class",
+                         help="execution engine, closure compiles instructions before running, "
+                              "transpile translates program to Python source")
+    sc_args.add_argument("-c","--compile", type=str, metavar="FILE",
+                         help="only check the source and save it as compiled program (.ippb) to FILE")
+    sc_args.add_argument("--cache-dir", type=str, metavar="DIR",
+                         help="directory with compiled programs keyed by hash of the source")
+    sc_args.add_argument("-O","--optimize", action="store_true",
+                         help="fold constants and optimize instructions using static analysis of the program "
+                              "(runtime checks are left out by closure and transpile engines, instructions are fused only by closure engine)")
+    sc_args.add_argument("--jit", type=int, nargs="?", const=JIT_THRESHOLD, metavar="THRESHOLD",
+                         help="record and compile hot loops of class engine, loop is hot after THRESHOLD "
+                              f"backward jumps to it (default {JIT_THRESHOLD})")
+    sc_args.add_argument("--max-call-depth", type=int, metavar="DEPTH",
+                         help="end the program with error 99 when calls are nested deeper than DEPTH")
+    sc_args.add_argument("--inline-size", type=int, default=INLINE_SIZE, metavar="SIZE",
+                         help="with -O, inline subroutines of at most SIZE instructions without jumps and calls "
+                              f"at their CALL sites (default {INLINE_SIZE})")
+    sc_args.add_argument("--stats", action="store_true",
+                         help="print statistics of optimizations and of the run (like peak call depth) to stderr "
+                              "when the program ends")
+    sc_args.add_argument("--output-buffer", type=int, metavar="SIZE", default=OUTPUT_BUFFER_SIZE,
+                         help="size of output buffer in characters, 0 writes output immediately")
     sc_args_parsed = sc_args.parse_args()
     source = None; input = None
     if sc_args_parsed.source is None and sc_args_parsed.input is None:
         print("ERROR: No source file or input file specified", file=sys.stderr)
         exit(10)
     elif sc_args_parsed.source is None:
-        # load source from stdin
-        source = sys.stdin.read()
+        # load source from stdin, it is parsed as a stream by load_program
+        source = sys.stdin.buffer
     elif sc_args_parsed.input is None:
         # load input from stdin
         input = sys.stdin
 
     if source is None:
         if os.path.isfile(sc_args_parsed.source):
-            source_file = open(sc_args_parsed.source, "r")
-            try:    
-                xml = ET.parse(source_file)
-            except ET.ParseError:
-                print("ERROR: Invalid XML format", file=sys.stderr)
-                exit(31)
-            xml_root = xml.getroot()
+            source = sc_args_parsed.source
         else:
             print("ERROR: Source file doesn't exists", file=sys.stderr)
             exit(11)
-    else:
-        try:
-            xml_root = ET.fromstring(source)
-        except ET.ParseError:
-            print("ERROR: Invalid XML format", file=sys.stderr)
-            exit(31)
 
     if input is None:
         if os.path.isfile(sc_args_parsed.input):
@@ -978,14 +2948,14 @@ def parse_sc_args():
         else:
             print("ERROR: Input file doesn't exists", file=sys.stderr)
             exit(11)
-    return (xml_root, input)
+    return (source, input, sc_args_parsed)
 
 # Checks if given variable already exists
 # @param instruction Instruction to be checked
 # @param frame Frame of given variable
 # @param arg_index Index of argument to be checked
 def check_var_exists(instruction, frame, arg_index):
-    if instruction.get_arg(arg_index).get_value() in frame.vars:
+    if frame.vars[instruction.get_arg(arg_index).get_slot()] is not None:
         print_error(instruction, "Variable already declared", 52)
 
 # Checks if variable is declared
@@ -993,7 +2963,7 @@ def check_var_exists(instruction, frame, arg_index):
 # @param frame Frame of given variable
 # @param arg_index Index of argument to be checked
 def check_var_declaration(instruction, frame, arg_index):
-    if instruction.get_arg(arg_index).get_value() not in frame.vars:
+    if frame.vars[instruction.get_arg(arg_index).get_slot()] is None:
         print_error(instruction, "Variable not declared", 54)
 
 # Checks if variable is defined
@@ -1001,9 +2971,7 @@ def check_var_declaration(instruction, frame, arg_index):
 # @param frame Frame of given variable
 # @param arg_index Index of argument to be checked
 def check_var_definition(instruction, frame, arg_index):
-    if frame.vars[instruction.get_arg(arg_index).get_value()].get_type() == "nil":
-        return
-    if frame.vars[instruction.get_arg(arg_index).get_value()].get_value() is None:
+    if not frame.vars[instruction.get_arg(arg_index).get_slot()].is_defined():
         print_error(instruction, "Variable not defined", 56)
 
 # Function looks for variable in given frame, checks if it is declared and returns given frame
@@ -1054,6 +3022,9 @@ def check_frame_both(instruction, program, arg_index):
 # @param error_msg Error message
 # @param error_code Error code
 def print_error(instruction, error_msg, error_code):
+    # Output written so far has to come before the error message
+    if output is not None:
+        output.flush()
     print("ERROR on line: " + str(instruction.get_address()+1), file=sys.stderr)
     print("ERROR: " + error_msg, file=sys.stderr)
     exit(error_code)
@@ -1066,13 +3037,813 @@ def print_error(instruction, error_msg, error_code):
 def check_selected_type_arg(self, program, arg_index, type):
     if self.get_arg(arg_index).get_type() == "var":
         frame = check_frame_both(self, program, arg_index)
-        if frame.get_var(self.get_arg(arg_index).get_value()).get_type() != type:
+        if frame.get_var(self.get_arg(arg_index).get_slot()).get_type() != type:
             print_error(self, "Wrong type of argument", 53)
-        return frame.get_var(self.get_arg(arg_index).get_value()).get_value()
+        if type == "string":
+            # string instructions work with string buffer as well
+            return frame.get_var(self.get_arg(arg_index).get_slot()).get_string()
+        return frame.get_var(self.get_arg(arg_index).get_slot()).get_value()
     elif self.get_arg(arg_index).get_type() != type:
         print_error(self, "Wrong type of argument", 53)
     return self.get_arg(arg_index).get_value()
 
+# Pops operands of stack instruction from data stack
+# @param instr Instruction object
+# @param data_stack Data stack
+# @param count Number of operands
+# @return List of operands, the first one was pushed first
+def pop_operands(instr, data_stack, count):
+    if len(data_stack) < count:
+        print_error(instr, "Data stack is empty", 56)
+    symbs = data_stack[-count:]
+    del data_stack[-count:]
+    return symbs
+
+# Checks if both operands of stack instruction are of selected type and returns their values
+# @param instr Instruction object
+# @param symb1 First operand
+# @param symb2 Second operand
+# @param type Type of operands
+# @return Tuple of values of operands
+def stack_typed_values(instr, symb1, symb2, type):
+    if symb1[0] != type or symb2[0] != type:
+        print_error(instr, "Wrong type of argument", 53)
+    return (symb1[1], symb2[1])
+
+# Checks if operands of LTS or GTS can be compared and returns their values
+# @param instr Instruction object
+# @param symb1 First operand
+# @param symb2 Second operand
+# @return Tuple of values of operands
+def stack_ordered_values(instr, symb1, symb2):
+    if symb1[0] == "nil" or symb2[0] == "nil":
+        print_error(instr, "Wrong type of argument, argument can't be nil", 53)
+    if symb1[0] != symb2[0]:
+        print_error(instr, "Arguments are not the same type", 53)
+    return (symb1[1], symb2[1])
+
+# Checks if operands of EQS, JUMPIFEQS or JUMPIFNEQS can be compared for equality and returns their values
+# @param instr Instruction object
+# @param symb1 First operand
+# @param symb2 Second operand
+# @return Tuple of values of operands
+def stack_equatable_values(instr, symb1, symb2):
+    if symb1[0] != symb2[0] and symb1[0] != "nil" and symb2[0] != "nil":
+        print_error(instr, "Arguments are not the same type and neither is nil", 53)
+    return (symb1[1], symb2[1])
+
+# Compiles accessor of frame of variable argument, checks if the frame exists and variable is declared
+# @param instr Instruction object
+# @param program Program object
+# @param arg_index Index of argument
+# @return Function returning frame of given variable
+def compile_frame(instr, program, arg_index):
+    arg = instr.get_arg(arg_index)
+    slot = arg.get_slot()
+    match arg.get_frame_type():
+        case "GF" if program.is_known_declared(instr, arg_index):
+            # Declaration is proven by static analysis
+            program.add_stat("eliminated declaration checks")
+            gf = program.gf()
+            def frame(program):
+                return gf
+        case "GF":
+            gf = program.gf()
+            def frame(program):
+                if gf.vars[slot] is None:
+                    print_error(instr, "Variable not declared", 54)
+                return gf
+        case "LF":
+            frame_stack = program._frame_stack
+            def frame(program):
+                lf = frame_stack.top()
+                if lf is None:
+                    print_error(instr, "Local frame not initialized", 55)
+                if lf.vars[slot] is None:
+                    print_error(instr, "Variable not declared", 54)
+                return lf
+        case _:
+            def frame(program):
+                tf = program._temp_frame
+                if tf is None:
+                    print_error(instr, "Temp frame not initialized", 55)
+                if tf.vars[slot] is None:
+                    print_error(instr, "Variable not declared", 54)
+                return tf
+    return frame
+
+# Compiles accessor of variable argument, frame and variable name are resolved at compile time
+# @param instr Instruction object
+# @param program Program object
+# @param arg_index Index of argument
+# @param defined Variable has to be defined, not only declared
+# @param buffered Value of defined variable is returned as it is, even if it is string buffer
+# @return Function returning variable object
+def compile_var(instr, program, arg_index, defined=True, buffered=False):
+    arg = instr.get_arg(arg_index)
+    slot = arg.get_slot()
+    materialize = defined and not buffered
+    match arg.get_frame_type():
+        case "GF" if program.is_known_declared(instr, arg_index):
+            # Declaration (and definition) is proven by static analysis
+            program.add_stat("eliminated declaration checks")
+            gf_vars = program.gf().vars
+            if defined and not program.is_known_defined(instr, arg_index):
+                def var(program):
+                    var = gf_vars[slot]
+                    if var._value is None and var._type != "nil":
+                        print_error(instr, "Variable not defined", 56)
+                    if materialize and var._value.__class__ is StringBuffer:
+                        var._value = str(var._value)
+                    return var
+            else:
+                if defined:
+                    program.add_stat("eliminated definition checks")
+                def var(program):
+                    var = gf_vars[slot]
+                    if materialize and var._value.__class__ is StringBuffer:
+                        var._value = str(var._value)
+                    return var
+        case "GF":
+            gf_vars = program.gf().vars
+            def var(program):
+                var = gf_vars[slot]
+                if var is None:
+                    print_error(instr, "Variable not declared", 54)
+                if defined and var._value is None and var._type != "nil":
+                    print_error(instr, "Variable not defined", 56)
+                if materialize and var._value.__class__ is StringBuffer:
+                    var._value = str(var._value)
+                return var
+        case "LF":
+            frame_stack = program._frame_stack
+            def var(program):
+                lf = frame_stack.top()
+                if lf is None:
+                    print_error(instr, "Local frame not initialized", 55)
+                var = lf.vars[slot]
+                if var is None:
+                    print_error(instr, "Variable not declared", 54)
+                if defined and var._value is None and var._type != "nil":
+                    print_error(instr, "Variable not defined", 56)
+                if materialize and var._value.__class__ is StringBuffer:
+                    var._value = str(var._value)
+                return var
+        case _:
+            def var(program):
+                tf = program._temp_frame
+                if tf is None:
+                    print_error(instr, "Temp frame not initialized", 55)
+                var = tf.vars[slot]
+                if var is None:
+                    print_error(instr, "Variable not declared", 54)
+                if defined and var._value is None and var._type != "nil":
+                    print_error(instr, "Variable not defined", 56)
+                if materialize and var._value.__class__ is StringBuffer:
+                    var._value = str(var._value)
+                return var
+    return var
+
+# Compiles accessor of symbol argument (variable or constant)
+# @param instr Instruction object
+# @param program Program object
+# @param arg_index Index of argument
+# @return Function returning object with type and value of symbol (variable or argument)
+def compile_symb(instr, program, arg_index):
+    arg = instr.get_arg(arg_index)
+    if arg.get_type() == "var":
+        return compile_var(instr, program, arg_index)
+    def symb(program):
+        return arg
+    return symb
+
+# Compiles accessor of symbol argument which has to be of selected type
+# @param instr Instruction object
+# @param program Program object
+# @param arg_index Index of argument
+# @param type Type of argument
+# @return Function returning value of symbol
+def compile_typed_symb(instr, program, arg_index, type):
+    arg = instr.get_arg(arg_index)
+    if arg.get_type() == "var" and program.get_known_type(instr, arg_index) == type:
+        # Type is proven by static analysis, string instructions work with string buffer as well
+        return compile_value(instr, program, arg_index, buffered=True)
+    if arg.get_type() == "var":
+        # string instructions work with string buffer as well
+        source = compile_var(instr, program, arg_index, buffered=type == "string")
+        def value(program):
+            var = source(program)
+            if var._type != type:
+                print_error(instr, "Wrong type of argument", 53)
+            return var._value
+    elif arg.get_type() != type:
+        # Type of constant is known, but error is reported only when instruction is executed
+        def value(program):
+            print_error(instr, "Wrong type of argument", 53)
+    else:
+        constant = arg.get_value()
+        def value(program):
+            return constant
+    return value
+
+# Gets type of symbol argument which is known before running
+# @param instr Instruction object
+# @param program Program object
+# @param arg_index Index of argument
+# @return Type of constant or type of variable proven by static analysis, None if it is not known
+def static_type(instr, program, arg_index):
+    arg = instr.get_arg(arg_index)
+    if arg.get_type() == "var":
+        return program.get_known_type(instr, arg_index)
+    return arg.get_type()
+
+# Compiles accessor of value of symbol argument with static type (see static_type) without any checks
+# @param instr Instruction object
+# @param program Program object
+# @param arg_index Index of argument
+# @param buffered String buffer is returned as it is, not materialized
+# @return Function returning value of symbol
+# @note Variable with known type is always global and it is declared and defined
+def compile_value(instr, program, arg_index, buffered=False):
+    arg = instr.get_arg(arg_index)
+    if arg.get_type() != "var":
+        constant = arg.get_value()
+        def value(program):
+            return constant
+        return value
+    gf_vars = program.gf().vars
+    slot = arg.get_slot()
+    program.add_stat("eliminated declaration checks")
+    program.add_stat("eliminated definition checks")
+    program.add_stat("eliminated type checks")
+    if buffered or program.get_known_type(instr, arg_index) != "string":
+        def value(program):
+            return gf_vars[slot]._value
+    else:
+        def value(program):
+            var = gf_vars[slot]
+            if var._value.__class__ is StringBuffer:
+                var._value = str(var._value)
+            return var._value
+    return value
+
+# Checks if operands of LT or GT have static types which are valid for comparison
+# @param instr Instruction object
+# @param program Program object
+# @return True if runtime type checks of operands can be left out
+def known_ordered(instr, program):
+    type1 = static_type(instr, program, 1)
+    return type1 is not None and type1 != "nil" and type1 == static_type(instr, program, 2)
+
+# Checks if operands of EQ, JUMPIFEQ or JUMPIFNEQ have static types which are valid for equality
+# @param instr Instruction object
+# @param program Program object
+# @return True if runtime type checks of operands can be left out
+def known_equatable(instr, program):
+    type1 = static_type(instr, program, 1)
+    type2 = static_type(instr, program, 2)
+    if type1 is None or type2 is None:
+        return False
+    return type1 == type2 or type1 == "nil" or type2 == "nil"
+
+# Generator of Python source of the whole program for transpiled engine (see Program.run_transpiled),
+# blocks are dispatched by their address inside of one function, so global variables can be its locals
+class Transpiler:
+    # Transpiler constructor
+    # @param program Program object with sorted and linked instructions
+    def __init__(self, program):
+        self.program    : Program   = program
+        self._lines     : list      = []
+        self._indent    : int       = 0
+        self._temps     : int       = 0
+        self._refs      : dict      = {}
+        self._objects   : list      = []
+        self._locals    : set       = set()
+
+    # Emit line of source
+    # @param line Line without indentation
+    def emit(self, line):
+        self._lines.append("    " * self._indent + line)
+
+    # Emit line which starts indented block (if, else, try, ...)
+    # @param line Line without indentation
+    def begin(self, line):
+        self.emit(line)
+        self._indent += 1
+
+    # End indented block
+    def end(self):
+        self._indent -= 1
+
+    # Get new name of temporary variable, names are used again by every instruction
+    # @param prefix Prefix of name
+    # @return Name of variable
+    def temp(self, prefix):
+        self._temps += 1
+        return prefix + str(self._temps)
+
+    # Get reference to object (instruction, argument or closure) used by generated source
+    # @param obj Referenced object
+    # @return Expression with the object
+    def ref(self, obj):
+        index = self._refs.get(obj)
+        if index is None:
+            index = self._refs[obj] = len(self._objects)
+            self._objects.append(obj)
+        return "R[" + str(index) + "]"
+
+    # Emit error of instruction
+    # @param instr Instruction object
+    # @param error_msg Error message
+    # @param error_code Error code
+    def error(self, instr, error_msg, error_code):
+        self.emit(f"print_error({self.ref(instr)}, {error_msg!r}, {error_code})")
+
+    # Emit error of instruction which is reported when condition is true
+    # @param instr Instruction object
+    # @param condition Expression of condition
+    # @param error_msg Error message
+    # @param error_code Error code
+    def check(self, instr, condition, error_msg, error_code):
+        self.emit(f"if {condition}: print_error({self.ref(instr)}, {error_msg!r}, {error_code})")
+
+    # Check if variable argument is kept in local variables of generated function
+    # @param arg Argument object
+    # @return True if argument is global variable in locals
+    def is_local(self, arg):
+        return analysis.is_global(arg) and arg.get_slot() in self._locals
+
+    # Get local variables of global variable
+    # @param arg Argument object
+    # @return Tuple of names of its type and value (type is None when variable is not declared)
+    def local(self, arg):
+        return ("t" + str(arg.get_slot()), "v" + str(arg.get_slot()))
+
+    # Get type of variable argument proven when generated source runs (see Program.get_known_type)
+    # @param instr Instruction object
+    # @param arg_index Index of argument
+    # @return Type of variable, None if it is not known
+    def get_known_type(self, instr, arg_index):
+        return self.program.get_known_type(instr, arg_index)
+
+    # Check if variable argument is proven to be declared when generated source runs
+    # @param instr Instruction object
+    # @param arg_index Index of argument
+    # @return True if variable is always declared
+    def is_known_declared(self, instr, arg_index):
+        return self.program.is_known_declared(instr, arg_index)
+
+    # Check if variable argument is proven to be defined when generated source runs
+    # @param instr Instruction object
+    # @param arg_index Index of argument
+    # @return True if variable is always defined
+    def is_known_defined(self, instr, arg_index):
+        return self.program.is_known_defined(instr, arg_index)
+
+    # Get list of variables of the frame of variable argument without any checks
+    # @param arg Argument object
+    # @return Expression with list of variables of the frame
+    def frame_vars(self, arg):
+        match arg.get_frame_type():
+            case "GF":
+                return "gf_vars"
+            case "LF":
+                return "frame_stack.top().vars"
+            case _:
+                return "program._temp_frame.vars"
+
+    # Emit checks of frame of variable argument
+    # @param instr Instruction object
+    # @param arg_index Index of argument
+    # @return Expression with list of variables of the frame
+    def frame(self, instr, arg_index):
+        match instr.get_arg(arg_index).get_frame_type():
+            case "GF":
+                return "gf_vars"
+            case "LF":
+                frame = self.temp("f")
+                self.emit(f"{frame} = frame_stack.top()")
+                self.check(instr, f"{frame} is None", "Local frame not initialized", 55)
+            case _:
+                frame = self.temp("f")
+                self.emit(f"{frame} = program._temp_frame")
+                self.check(instr, f"{frame} is None", "Temp frame not initialized", 55)
+        return frame + ".vars"
+
+    # Emit checks of frame of variable argument and its declaration
+    # @param instr Instruction object
+    # @param arg_index Index of argument
+    # @return Expression with list of variables of the frame
+    def declared(self, instr, arg_index):
+        vars = self.frame(instr, arg_index)
+        if self.is_known_declared(instr, arg_index):
+            self.program.add_stat("eliminated declaration checks")
+        else:
+            self.check(instr, f"{vars}[{instr.get_arg(arg_index).get_slot()}] is None", "Variable not declared", 54)
+        return vars
+
+    # Emit access to variable object of argument kept in frame (see compile_var)
+    # @param instr Instruction object
+    # @param arg_index Index of argument
+    # @param defined Variable has to be defined, not only declared
+    # @param buffered Value of defined variable is used as it is, even if it is string buffer
+    # @return Name of variable object
+    def var(self, instr, arg_index, defined=True, buffered=False):
+        arg = instr.get_arg(arg_index)
+        known = self.is_known_declared(instr, arg_index)
+        vars = self.frame(instr, arg_index)
+        var = self.temp("a")
+        self.emit(f"{var} = {vars}[{arg.get_slot()}]")
+        if known:
+            self.program.add_stat("eliminated declaration checks")
+        else:
+            self.check(instr, f"{var} is None", "Variable not declared", 54)
+        if defined and known and self.is_known_defined(instr, arg_index):
+            self.program.add_stat("eliminated definition checks")
+        elif defined:
+            self.check(instr, f"{var}._value is None and {var}._type != 'nil'", "Variable not defined", 56)
+        if defined and not buffered and self.get_known_type(instr, arg_index) in (None, "string"):
+            self.emit(f"if {var}._value.__class__ is StringBuffer: {var}._value = str({var}._value)")
+        return var
+
+    # Emit access to symbol argument (variable or constant)
+    # @param instr Instruction object
+    # @param arg_index Index of argument
+    # @param defined Variable has to be defined, not only declared
+    # @param buffered Value of variable in frame is used as it is, even if it is string buffer
+    # @return Tuple of expressions with type and value of symbol
+    def symb(self, instr, arg_index, defined=True, buffered=False):
+        arg = instr.get_arg(arg_index)
+        if arg.get_type() != "var":
+            return (repr(arg.get_type()), repr(arg.get_value()))
+        if not self.is_local(arg):
+            var = self.var(instr, arg_index, defined, buffered)
+            return (var + "._type", var + "._value")
+        type, value = self.local(arg)
+        if self.is_known_declared(instr, arg_index):
+            self.program.add_stat("eliminated declaration checks")
+        else:
+            self.check(instr, f"{type} is None", "Variable not declared", 54)
+        if defined and self.is_known_defined(instr, arg_index):
+            self.program.add_stat("eliminated definition checks")
+        elif defined:
+            self.check(instr, f"{value} is None and {type} != 'nil'", "Variable not defined", 56)
+        return (type, value)
+
+    # Emit access to symbol argument which has to be of selected type (see compile_typed_symb)
+    # @param instr Instruction object
+    # @param arg_index Index of argument
+    # @param type Type of argument
+    # @param buffered Value of variable in frame is used as it is, by default only by string instructions
+    # @return Expression with value of symbol
+    def typed(self, instr, arg_index, type, buffered=None):
+        arg = instr.get_arg(arg_index)
+        if buffered is None:
+            buffered = type == "string"
+        if arg.get_type() == "var" and self.get_known_type(instr, arg_index) == type:
+            return self.value(instr, arg_index, buffered)
+        if arg.get_type() == "var":
+            var_type, value = self.symb(instr, arg_index, True, buffered)
+            self.check(instr, f"{var_type} != {type!r}", "Wrong type of argument", 53)
+            return value
+        if arg.get_type() != type:
+            # Error is reported only when instruction is executed, the rest of it is never reached
+            self.error(instr, "Wrong type of argument", 53)
+            value = self.temp("x")
+            self.emit(f"{value} = None")
+            return value
+        return repr(arg.get_value())
+
+    # Emit access to value of symbol argument with static type without any checks (see compile_value)
+    # @param instr Instruction object
+    # @param arg_index Index of argument
+    # @param buffered Value of variable in frame is used as it is, even if it is string buffer
+    # @return Expression with value of symbol
+    def value(self, instr, arg_index, buffered=False):
+        arg = instr.get_arg(arg_index)
+        if arg.get_type() != "var":
+            return repr(arg.get_value())
+        self.program.add_stat("eliminated declaration checks")
+        self.program.add_stat("eliminated definition checks")
+        self.program.add_stat("eliminated type checks")
+        if self.is_local(arg):
+            return self.local(arg)[1]
+        var = self.temp("a")
+        self.emit(f"{var} = {self.frame_vars(arg)}[{arg.get_slot()}]")
+        if not buffered and self.get_known_type(instr, arg_index) == "string":
+            self.emit(f"if {var}._value.__class__ is StringBuffer: {var}._value = str({var}._value)")
+        return var + "._value"
+
+    # Emit values of operands of LT or GT with their checks
+    # @param instr Instruction object
+    # @return Tuple of expressions with values of both operands
+    def ordered(self, instr):
+        if known_ordered(instr, self):
+            return (self.value(instr, 1), self.value(instr, 2))
+        type1, value1 = self.symb(instr, 1)
+        type2, value2 = self.symb(instr, 2)
+        self.check(instr, f"{type1} == 'nil' or {type2} == 'nil'", "Wrong type of argument, argument can't be nil", 53)
+        self.check(instr, f"{type1} != {type2}", "Arguments are not the same type", 53)
+        return (value1, value2)
+
+    # Emit values of operands of EQ, JUMPIFEQ or JUMPIFNEQ with their checks
+    # @param instr Instruction object
+    # @param error_msg Error message of operands of different types
+    # @param reverse The second operand is accessed first
+    # @return Tuple of expressions with values of both operands
+    def equatable(self, instr, error_msg, reverse=False):
+        if known_equatable(instr, self):
+            return (self.value(instr, 1), self.value(instr, 2))
+        if reverse:
+            type2, value2 = self.symb(instr, 2)
+            type1, value1 = self.symb(instr, 1)
+        else:
+            type1, value1 = self.symb(instr, 1)
+            type2, value2 = self.symb(instr, 2)
+        self.check(instr, f"{type1} != {type2} and {type1} != 'nil' and {type2} != 'nil'", error_msg, 53)
+        return (value1, value2)
+
+    # Emit check of result variable argument
+    # @param instr Instruction object
+    # @param arg_index Index of argument
+    # @return Tuple of targets of type and value of variable and its type proven before the instruction
+    def result(self, instr, arg_index):
+        arg = instr.get_arg(arg_index)
+        if not self.is_local(arg):
+            var = self.var(instr, arg_index, False)
+            return (var + "._type", var + "._value", None)
+        type, value = self.local(arg)
+        if self.is_known_declared(instr, arg_index):
+            self.program.add_stat("eliminated declaration checks")
+        else:
+            self.check(instr, f"{type} is None", "Variable not declared", 54)
+        return (type, value, self.get_known_type(instr, arg_index))
+
+    # Emit assignment to result variable, value is computed before type is changed
+    # @param dest Targets of result variable (see result)
+    # @param type Expression with type
+    # @param value Expression with value
+    # @note Type of global variable in locals is left as it is when it is already the same
+    def assign(self, dest, type, value):
+        self.emit(f"{dest[1]} = {value}")
+        if dest[2] is None or repr(dest[2]) != type:
+            self.emit(f"{dest[0]} = {type}")
+
+    # Emit call of compiled closure of instruction without its own source
+    # @param instr Instruction object
+    # @param next_pc Address of next instruction
+    def fallback(self, instr, next_pc):
+        self.emit(self.ref(instr.compile(self.program, next_pc)) + "(program)")
+
+    # Choose global variables which are kept in locals of generated function
+    # @note Variable stays in global frame when SETCHAR needs its object, instruction
+    #       without its own source (BREAK) can see the whole global frame, so then no variable is moved
+    def choose_locals(self):
+        instructions = self.program.instructions
+        if any(type(instr).transpile is Program.Instruction.transpile for instr in instructions):
+            return
+        self._locals = set(range(len(self.program.gf().vars)))
+        for instr in instructions:
+            if instr.get_opcode() == "SETCHAR" and analysis.is_global(instr.get_arg(0)):
+                self._locals.discard(instr.get_arg(0).get_slot())
+        if self._locals:
+            self.program.add_stat("global variables in locals", len(self._locals))
+
+    # Generate source of program, function run(program) runs it
+    # @return Python source
+    def generate(self):
+        instructions = self.program.instructions
+        cfg = analysis.ControlFlowGraph(instructions)
+        self.choose_locals()
+        self.begin("def run(program):")
+        self.prologue()
+        for slot in sorted(self._locals):
+            self.emit(f"t{slot} = v{slot} = None")
+        self.emit("pc = 0")
+        self.begin("while True:")
+        # The end of program is dispatched as well, jump or return can continue there
+        self.dispatch(list(cfg.blocks) + [len(instructions)], cfg.blocks)
+        return "\n".join(self._lines) + "\n"
+
+    # Emit locals of generated function with state of program used by instructions
+    def prologue(self):
+        self.emit("gf_vars = program.gf().vars")
+        self.emit("frame_stack = program._frame_stack")
+        self.emit("call_stack = program._call_stack")
+        self.emit("data_stack = program._data_stack")
+        self.emit("output = program.get_output()")
+        self.emit("output_write = output.write")
+
+    # Emit dispatch of blocks by program counter, blocks are searched by halving, only few are compared in row
+    # @param starts Sorted addresses of blocks
+    # @param blocks Dictionary of start and end of every block
+    def dispatch(self, starts, blocks):
+        if len(starts) > 4:
+            middle = len(starts) // 2
+            self.begin(f"if pc < {starts[middle]}:")
+            self.dispatch(starts[:middle], blocks)
+            self.end()
+            self.begin("else:")
+            self.dispatch(starts[middle:], blocks)
+            self.end()
+            return
+        for index, start in enumerate(starts):
+            if len(starts) == 1:
+                self.block(start, blocks.get(start))
+                continue
+            if index == 0:
+                self.begin(f"if pc == {start}:")
+            elif index < len(starts) - 1:
+                self.begin(f"elif pc == {start}:")
+            else:
+                self.begin("else:")
+            self.block(start, blocks.get(start))
+            self.end()
+
+    # Emit block of instructions, program counter is set to the next block at its end
+    # @param start Address of the first instruction
+    # @param end Address after the last instruction, None for the end of program
+    def block(self, start, end):
+        instructions = self.program.instructions
+        if end is None:
+            self.emit("return")
+            return
+        for address in range(start, end):
+            self._temps = 0
+            instructions[address].transpile(self, address + 1)
+        opcode = instructions[end - 1].get_opcode()
+        if opcode not in analysis.TERMINATORS and opcode not in analysis.BRANCHES:
+            self.emit("return" if end == len(instructions) else f"pc = {end}")
+
+    # Get globals of generated source
+    # @return Dictionary of names used by generated source
+    def namespace(self):
+        return {"R": self._objects, "print_error": print_error, "read_value": read_value, "sys": sys,
+                "StringBuffer": StringBuffer, "Var": Program.Frame.Var}
+
+# Default number of backward jumps to loop header after which the loop is recorded (see TraceJit)
+JIT_THRESHOLD = 1000
+# Maximal number of instructions in one trace, longer loop is never compiled
+TRACE_MAX_LENGTH = 500
+# Instructions which stop recording, trace never leaves its subroutine or prints state of interpreter
+TRACE_STOPS = ("CALL", "RETURN", "BREAK")
+
+# Trace-recording JIT of class engine (see Program.run), loop reached by backward jump often enough
+# is recorded as linear trace of executed instructions and compiled to Python function (see TraceCompiler)
+class TraceJit:
+    # TraceJit constructor
+    # @param program Program object
+    # @param threshold Number of backward jumps to loop header after which the loop is recorded
+    def __init__(self, program, threshold=JIT_THRESHOLD):
+        self.program    : Program   = program
+        self.threshold  : int       = threshold
+        self._counters  : dict      = {}
+        # Compiled traces by address of loop header, None when the loop can't be traced
+        self._traces    : dict      = {}
+
+    # Count backward jump to loop header, record the loop when it is hot and enter its trace when it is compiled
+    # @param target Address of loop header, program counter is already set to it
+    def backward_jump(self, target):
+        if target in self._traces:
+            trace = self._traces[target]
+            if trace is not None:
+                self.program.add_stat("traces entered")
+                self.program.set_pc(trace(self.program))
+            return
+        count = self._counters.get(target, 0) + 1
+        self._counters[target] = count
+        if count >= self.threshold:
+            self._traces[target] = self.record(target)
+
+    # Record trace by executing instructions until loop header is reached again
+    # @param start Address of loop header
+    # @return Compiled trace, None if the loop can't be traced
+    # @note Recorded instructions are executed by interpreter, so the program continues wherever recording stops
+    def record(self, start):
+        program = self.program
+        instructions = program.instructions
+        trace = []
+        while len(trace) < TRACE_MAX_LENGTH and program.get_pc() < len(instructions):
+            address = program.get_pc()
+            instr = instructions[address]
+            if instr.get_opcode() in TRACE_STOPS:
+                return None
+            types = self.observe(instr)
+            instr.execute(program)
+            trace.append((address, types, program.get_pc()))
+            if program.get_pc() == start:
+                return self.compile_trace(trace)
+        return None
+
+    # Get types of variables read by instruction, they become type guards of the trace
+    # @param instr Instruction object
+    # @return Dictionary of argument indexes and types of defined variables
+    def observe(self, instr):
+        types = {}
+        frames = {"GF": self.program.gf(), "LF": self.program.lf(), "TF": self.program.tf()}
+        signature = check_xml.OPCODE_SIGNATURES[instr.get_opcode()]
+        for index, operand in enumerate(signature):
+            arg = instr.get_arg(index)
+            if operand != "symb" or arg.get_type() != "var":
+                continue
+            frame = frames[arg.get_frame_type()]
+            var = None if frame is None else frame.get_var(arg.get_slot())
+            if var is not None and var.is_defined():
+                types[index] = var.get_type()
+        return types
+
+    # Compile recorded trace
+    # @param trace List of address, type guards and address of next executed instruction of every instruction
+    # @return Function which runs the loop and returns address where the interpreter continues
+    def compile_trace(self, trace):
+        compiler = TraceCompiler(self.program, trace)
+        code = compile(compiler.generate(), "<trace>", "exec")
+        namespace = compiler.namespace()
+        exec(code, namespace)
+        self.program.add_stat("traces compiled")
+        return namespace["trace"]
+
+# Generator of Python source of recorded trace (see TraceJit), variables read by instructions are guarded
+# by their recorded types and branches by their recorded direction, failed guard leaves the trace before
+# its instruction is executed, so the interpreter continues with the same state (side exit)
+class TraceCompiler(Transpiler):
+    # TraceCompiler constructor
+    # @param program Program object
+    # @param trace Recorded trace (see TraceJit.compile_trace)
+    def __init__(self, program, trace):
+        super().__init__(program)
+        self._trace     : list  = trace
+        # Types of guarded arguments of instruction which is generated
+        self._guards    : dict  = {}
+
+    # Get type of variable argument, guarded type is known as well
+    # @param instr Instruction object
+    # @param arg_index Index of argument
+    # @return Type of variable, None if it is not known
+    def get_known_type(self, instr, arg_index):
+        return self._guards.get(arg_index) or super().get_known_type(instr, arg_index)
+
+    # Check if variable argument is proven to be declared, guarded variable is declared
+    # @param instr Instruction object
+    # @param arg_index Index of argument
+    # @return True if variable is always declared
+    def is_known_declared(self, instr, arg_index):
+        return arg_index in self._guards or super().is_known_declared(instr, arg_index)
+
+    # Check if variable argument is proven to be defined, guarded variable is defined
+    # @param instr Instruction object
+    # @param arg_index Index of argument
+    # @return True if variable is always defined
+    def is_known_defined(self, instr, arg_index):
+        return arg_index in self._guards or super().is_known_defined(instr, arg_index)
+
+    # Emit type guards of instruction, types proven by static analysis are not guarded
+    # @param instr Instruction object
+    # @param address Address of instruction, the interpreter continues there when guard fails
+    # @param types Recorded types of variables read by instruction
+    def guard(self, instr, address, types):
+        self._guards = {}
+        for index, type in types.items():
+            arg = instr.get_arg(index)
+            if self.program.get_known_type(instr, index) == type:
+                continue
+            var = self.temp("g")
+            if arg.get_frame_type() == "GF":
+                self.emit(f"{var} = gf_vars[{arg.get_slot()}]")
+            else:
+                frame = self.temp("f")
+                self.emit(f"{frame} = {'frame_stack.top()' if arg.get_frame_type() == 'LF' else 'program._temp_frame'}")
+                self.side_exit(f"{frame} is None", address)
+                self.emit(f"{var} = {frame}.vars[{arg.get_slot()}]")
+            self.side_exit(f"{var} is None or {var}._type != {type!r}", address)
+            self.program.add_stat("trace type guards")
+        self._guards = types
+
+    # Emit side exit, trace is left when guard fails
+    # @param condition Python expression which is true when guard fails
+    # @param address Address where the interpreter continues (Python expression)
+    def side_exit(self, condition, address):
+        self.emit(f"if {condition}: program.add_stat(\"trace side exits\"); return {address}")
+
+    # Generate source of trace, function trace(program) runs it
+    # @return Python source
+    # @note Branch which closes the loop leaves the trace when the loop ends, it is not counted as side exit
+    def generate(self):
+        self.begin("def trace(program):")
+        self.prologue()
+        self.begin("while True:")
+        for index, (address, types, next_pc) in enumerate(self._trace):
+            self._temps = 0
+            instr = self.program.instructions[address]
+            self.guard(instr, address, types)
+            instr.transpile(self, address + 1)
+            if instr.get_opcode() in analysis.BRANCHES:
+                if index == len(self._trace) - 1:
+                    self.emit(f"if pc != {next_pc}: return pc")
+                else:
+                    self.side_exit(f"pc != {next_pc}", "pc")
+        return "\n".join(self._lines) + "\n"
+
 # Function checks if argument is variable or symbol and returns its type
 # @param instr Instruction object
 # @param program Program object
@@ -1082,7 +3853,7 @@ def get_typ(instr, program, arg_index):
     arg = instr.get_arg(arg_index)
     if arg.get_type() == "var":
         frame = check_frame_both(instr, program, arg_index)
-        return frame.get_var(arg.get_value()).get_type()
+        return frame.get_var(arg.get_slot()).get_type()
     return arg.get_type()
 
 # Function checks if argument is variable or symbol and returns its value
@@ -1094,102 +3865,549 @@ def get_val(instr, program, arg_index):
     arg = instr.get_arg(arg_index)
     if arg.get_type() == "var":
         frame = check_frame_both(instr, program, arg_index)
-        return frame.get_var(arg.get_value()).get_value()
+        return frame.get_var(arg.get_slot()).get_value()
     return arg.get_value()
 
+# Reads line of input and converts it to value of selected type
+# @param type Type of value (int, bool or string)
+# @return Tuple of type and value, nil when input ended or value is invalid
+def read_value(type):
+    try:
+        line = input.readline()
+        if line == "":
+            return ("nil", None)
+        if line == "\n":
+            return ("string", "")
+        if type == "int":
+            return ("int", int(line.strip()))
+        if type == "bool":
+            return ("bool", line.strip().lower() == "true")
+        return ("string", replace_escaped_chars(line.strip()))
+    except ValueError:
+        return ("nil", None)
+
+# Escape sequence (\xyz) in string literal
+ESCAPE_RE = re.compile(r"\\([0-9]{3})")
+
 # Replaces escaped characters (\xyz) in string
 # @param string String to be replaced
-# @return String with replaced characters 
+# @return String with replaced characters
+# @note Whole string is scanned once, decoded characters are never decoded again
 def replace_escaped_chars(string):
-    idx = string.find("\\")
-    if idx == -1:
+    if "\\" not in string:
         return string
-    while(idx != -1):
-        if len(string) - idx < 4:
-            idx = string.find("\\", idx+1)
-            continue
-        if not string[idx+1].isdigit() or not string[idx+2].isdigit() or not string[idx+3].isdigit():
-            idx = string.find("\\", idx+1)
-            continue
-        try:
-            string = string[:idx] + chr(int(string[idx+1:idx+4])) + string[idx+4:]
-            idx = string.find("\\", idx+1)
-        except ValueError:
-            print("ERROR: Invalid escape sequence", file=sys.stderr)
-            exit(58)
-    return string
+    return ESCAPE_RE.sub(lambda match: chr(int(match.group(1))), string)
 
 # Function sets integer value based on format of given argument
 # @param value String to be converted to integer
 # @return Integer value
+# @note Format is already checked by check_xml, so only prefix of the number decides its base
 def set_int(value):
-    if re.match(r"^[+-]?0$", value):
-        return int(value, 10)
-    if re.match(r"^[+-]?(0x|0X)[\da-fA-F]+(_[\da-fA-F]+)*$", value):
-        return int(value, 16)
-    elif 'o' in value or 'O' in value:
-        if re.match(r"^[+-]?0(o|O)?[0-7]+(_[0-7]+)*$", value):
-            return int(value, 8)
-    elif re.match(r"^[+-]?0+[0-7]*(_[0-7]+)*$", value):
-        # we remove leading zeros
-        value = re.sub(r"^0+", "", value)
-        return int(value, 8)
-    elif re.match(r"^[+-]?[1-9][\d]*(_[\d]+)*$", value):
-        return int(value, 10)
-    
-# Generates program structure from XML to objects (classes)
-# @param xml_root Root of XML tree
+    digits = value.lstrip("+-")
+    if len(digits) > 1 and digits[0] == "0":
+        # hexadecimal (0x) or octal (0o or only leading zeros)
+        return int(value, 16) if digits[1] in "xX" else int(value, 8)
+    return int(value, 10)
+
+# Loads program from XML source in a single pass, every instruction element is checked,
+# generated to instruction object and then dropped, so the whole XML tree is never held in memory
+# @param source Path to source file or binary file object
 # @return Program object
-def gen_program(xml_root):
+# @note The first error in structure is reported only after the whole source is parsed,
+#       so not well-formed XML is always reported as such (error 31 takes precedence over 32)
+def load_program(source):
     program = Program()
     address = 0
-    for instr in xml_root:
-        instr_obj = program.Instruction(address, instr.attrib["opcode"].upper(), instr.attrib["order"])
-        for arg in instr:
-            arg.text = "" if arg.text is None else arg.text.strip()
-            arg_obj = instr_obj.Argument(arg.attrib["type"], arg.text)
-            instr_obj.add_arg(arg_obj, int(arg.tag[-1]))
-        program.add_instr(instr_obj)
-        # Generates labels
-        if instr_obj.get_opcode() == "LABEL":
-            gen_label(instr_obj, program)
-        address += 1
+    depth = 0
+    error = None
+    try:
+        for event, elem in ET.iterparse(source, events=("start", "end")):
+            if event == "start":
+                if depth == 0:
+                    xml_root = elem
+                    try:
+                        check_xml.check_root(elem)
+                    except check_xml.StructureError as e:
+                        error = e
+                depth += 1
+                continue
+            depth -= 1
+            # Element directly in root is complete, including its arguments
+            if depth == 1:
+                if error is None:
+                    try:
+                        args = check_xml.check_instr(elem)
+                        program.add_instr(gen_instr(elem, args, address, program))
+                        address += 1
+                    except check_xml.StructureError as e:
+                        error = e
+                xml_root.clear()
+    except ET.ParseError:
+        print("ERROR: Invalid XML format", file=sys.stderr)
+        exit(31)
+    if error is not None:
+        print("ERROR: " + str(error), file=sys.stderr)
+        exit(32)
     return program
 
-# Generates labels in the first iteration of program
+# Generates instruction object from XML instruction element
+# @param instr XML instruction element
+# @param args Argument elements ordered by their position (as returned by check_xml.check_instr)
+# @param address Position of instruction in XML
+# @param program Program object, its constant pool provides the arguments
+# @return Instruction object
+def gen_instr(instr, args, address, program):
+    # Binds instruction to its opcode class once, so it doesn't have to be looked up on every execution
+    # Opcode and argument types are interned, so all instructions share one string object for each
+    opcode = sys.intern(instr.attrib["opcode"].upper())
+    instr_obj = Program.opcode_to_class[opcode](address, opcode, int(instr.attrib["order"]))
+    for arg in args:
+        arg.text = "" if arg.text is None else arg.text.strip()
+        instr_obj.add_arg(program.get_argument(sys.intern(arg.attrib["type"]), arg.text))
+    return instr_obj
+
+# Generates label pointing to the instruction after it
 # @param instr Instruction object
 # @param program Program object
-def gen_label(instr, program):
+# @param address Address of label instruction in sorted program
+def gen_label(instr, program, address):
     arg = instr.get_arg(0)
-    if arg.get_type() != "label" or program.get_label_frame().get_var(arg.get_value()) is not None:
+    if arg.get_type() != "label" or arg.get_value() in program.get_labels():
         print_error(instr, "Invalid label", 52)
-    program.get_label_frame().add_var(arg.get_value(), "label")
-    program.get_label_frame().get_var(arg.get_value()).set_value(instr.get_address()+1)
+    program.get_labels()[arg.get_value()] = address+1
 
-# Checks if order attributes are without duplicates
+# Links sorted program, generates labels and sets target address of every jump instruction,
+# so labels are validated once and not looked up while the program is running
 # @param program Program object
-def check_order_attribute(program):
-    dup_list = []
+def link_labels(program):
+    for address, instr in enumerate(program.instructions):
+        if instr.get_opcode() == "LABEL":
+            gen_label(instr, program, address)
     for instr in program.instructions:
-        if instr.get_order() in dup_list:
-            print("ERROR on line: " + str(instr.get_address()+1), file=sys.stderr)
-            print("ERROR: Duplicate order attribute", file=sys.stderr)
-            exit(32)
-        dup_list.append(instr.get_order())
+        if instr.get_opcode() in ("CALL", "JUMP", "JUMPIFEQ", "JUMPIFNEQ", "JUMPIFEQS", "JUMPIFNEQS"):
+            address = program.get_labels().get(instr.get_arg(0).get_value())
+            if address is None:
+                print_error(instr, "Invalid label", 52)
+            instr.set_target(address)
+
+# Resolves every variable to slot in its frame, so variables are accessed by index at runtime,
+# local and temp variables share one numbering, because temp frame becomes local frame
+# @param program Program object
+def resolve_slots(program):
+    global_slots = {}
+    local_slots = {}
+    for instr in program.instructions:
+        for arg in instr.args:
+            if arg.get_type() == "var":
+                slots = global_slots if arg.get_frame_type() == "GF" else local_slots
+                arg.set_slot(slots.setdefault(arg.get_value(), len(slots)))
+    program.set_shapes(list(global_slots), list(local_slots))
+
+# Links program, resolves labels and variable slots
+# @param program Program object
+def link_program(program):
+    program.drop_constant_pool()
+    link_labels(program)
+    resolve_slots(program)
+
+# Folds operations on constants and propagates constant values of variables inside basic blocks
+# @param program Program object
+# @note Folded instruction is replaced by MOVE with the same address and order, so if the MOVE fails
+#       (result variable is not declared), the error is reported the same way as before
+def fold_constants(program):
+    instructions = program.instructions
+    for start, end in analysis.ControlFlowGraph(instructions).blocks.items():
+        # Constant arguments of variables by their frame and slot
+        constants = {}
+        for address in range(start, end):
+            instr = instructions[address]
+            opcode = instr.get_opcode()
+            if opcode in ("CREATEFRAME", "PUSHFRAME", "POPFRAME"):
+                constants = {key: arg for key, arg in constants.items() if key[0] == "GF"}
+                continue
+            signature = check_xml.OPCODE_SIGNATURES[opcode]
+            for index, operand in enumerate(signature):
+                arg = instr.get_arg(index)
+                if operand == "symb" and arg.get_type() == "var":
+                    constant = constants.get((arg.get_frame_type(), arg.get_slot()))
+                    if constant is not None:
+                        instr.args[index] = constant
+                        program.add_stat("propagated constants")
+            if signature[:1] != ("var",):
+                continue
+            dest = instr.get_arg(0)
+            symbs = instr.args[1:]
+            if symbs and all(arg.get_type() != "var" for arg in symbs):
+                try:
+                    result = instr.fold(symbs)
+                except (ValueError, OverflowError):
+                    result = None
+                if result is not None:
+                    instr = Program.Move(instr.get_address(), "MOVE", instr.get_order())
+                    instr.add_arg(instructions[address].get_arg(0))
+                    instr.add_arg(Program.Instruction.Argument(result[0], result[1], decoded=True))
+                    instructions[address] = instr
+                    program.add_stat("folded instructions")
+            # Result variable gets constant value only from MOVE of constant
+            key = (dest.get_frame_type(), dest.get_slot())
+            if instr.get_opcode() == "MOVE" and instr.get_arg(1).get_type() != "var":
+                constants[key] = instr.get_arg(1)
+            else:
+                constants.pop(key, None)
+
+# Checks if instruction which only writes its result variable can never fail
+# @param instr Instruction object
+# @param program Program object with states of variables (see optimize_program)
+# @return True if instruction always succeeds, so it can be left out when its result is never read
+def never_fails(instr, program):
+    if not program.is_known_declared(instr, 0):
+        return False
+    types = [static_type(instr, program, index) for index in range(1, len(instr.args))]
+    match instr.get_opcode():
+        case "MOVE":
+            return instr.get_arg(1).get_type() != "var" or program.is_known_defined(instr, 1)
+        case "TYPE":
+            return instr.get_arg(1).get_type() != "var" or program.is_known_declared(instr, 1)
+        case "ADD" | "SUB" | "MUL":
+            return types == ["int", "int"]
+        case "IDIV":
+            divisor = instr.get_arg(2)
+            return types == ["int", "int"] and divisor.get_type() == "int" and divisor.get_value() != 0
+        case "LT" | "GT":
+            return known_ordered(instr, program)
+        case "EQ":
+            return known_equatable(instr, program)
+        case "AND" | "OR":
+            return types == ["bool", "bool"]
+        case "NOT":
+            return types == ["bool"]
+        case "CONCAT":
+            return types == ["string", "string"]
+        case "STRLEN":
+            return types == ["string"]
+    return False
+
+# Removes unreachable blocks and writes to global variables which are never read,
+# jump targets are moved to the new addresses of instructions
+# @param program Program object with states of variables (see optimize_program)
+# @note Address of instruction used in error messages doesn't change, it is its position in XML
+def eliminate_dead_code(program):
+    instructions = program.instructions
+    cfg = analysis.ControlFlowGraph(instructions)
+    reachable = cfg.reachable()
+    # Global variables read by any instruction, BREAK prints all variables, so then every one is read
+    read = set()
+    for instr in instructions:
+        signature = check_xml.OPCODE_SIGNATURES[instr.get_opcode()]
+        for index, arg in enumerate(instr.args):
+            if analysis.is_global(arg) and (signature[index] == "symb" or instr.get_opcode() == "SETCHAR"):
+                read.add(arg.get_slot())
+    any_break = any(instr.get_opcode() == "BREAK" for instr in instructions)
+
+    kept = []
+    # New address of every instruction, removed instruction gets address of the next kept one
+    new_addresses = []
+    for start, end in cfg.blocks.items():
+        if start not in reachable:
+            new_addresses.extend([len(kept)] * (end - start))
+            program.add_stat("removed unreachable instructions", end - start)
+            continue
+        for address in range(start, end):
+            instr = instructions[address]
+            new_addresses.append(len(kept))
+            dest = instr.get_arg(0)
+            if not any_break and dest is not None and analysis.is_global(dest) \
+                    and dest.get_slot() not in read and never_fails(instr, program):
+                program.add_stat("removed dead stores")
+                continue
+            kept.append(instr)
+    new_addresses.append(len(kept))
+    relocate_program(program, kept, new_addresses)
+
+# Checks if both arguments are the same variable (the same name in the same frame)
+# @param arg1 Argument object
+# @param arg2 Argument object
+# @return True if both arguments are the same variable
+def same_var(arg1, arg2):
+    return arg1.get_type() == "var" and arg2.get_type() == "var" \
+        and arg1.get_frame_type() == arg2.get_frame_type() and arg1.get_value() == arg2.get_value()
+
+# Gets constant compared with variable by JUMPIFEQ or JUMPIFNEQ
+# @param jump Jump instruction
+# @param var Variable argument
+# @return Constant argument, None if jump doesn't compare the variable with constant
+def branch_constant(jump, var):
+    if same_var(jump.get_arg(1), var) and jump.get_arg(2).get_type() != "var":
+        return jump.get_arg(2)
+    if same_var(jump.get_arg(2), var) and jump.get_arg(1).get_type() != "var":
+        return jump.get_arg(1)
+    return None
+
+# Creates superinstruction of two following instructions
+# @param first First instruction
+# @param second Second instruction
+# @return Fused instruction, None if instructions can't be fused
+def fuse_pair(first, second):
+    opcodes = (first.get_opcode(), second.get_opcode())
+    if opcodes[1] in ("JUMPIFEQ", "JUMPIFNEQ"):
+        constant = branch_constant(second, first.get_arg(0)) if first.args else None
+        # compare-and-branch
+        if opcodes[0] in COMPARISONS and constant is not None and constant.get_type() == "bool":
+            return Program.CompareBranch(first, second)
+        # increment-and-test
+        if opcodes[0] in ("ADD", "SUB") and constant is not None and constant.get_type() == "int" \
+                and same_var(first.get_arg(0), first.get_arg(1)) and first.get_arg(2).get_type() == "int":
+            return Program.IncrementBranch(first, second)
+    if opcodes == ("DEFVAR", "MOVE") and same_var(first.get_arg(0), second.get_arg(0)):
+        return Program.Fused(first, second)
+    if opcodes == ("PUSHS", "POPS"):
+        return Program.PushsPops(first, second)
+    return None
+
+# Fuses pairs of following instructions to superinstructions, the second instruction of a pair
+# is never start of a block (target of jump or instruction after CALL)
+# @param program Program object
+def fuse_instructions(program):
+    instructions = program.instructions
+    leaders = analysis.ControlFlowGraph(instructions).blocks
+    fused = []
+    new_addresses = []
+    address = 0
+    while address < len(instructions):
+        new_addresses.append(len(fused))
+        instr = instructions[address]
+        if address + 1 < len(instructions) and address + 1 not in leaders:
+            pair = fuse_pair(instr, instructions[address + 1])
+            if pair is not None:
+                new_addresses.append(len(fused))
+                fused.append(pair)
+                program.add_stat("fused instructions")
+                address += 2
+                continue
+        fused.append(instr)
+        address += 1
+    new_addresses.append(len(fused))
+    relocate_program(program, fused, new_addresses)
+
+# Default maximal number of instructions of subroutine which is inlined at its CALL sites
+INLINE_SIZE = 10
+# Instructions which end search for inlined subroutine, its body has to run straight to its RETURN
+INLINE_STOPS = ("LABEL", "CALL") + analysis.JUMPS + analysis.BRANCHES
+
+# Gets body of small leaf subroutine
+# @param instructions Sorted and linked instructions
+# @param start Address of the first instruction of subroutine (target of CALL)
+# @param size Maximal number of instructions of body
+# @return Instructions of body without its RETURN, None if subroutine can't be inlined
+def leaf_body(instructions, start, size):
+    for address in range(start, min(start + size + 1, len(instructions))):
+        opcode = instructions[address].get_opcode()
+        if opcode == "RETURN":
+            return instructions[start:address]
+        if opcode in INLINE_STOPS:
+            return None
+    return None
+
+# Copies instruction with the same address, so the copy gets its own results of static analysis
+# @param instr Instruction object
+# @return Instruction object
+def copy_instr(instr):
+    copy = type(instr)(instr.get_address(), instr.get_opcode(), instr.get_order())
+    for arg in instr.args:
+        copy.add_arg(arg)
+    return copy
+
+# Replaces CALL of small leaf subroutine by copy of its body, subroutine itself is kept for other calls
+# @param program Program object
+# @param size Maximal number of instructions of inlined subroutine
+# @note Copies have address of the original instructions, so errors are reported at their position
+#       in the subroutine, inlined calls are not counted by --max-call-depth
+def inline_subroutines(program, size=INLINE_SIZE):
+    instructions = program.instructions
+    bodies = {}
+    inlined = []
+    new_addresses = []
+    for instr in instructions:
+        new_addresses.append(len(inlined))
+        if instr.get_opcode() == "CALL":
+            target = instr.get_target()
+            if target not in bodies:
+                bodies[target] = leaf_body(instructions, target, size)
+            if bodies[target] is not None:
+                inlined.extend(copy_instr(part) for part in bodies[target])
+                program.add_stat("inlined calls")
+                continue
+        inlined.append(instr)
+    new_addresses.append(len(inlined))
+    relocate_program(program, inlined, new_addresses)
+
+# Replaces instructions of program and moves jump targets and labels to new addresses
+# @param program Program object
+# @param instructions New instructions
+# @param new_addresses New address of every old address (including the end of program)
+def relocate_program(program, instructions, new_addresses):
+    for instr in instructions:
+        if instr.get_target() is not None:
+            instr.set_target(new_addresses[instr.get_target()])
+    labels = program.get_labels()
+    for label, address in labels.items():
+        labels[label] = new_addresses[address]
+    program.instructions = instructions
+
+# Optimizes linked program, small subroutines are inlined, constants are folded and then static analysis
+# is run, its results are used to remove dead code and when instructions are compiled
+# @param program Program object
+# @param fuse Make superinstructions, they save dispatch only when instructions are compiled
+# @param inline_size Maximal number of instructions of inlined subroutine
+def optimize_program(program, fuse=False, inline_size=INLINE_SIZE):
+    inline_subroutines(program, inline_size)
+    fold_constants(program)
+    program.set_var_states(analysis.analyze_variables(program.instructions))
+    eliminate_dead_code(program)
+    if fuse:
+        fuse_instructions(program)
 
-# Sorts instructions by order attribute
+# Sorts instructions by order attribute and checks if order attributes are without duplicates
 # @param program Program object
 # @return Program object
+# @note Duplicates are next to each other after the (stable) sort, the first duplicate
+#       in document order is reported
 def sort_by_order(program):
-    program.instructions.sort(key=lambda instr: int(instr.get_order()))
+    program.instructions.sort(key=Program.Instruction.get_order)
+    duplicate = None
+    prev_order = None
+    for instr in program.instructions:
+        if instr.get_order() == prev_order:
+            if duplicate is None or instr.get_address() < duplicate.get_address():
+                duplicate = instr
+        prev_order = instr.get_order()
+    if duplicate is not None:
+        print("ERROR on line: " + str(duplicate.get_address()+1), file=sys.stderr)
+        print("ERROR: Duplicate order attribute", file=sys.stderr)
+        exit(32)
+    return program
+
+# Header of compiled program file, version is increased whenever the format changes
+COMPILED_MAGIC = b"IPPB"
+COMPILED_VERSION = 1
+COMPILED_HEADER = COMPILED_MAGIC + bytes([COMPILED_VERSION])
+
+# Loads program from source, which is either XML or compiled program,
+# optionally through cache of compiled programs
+# @param source Path to source file or binary file object
+# @param cache_dir Directory with cached compiled programs, None if cache is not used
+# @return Linked program object
+def load_source(source, cache_dir=None):
+    if isinstance(source, str) and is_compiled(source):
+        program = load_compiled(source)
+        if program is None:
+            print("ERROR: Invalid compiled program", file=sys.stderr)
+            exit(31)
+        return program
+
+    if cache_dir is None:
+        program = sort_by_order(load_program(source))
+        link_program(program)
+        return program
+
+    # Source is read whole to be hashed, the same source skips parsing and checking next time
+    if isinstance(source, str):
+        with open(source, "rb") as source_file:
+            data = source_file.read()
+    else:
+        data = source.read()
+    cache_path = os.path.join(cache_dir, hashlib.sha256(COMPILED_HEADER + data).hexdigest() + ".ippb")
+    if os.path.isfile(cache_path):
+        program = load_compiled(cache_path)
+        if program is not None:
+            return program
+    program = sort_by_order(load_program(io.BytesIO(data)))
+    link_program(program)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        save_compiled(program, cache_path)
+    except OSError:
+        # Cache is only an optimization, program still runs
+        pass
+    return program
+
+# Checks if file is compiled program
+# @param path Path to file
+# @return True if file starts with compiled program header
+def is_compiled(path):
+    with open(path, "rb") as source_file:
+        return source_file.read(len(COMPILED_MAGIC)) == COMPILED_MAGIC
+
+# Saves checked and sorted program in compiled format
+# @param program Program object
+# @param path Path to compiled program file
+# @note File is written under temporary name and renamed, so parallel runs never read half written file
+def save_compiled(program, path):
+    data = marshal.dumps(tuple(instr.dump() for instr in program.instructions))
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as compiled_file:
+        compiled_file.write(COMPILED_HEADER)
+        compiled_file.write(data)
+    os.replace(temp_path, path)
+
+# Loads compiled program, instructions are already checked and sorted, so they are only linked
+# @param path Path to compiled program file
+# @return Linked program object, None if file is not valid compiled program
+# @note Garbage collector is paused while loading, the loaded objects have no reference cycles
+#       and collecting them over and over again takes most of the loading time
+def load_compiled(path):
+    gc.disable()
+    try:
+        return gen_compiled(path)
+    finally:
+        gc.enable()
+
+# Generates program from compiled program file
+# @param path Path to compiled program file
+# @return Linked program object, None if file is not valid compiled program
+def gen_compiled(path):
+    program = Program()
+    with open(path, "rb") as compiled_file:
+        try:
+            with mmap.mmap(compiled_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data[:len(COMPILED_HEADER)] != COMPILED_HEADER:
+                    return None
+                with memoryview(data) as view:
+                    instructions = marshal.loads(view[len(COMPILED_HEADER):])
+        except (ValueError, EOFError, TypeError):
+            return None
+    try:
+        for address, opcode, order, args in instructions:
+            instr = Program.opcode_to_class[opcode](address, opcode, order)
+            for type, value in args:
+                instr.add_arg(program.get_argument(type, value, decoded=True))
+            program.add_instr(instr)
+    except (ValueError, TypeError, KeyError):
+        return None
+    link_program(program)
     return program
 
 # Main function
 if __name__ == "__main__":
-    xml_root, input = parse_sc_args()
-    check_xml.check_xml(xml_root)
-    prg = gen_program(xml_root)
-    check_order_attribute(prg)
-    prg = sort_by_order(prg)
-    prg.run()
+    source, input, sc_args_parsed = parse_sc_args()
+    prg = load_source(source, sc_args_parsed.cache_dir)
+    if sc_args_parsed.compile is not None:
+        save_compiled(prg, sc_args_parsed.compile)
+        exit(0)
+    if sc_args_parsed.optimize:
+        optimize_program(prg, sc_args_parsed.engine == "closure", sc_args_parsed.inline_size)
+    prg.set_max_call_depth(sc_args_parsed.max_call_depth)
+    output = prg.get_output()
+    output.set_size(sc_args_parsed.output_buffer)
+    try:
+        if sc_args_parsed.engine == "closure":
+            prg.run_compiled()
+        elif sc_args_parsed.engine == "transpile":
+            prg.run_transpiled()
+        else:
+            prg.run(sc_args_parsed.jit)
+    finally:
+        output.flush()
+        if sc_args_parsed.stats:
+            prg.print_stats()
     exit(0)
\ No newline at end of file
@@ -0,0 +1,102 @@
+# IPP project 2
+# @brief Helpers of tests, programs are written in IPPcode23 and run by interpreter in subprocess
+# @author Jakub Kratochvil (xkrato67)
+# @file conftest.py
+
+import os, subprocess, sys
+import xml.etree.ElementTree as ET
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from interpret import load_source
+
+# Instructions with label as first argument
+LABEL_OPCODES = ("LABEL", "JUMP", "CALL", "JUMPIFEQ", "JUMPIFNEQ", "JUMPIFEQS", "JUMPIFNEQS")
+
+# Engines and options which have to give the same results
+VARIANTS = [
+    ["--engine", "class"],
+    ["--engine", "class", "-O"],
+    ["--engine", "closure"],
+    ["--engine", "closure", "-O"],
+    ["--engine", "transpile"],
+    ["--engine", "transpile", "-O"],
+    ["--jit", "2"],
+    ["--jit", "2", "-O"],
+]
+
+# Converts IPPcode23 to XML source
+# @param code Header and instructions, one per line, comments start with #
+# @return XML source
+def gen_xml(code):
+    root = ET.Element("program", language="IPPcode23")
+    order = 0
+    for line in code.splitlines():
+        parts = line.split("#", 1)[0].split()
+        if not parts or parts[0].startswith("."):
+            continue
+        order += 1
+        instr = ET.SubElement(root, "instruction", order=str(order), opcode=parts[0])
+        for index, arg in enumerate(parts[1:], 1):
+            if index == 1 and parts[0].upper() in LABEL_OPCODES:
+                type, value = "label", arg
+            elif index == 2 and parts[0].upper() == "READ":
+                type, value = "type", arg
+            elif arg.split("@", 1)[0] in ("GF", "LF", "TF"):
+                type, value = "var", arg
+            else:
+                type, value = arg.split("@", 1)
+            ET.SubElement(instr, "arg" + str(index), type=type).text = value
+    return ET.tostring(root, encoding="unicode")
+
+# Runs interpreter
+# @param tmp_path Directory for source and input files
+# @param source XML source
+# @param options Options of interpreter
+# @param input Input of program
+# @return Tuple of return code, output and error output
+def run_source(tmp_path, source, options=(), input=""):
+    source_path = tmp_path / "source.xml"
+    input_path = tmp_path / "input.txt"
+    source_path.write_text(source)
+    input_path.write_text(input)
+    result = subprocess.run([sys.executable, os.path.join(ROOT, "interpret.py"), "--source", str(source_path),
+                             "--input", str(input_path), *options], capture_output=True, text=True, timeout=10)
+    return (result.returncode, result.stdout, result.stderr)
+
+# Runs XML source by interpreter
+@pytest.fixture
+def interpret_source(tmp_path):
+    def run(source, options=(), input=""):
+        return run_source(tmp_path, source, options, input)
+    return run
+
+# Loads and links IPPcode23 program in this process
+# @return Program object
+@pytest.fixture
+def load(tmp_path):
+    def load_code(code):
+        source_path = tmp_path / "source.xml"
+        source_path.write_text(gen_xml(code))
+        return load_source(str(source_path))
+    return load_code
+
+# Runs IPPcode23 program by interpreter
+@pytest.fixture
+def interpret(tmp_path):
+    def run(code, options=(), input=""):
+        return run_source(tmp_path, gen_xml(code), options, input)
+    return run
+
+# Runs IPPcode23 program by all engines, checks they give the same results
+# @return Tuple of return code, output and error output
+@pytest.fixture
+def interpret_all(tmp_path):
+    def run(code, input=""):
+        results = {tuple(options): run_source(tmp_path, gen_xml(code), options, input) for options in VARIANTS}
+        assert len(set(results.values())) == 1, results
+        return results[tuple(VARIANTS[0])]
+    return run
@@ -0,0 +1,3 @@
+.IPPcode23
+PUSHS int@1
+ADDS
@@ -0,0 +1,14 @@
+.IPPcode23
+DEFVAR GF@t
+DEFVAR GF@a
+READ GF@a int
+CREATEFRAME
+DEFVAR TF@t
+MOVE TF@t bool@false
+PUSHFRAME
+LT GF@t GF@a int@2
+JUMPIFEQ yes LF@t bool@true
+WRITE string@no
+EXIT int@0
+LABEL yes
+WRITE string@yes
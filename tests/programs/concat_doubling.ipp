@@ -0,0 +1,12 @@
+.IPPcode23
+DEFVAR GF@s
+DEFVAR GF@n
+DEFVAR GF@l
+MOVE GF@s string@ab
+MOVE GF@n int@0
+LABEL top
+CONCAT GF@s GF@s GF@s
+ADD GF@n GF@n int@1
+JUMPIFNEQ top GF@n int@20
+STRLEN GF@l GF@s
+WRITE GF@l
@@ -0,0 +1,36 @@
+.IPPcode23
+DEFVAR GF@n
+DEFVAR GF@r
+MOVE GF@n int@15
+PUSHS GF@n
+CALL fib
+POPS GF@r
+WRITE GF@r
+WRITE string@\010
+EXIT int@3
+LABEL fib
+CREATEFRAME
+PUSHFRAME
+DEFVAR LF@n
+DEFVAR LF@a
+DEFVAR LF@b
+DEFVAR LF@c
+POPS LF@n
+LT LF@c LF@n int@2
+JUMPIFEQ base LF@c bool@true
+SUB LF@a LF@n int@1
+PUSHS LF@a
+CALL fib
+POPS LF@a
+SUB LF@b LF@n int@2
+PUSHS LF@b
+CALL fib
+POPS LF@b
+ADD LF@a LF@a LF@b
+PUSHS LF@a
+POPFRAME
+RETURN
+LABEL base
+PUSHS LF@n
+POPFRAME
+RETURN
@@ -0,0 +1,9 @@
+.IPPcode23
+DEFVAR GF@a
+MOVE GF@a int@5
+DEFVAR GF@b
+ADD GF@b GF@a int@3
+WRITE GF@b
+WRITE string@\010
+CONCAT GF@b string@ab string@cd
+WRITE GF@b
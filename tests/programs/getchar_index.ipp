@@ -0,0 +1,4 @@
+.IPPcode23
+DEFVAR GF@a
+MOVE GF@a string@ab
+GETCHAR GF@a GF@a int@5
@@ -0,0 +1,4 @@
+.IPPcode23
+PUSHS int@1
+PUSHS int@0
+IDIVS
@@ -0,0 +1,14 @@
+.IPPcode23
+DEFVAR GF@i
+MOVE GF@i int@0
+CREATEFRAME
+DEFVAR TF@i
+MOVE TF@i int@100
+PUSHFRAME
+LABEL top
+ADD GF@i GF@i int@1
+JUMPIFEQ out LF@i int@2
+JUMPIFNEQ top GF@i int@5
+WRITE string@no
+LABEL out
+WRITE GF@i
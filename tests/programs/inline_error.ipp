@@ -0,0 +1,9 @@
+.IPPcode23
+DEFVAR GF@x
+MOVE GF@x int@1
+CALL bad
+WRITE GF@x
+EXIT int@0
+LABEL bad
+ADD GF@x GF@x string@a
+RETURN
@@ -0,0 +1,18 @@
+.IPPcode23
+DEFVAR GF@x
+MOVE GF@x int@1
+CALL inc
+CALL inc
+WRITE GF@x
+JUMP skip
+LABEL back
+CALL inc
+WRITE GF@x
+EXIT int@0
+LABEL skip
+JUMP back
+LABEL inc
+ADD GF@x GF@x int@1
+PUSHS GF@x
+POPS GF@x
+RETURN
@@ -0,0 +1,30 @@
+.IPPcode23
+DEFVAR GF@i
+DEFVAR GF@x
+MOVE GF@i int@0
+MOVE GF@x int@0
+LABEL loop
+PUSHS GF@i
+CALL double
+POPS GF@x
+CALL incr
+JUMPIFNEQ loop GF@i int@5
+WRITE GF@x
+WRITE GF@i
+CALL nothing
+MOVE GF@x string@a
+CALL incx
+WRITE GF@x
+EXIT int@0
+LABEL double
+PUSHS int@2
+MULS
+RETURN
+LABEL incr
+ADD GF@i GF@i int@1
+RETURN
+LABEL nothing
+RETURN
+LABEL incx
+ADD GF@x GF@x int@1
+RETURN
@@ -0,0 +1,16 @@
+.IPPcode23
+# inlined body with RETURN reached by fallthrough after inline, and callee that POPFRAMEs
+DEFVAR GF@x
+CREATEFRAME
+DEFVAR TF@a
+MOVE TF@a int@4
+PUSHFRAME
+CALL leave
+WRITE TF@a
+CALL leave2
+EXIT int@0
+LABEL leave
+POPFRAME
+RETURN
+LABEL leave2
+RETURN
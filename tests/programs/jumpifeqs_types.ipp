@@ -0,0 +1,5 @@
+.IPPcode23
+PUSHS int@1
+PUSHS string@a
+JUMPIFEQS x
+LABEL x
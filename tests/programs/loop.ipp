@@ -0,0 +1,17 @@
+.IPPcode23
+DEFVAR GF@i
+DEFVAR GF@s
+MOVE GF@i int@0
+MOVE GF@s string@
+LABEL top
+CONCAT GF@s GF@s string@a
+ADD GF@i GF@i int@1
+JUMPIFNEQ top GF@i int@10
+WRITE GF@s
+WRITE GF@i
+STRLEN GF@i GF@s
+WRITE GF@i
+SETCHAR GF@s int@2 string@bcd
+WRITE GF@s
+GETCHAR GF@s GF@s int@3
+WRITE GF@s
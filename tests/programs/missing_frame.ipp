@@ -0,0 +1,2 @@
+.IPPcode23
+DEFVAR TF@a
@@ -0,0 +1,52 @@
+.IPPcode23
+DEFVAR GF@i
+DEFVAR GF@j
+DEFVAR GF@x
+DEFVAR GF@s
+MOVE GF@i int@0
+MOVE GF@x int@0
+MOVE GF@s string@
+LABEL outer
+MOVE GF@j int@0
+LABEL inner
+ADD GF@x GF@x GF@j
+JUMPIFEQ odd GF@j int@3
+CONCAT GF@s GF@s string@a
+LABEL odd
+ADD GF@j GF@j int@1
+
+JUMPIFNEQ inner GF@j int@5
+ADD GF@i GF@i int@1
+JUMPIFNEQ outer GF@i int@20
+WRITE GF@x
+WRITE GF@s
+STRLEN GF@x GF@s
+WRITE GF@x
+MOVE GF@i int@0
+LABEL poly
+JUMPIFEQ str GF@i int@10
+MOVE GF@x int@5
+JUMP cont
+LABEL str
+MOVE GF@x string@q
+LABEL cont
+WRITE GF@x
+ADD GF@i GF@i int@1
+JUMPIFNEQ poly GF@i int@15
+CREATEFRAME
+DEFVAR TF@k
+MOVE TF@k int@0
+PUSHFRAME
+LABEL lf
+ADD LF@k LF@k int@1
+PUSHS LF@k
+POPS GF@x
+JUMPIFNEQ lf LF@k int@50
+WRITE GF@x
+MOVE GF@i int@0
+LABEL bad
+ADD GF@i GF@i int@1
+JUMPIFNEQ skip GF@i int@30
+MOVE GF@i string@oops
+LABEL skip
+JUMP bad
@@ -0,0 +1,3 @@
+.IPPcode23
+DEFVAR GF@a
+POPS GF@a
@@ -0,0 +1,7 @@
+.IPPcode23
+# READ int with invalid input -> nil; analysis must not assume int
+DEFVAR GF@x
+DEFVAR GF@y
+READ GF@x int
+ADD GF@y GF@x int@1
+WRITE GF@y
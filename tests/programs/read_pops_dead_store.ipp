@@ -0,0 +1,10 @@
+.IPPcode23
+# dead store of READ / POPS
+DEFVAR GF@x
+DEFVAR GF@y
+PUSHS int@7
+PUSHS int@8
+POPS GF@x
+READ GF@y int
+POPS GF@y
+WRITE string@done
@@ -0,0 +1,14 @@
+.IPPcode23
+DEFVAR GF@n
+MOVE GF@n int@0
+CALL rec
+WRITE string@end
+EXIT int@0
+LABEL rec
+ADD GF@n GF@n int@1
+WRITE GF@n
+WRITE string@,
+JUMPIFEQ done GF@n int@8
+CALL rec
+LABEL done
+RETURN
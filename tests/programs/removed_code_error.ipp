@@ -0,0 +1,23 @@
+.IPPcode23
+# JUMP, EXIT, CALL and RETURN around code removed by -O, error is reported after it
+DEFVAR GF@x
+DEFVAR GF@unused
+MOVE GF@x int@1
+MOVE GF@unused int@5
+JUMP over
+WRITE string@unreachable
+MOVE GF@x int@2
+LABEL over
+CALL add
+WRITE GF@x
+CALL fail
+EXIT int@0
+WRITE string@after\032exit
+LABEL add
+ADD GF@x GF@x int@10
+RETURN
+WRITE string@after\032return
+LABEL fail
+WRITE string@\032fail
+IDIV GF@x GF@x int@0
+RETURN
@@ -0,0 +1,11 @@
+.IPPcode23
+# aliasing of string buffer through PUSHS
+DEFVAR GF@t
+DEFVAR GF@s
+MOVE GF@s string@abc
+SETCHAR GF@s int@0 string@x
+PUSHS GF@s
+SETCHAR GF@s int@1 string@y
+POPS GF@t
+WRITE GF@t
+WRITE GF@s
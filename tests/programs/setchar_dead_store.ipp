@@ -0,0 +1,6 @@
+.IPPcode23
+# dead store only read by SETCHAR
+DEFVAR GF@s
+MOVE GF@s string@abc
+SETCHAR GF@s int@0 string@x
+WRITE string@ok
@@ -0,0 +1,9 @@
+.IPPcode23
+# character of SETCHAR is empty string buffer made by CONCAT
+DEFVAR GF@c
+DEFVAR GF@s
+MOVE GF@c string@
+CONCAT GF@c GF@c string@
+MOVE GF@s string@hello
+SETCHAR GF@s int@1 GF@c
+WRITE GF@s
@@ -0,0 +1,11 @@
+.IPPcode23
+# the same with character in local frame, transpiled code reads it from the frame
+CREATEFRAME
+PUSHFRAME
+DEFVAR LF@c
+DEFVAR GF@s
+MOVE LF@c string@
+CONCAT LF@c LF@c string@
+MOVE GF@s string@hello
+SETCHAR GF@s int@1 LF@c
+WRITE GF@s
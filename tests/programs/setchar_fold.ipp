@@ -0,0 +1,11 @@
+.IPPcode23
+# SETCHAR dest is read: fold must not replace arg1
+DEFVAR GF@n
+DEFVAR GF@s
+MOVE GF@s string@abc
+SETCHAR GF@s int@1 string@Z
+WRITE GF@s
+CONCAT GF@s GF@s string@!
+WRITE GF@s
+STRLEN GF@n GF@s
+WRITE GF@n
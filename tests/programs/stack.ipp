@@ -0,0 +1,55 @@
+.IPPcode23
+DEFVAR GF@r
+DEFVAR GF@i
+PUSHS int@7
+PUSHS int@3
+SUBS
+PUSHS int@5
+MULS
+PUSHS int@-3
+IDIVS
+POPS GF@r
+WRITE GF@r
+PUSHS int@1
+PUSHS int@2
+LTS
+PUSHS string@a
+PUSHS string@b
+GTS
+ORS
+NOTS
+PUSHS nil@nil
+PUSHS int@1
+EQS
+ANDS
+POPS GF@r
+WRITE GF@r
+PUSHS string@hello
+PUSHS int@1
+STRI2INTS
+INT2CHARS
+POPS GF@r
+WRITE GF@r
+PUSHS int@1
+PUSHS int@2
+CLEARS
+PUSHS int@5
+PUSHS int@5
+JUMPIFEQS eq
+WRITE string@no
+LABEL eq
+MOVE GF@i int@0
+PUSHS int@0
+LABEL loop
+PUSHS int@1
+ADDS
+POPS GF@i
+PUSHS GF@i
+PUSHS GF@i
+PUSHS int@40
+JUMPIFNEQS loop
+POPS GF@i
+WRITE GF@i
+PUSHS string@x
+PUSHS int@1
+ADDS
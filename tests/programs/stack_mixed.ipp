@@ -0,0 +1,42 @@
+.IPPcode23
+DEFVAR GF@r
+PUSHS int@5
+PUSHS int@3
+SUBS
+POPS GF@r
+WRITE GF@r
+PUSHS int@7
+PUSHS int@-2
+IDIVS
+POPS GF@r
+WRITE GF@r
+PUSHS string@a
+PUSHS string@b
+LTS
+POPS GF@r
+WRITE GF@r
+PUSHS nil@nil
+PUSHS int@1
+EQS
+POPS GF@r
+WRITE GF@r
+PUSHS bool@true
+NOTS
+POPS GF@r
+WRITE GF@r
+PUSHS string@hello
+PUSHS int@1
+STRI2INTS
+INT2CHARS
+POPS GF@r
+WRITE GF@r
+PUSHS nil@nil
+PUSHS nil@nil
+JUMPIFEQS l1
+WRITE string@BAD
+LABEL l1
+PUSHS int@1
+PUSHS string@x
+JUMPIFNEQS l2
+LABEL l2
+WRITE string@after
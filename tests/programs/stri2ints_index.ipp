@@ -0,0 +1,4 @@
+.IPPcode23
+PUSHS string@abc
+PUSHS int@-1
+STRI2INTS
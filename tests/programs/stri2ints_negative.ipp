@@ -0,0 +1,5 @@
+.IPPcode23
+PUSHS string@ab
+PUSHS int@-1
+STRI2INTS
+LABEL l
@@ -0,0 +1,22 @@
+.IPPcode23
+DEFVAR GF@a
+DEFVAR GF@b
+MOVE GF@a int@1
+PUSHS GF@a
+ADD GF@a GF@a int@10
+POPS GF@b
+WRITE GF@b
+WRITE string@,
+MOVE GF@a string@ab
+PUSHS GF@a
+CONCAT GF@a GF@a string@cd
+SETCHAR GF@a int@0 string@X
+PUSHS GF@a
+POPS GF@b
+WRITE GF@b
+POPS GF@b
+WRITE GF@b
+PUSHS GF@a
+MOVE GF@a int@5
+POPS GF@b
+WRITE GF@b
@@ -0,0 +1,44 @@
+.IPPcode23
+DEFVAR GF@s
+DEFVAR GF@t
+DEFVAR GF@b
+DEFVAR GF@n
+MOVE GF@s string@abc
+SETCHAR GF@s int@0 string@x
+EQ GF@b GF@s string@xbc
+WRITE GF@b
+LT GF@b GF@s string@y
+WRITE GF@b
+JUMPIFEQ ok GF@s string@xbc
+WRITE string@BAD1
+LABEL ok
+MOVE GF@t GF@s
+SETCHAR GF@s int@1 string@Q
+WRITE GF@t
+WRITE GF@s
+CONCAT GF@s GF@s string@!
+CONCAT GF@t GF@s GF@s
+WRITE GF@t
+PUSHS GF@s
+SETCHAR GF@s int@2 string@Z
+POPS GF@t
+WRITE GF@t
+TYPE GF@t GF@s
+WRITE GF@t
+STRLEN GF@n GF@s
+WRITE GF@n
+GETCHAR GF@t GF@s int@2
+WRITE GF@t
+STRI2INT GF@n GF@s int@0
+WRITE GF@n
+PUSHS GF@s
+PUSHS string@xQZ!
+EQS
+POPS GF@b
+WRITE GF@b
+PUSHS GF@s
+PUSHS string@xQZ!
+JUMPIFEQS ok2
+WRITE string@BAD2
+LABEL ok2
+DPRINT GF@s
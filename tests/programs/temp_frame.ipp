@@ -0,0 +1,14 @@
+.IPPcode23
+CREATEFRAME
+DEFVAR TF@x
+MOVE TF@x string@tf
+PUSHFRAME
+WRITE LF@x
+CREATEFRAME
+DEFVAR TF@y
+MOVE TF@y LF@x
+CONCAT TF@y TF@y string@!
+WRITE TF@y
+POPFRAME
+WRITE TF@x
+POPFRAME
@@ -0,0 +1,39 @@
+.IPPcode23
+DEFVAR GF@a
+DEFVAR GF@b
+DEFVAR GF@t
+TYPE GF@t GF@a
+WRITE GF@t
+MOVE GF@a nil@nil
+TYPE GF@t GF@a
+WRITE GF@t
+EQ GF@b GF@a nil@nil
+WRITE GF@b
+MOVE GF@a int@65
+INT2CHAR GF@b GF@a
+WRITE GF@b
+STRI2INT GF@a string@hello int@1
+WRITE GF@a
+NOT GF@b bool@false
+AND GF@b GF@b bool@true
+OR GF@b GF@b bool@false
+WRITE GF@b
+GT GF@b string@b string@a
+WRITE GF@b
+MUL GF@a int@-3 int@7
+IDIV GF@a GF@a int@2
+WRITE GF@a
+READ GF@a int
+WRITE GF@a
+READ GF@a string
+WRITE GF@a
+READ GF@a bool
+WRITE GF@a
+READ GF@a int
+TYPE GF@t GF@a
+WRITE GF@t
+DPRINT GF@a
+JUMPIFEQ end GF@a nil@nil
+WRITE string@no
+LABEL end
+EXIT int@7
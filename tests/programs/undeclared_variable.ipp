@@ -0,0 +1,2 @@
+.IPPcode23
+WRITE GF@x
@@ -0,0 +1,4 @@
+.IPPcode23
+DEFVAR GF@a
+WRITE string@x
+ADD GF@a GF@a int@1
@@ -0,0 +1,4 @@
+.IPPcode23
+DEFVAR GF@a
+MOVE GF@a int@5
+IDIV GF@a GF@a int@0
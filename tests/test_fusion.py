@@ -0,0 +1,44 @@
+# IPP project 2
+# @brief Tests of superinstructions created by -O with closure engine
+# @author Jakub Kratochvil (xkrato67)
+# @file test_fusion.py
+
+# Compare-and-branch with the same variable name in different frames
+COMPARE_BRANCH = """
+.IPPcode23
+DEFVAR GF@t
+DEFVAR GF@one
+READ GF@t bool
+READ GF@one int
+CREATEFRAME
+PUSHFRAME
+DEFVAR LF@t
+LT LF@t GF@one int@2
+JUMPIFEQ skip GF@t bool@true
+WRITE string@not\\032taken
+LABEL skip
+WRITE LF@t
+"""
+
+# Increment-and-test with the same variable name in different frames
+INCREMENT_BRANCH = """
+.IPPcode23
+DEFVAR GF@i
+MOVE GF@i int@0
+CREATEFRAME
+PUSHFRAME
+DEFVAR LF@i
+MOVE LF@i int@5
+LABEL loop
+ADD LF@i LF@i int@1
+JUMPIFNEQ loop GF@i int@0
+WRITE LF@i
+WRITE string@\\032
+WRITE GF@i
+"""
+
+def test_compare_branch_frames(interpret_all):
+    assert interpret_all(COMPARE_BRANCH, input="false\n1\n") == (0, "not takentrue", "")
+
+def test_increment_branch_frames(interpret_all):
+    assert interpret_all(INCREMENT_BRANCH) == (0, "6 0", "")
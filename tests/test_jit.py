@@ -0,0 +1,48 @@
+# IPP project 2
+# @brief Tests of tracing JIT
+# @author Jakub Kratochvil (xkrato67)
+# @file test_jit.py
+
+# Loop which always takes the same path
+LOOP = """
+.IPPcode23
+DEFVAR GF@i
+MOVE GF@i int@0
+LABEL loop
+ADD GF@i GF@i int@1
+JUMPIFNEQ loop GF@i int@100
+WRITE GF@i
+"""
+
+# Loop whose branch goes the other way in its second half, trace is left there in each of 50 iterations
+LOOP_BRANCH = """
+.IPPcode23
+DEFVAR GF@i
+DEFVAR GF@big
+MOVE GF@i int@0
+LABEL loop
+ADD GF@i GF@i int@1
+GT GF@big GF@i int@50
+JUMPIFEQ next GF@big bool@true
+LABEL next
+JUMPIFNEQ loop GF@i int@100
+WRITE GF@i
+"""
+
+# Parses statistics printed by --stats
+# @param error Error output of interpreter
+# @return Dictionary of statistics
+def parse_stats(error):
+    return dict(line.rsplit(": ", 1) for line in error.splitlines())
+
+def test_loop_exit_is_not_side_exit(interpret):
+    code, output, error = interpret(LOOP, ["--jit", "2", "--stats"])
+    assert (code, output) == (0, "100")
+    stats = parse_stats(error)
+    assert stats["traces compiled"] == "1"
+    assert "trace side exits" not in stats
+
+def test_failed_branch_guard_is_side_exit(interpret):
+    code, output, error = interpret(LOOP_BRANCH, ["--jit", "2", "--stats"])
+    assert (code, output) == (0, "100")
+    assert parse_stats(error)["trace side exits"] == "50"
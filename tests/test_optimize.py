@@ -0,0 +1,28 @@
+# IPP project 2
+# @brief Tests of -O optimizations
+# @author Jakub Kratochvil (xkrato67)
+# @file test_optimize.py
+
+import interpret
+
+# Loop after unreachable code, BREAK keeps every store
+LOOP_AFTER_DEAD_CODE = """
+.IPPcode23
+DEFVAR GF@i
+MOVE GF@i int@0
+JUMP loop
+WRITE string@dead
+LABEL loop
+ADD GF@i GF@i int@1
+JUMPIFNEQ loop GF@i int@3
+WRITE GF@i
+BREAK
+"""
+
+def test_labels_relocated(load):
+    for fuse in (False, True):
+        program = load(LOOP_AFTER_DEAD_CODE)
+        interpret.optimize_program(program, fuse)
+        labels = program.get_labels()
+        assert labels["loop"] < 5
+        assert program.instructions[labels["loop"]].get_order() == 6
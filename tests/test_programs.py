@@ -0,0 +1,27 @@
+# IPP project 2
+# @brief Regression set, every program has to give the same results with all engines, with and without -O
+# @author Jakub Kratochvil (xkrato67)
+# @file test_programs.py
+# @note Program NAME.ipp reads NAME.in (if it exists), its expected output is NAME.out
+#       and expected return code is NAME.rc
+
+import os
+
+import pytest
+
+PROGRAMS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "programs")
+
+# Reads file of regression set
+# @param name Name of file
+# @return Content of file, empty string if file doesn't exist
+def read_file(name):
+    path = os.path.join(PROGRAMS, name)
+    if not os.path.isfile(path):
+        return ""
+    with open(path) as program_file:
+        return program_file.read()
+
+@pytest.mark.parametrize("name", sorted(name[:-4] for name in os.listdir(PROGRAMS) if name.endswith(".ipp")))
+def test_program(interpret_all, name):
+    code, output, _ = interpret_all(read_file(name + ".ipp"), read_file(name + ".in"))
+    assert (code, output) == (int(read_file(name + ".rc")), read_file(name + ".out"))
@@ -0,0 +1,114 @@
+# IPP project 2
+# @brief Random programs have to give the same results with all engines, with and without -O
+# @author Jakub Kratochvil (xkrato67)
+# @file test_random.py
+# @note Number of programs is set by environment variable RANDOM_PROGRAMS
+
+import os, random
+
+import pytest
+
+# Types of destination and operands of instructions in random programs, "any" is a variable of any type,
+# "same" has the type of the previous operand, control flow is generated separately, so programs always end
+TYPES = {
+    "MOVE":      ("any", "same"),
+    "ADD":       ("int", "int", "int"),
+    "SUB":       ("int", "int", "int"),
+    "MUL":       ("int", "int", "int"),
+    "IDIV":      ("int", "int", "int"),
+    "LT":        ("bool", "any", "same"),
+    "GT":        ("bool", "any", "same"),
+    "EQ":        ("bool", "any", "same"),
+    "AND":       ("bool", "bool", "bool"),
+    "OR":        ("bool", "bool", "bool"),
+    "NOT":       ("bool", "bool"),
+    "CONCAT":    ("string", "string", "string"),
+    "STRLEN":    ("int", "string"),
+    "GETCHAR":   ("string", "string", "int"),
+    "SETCHAR":   ("string", "int", "string"),
+    "TYPE":      ("string", "any"),
+    "INT2CHAR":  ("string", "int"),
+    "STRI2INT":  ("int", "string", "int"),
+    "WRITE":     ("any",),
+    "PUSHS":     ("any",),
+    "JUMPIFEQ":  ("label", "any", "same"),
+    "JUMPIFNEQ": ("label", "any", "same"),
+    "ADDS":      (),
+    "LTS":       (),
+    "NOTS":      (),
+    "JUMPIFEQS": ("label",),
+}
+
+# Operands pushed before stack instructions and the variable their result is popped to
+STACK_OPERANDS = {"ADDS": (("int", "int"), "int"), "LTS": (("int", "int"), "bool"), "NOTS": (("bool",), "bool"),
+                  "JUMPIFEQS": (("string", "string"), None)}
+
+VARIABLES = {"int": ["GF@i1", "GF@i2"], "string": ["GF@s1", "GF@s2"], "bool": ["GF@b1"]}
+LITERALS = {"int": ["int@0", "int@1", "int@2", "int@-1", "int@98"],
+            "string": ["string@ab", "string@x\\032y", "string@\\092", "string@"],
+            "bool": ["bool@true", "bool@false"], "nil": ["nil@nil"]}
+
+COUNT = int(os.environ.get("RANDOM_PROGRAMS", "20"))
+
+# Generates random operand, a few operands are of wrong type, so errors are tested too
+# @param rand Random generator
+# @param type Type of operand
+# @param variables Variables by their type
+# @param var Operand has to be variable
+# @return Operand in IPPcode23
+def gen_operand(rand, type, variables, var=False):
+    if rand.random() < 0.03:
+        type = rand.choice(list(LITERALS))
+    if var or rand.random() < 0.5:
+        return rand.choice(variables.get(type, variables["int"]))
+    return rand.choice(LITERALS[type])
+
+# Generates random instruction, stack instructions come with their operands
+# @param rand Random generator
+# @param variables Variables by their type
+# @param labels Labels of forward jumps
+# @return Instructions in IPPcode23
+def gen_instr(rand, variables, labels):
+    opcode = rand.choice(list(TYPES))
+    pushed, result = STACK_OPERANDS.get(opcode, ((), None))
+    lines = ["PUSHS " + gen_operand(rand, type, variables) for type in pushed]
+    args = []
+    type = None
+    for index, kind in enumerate(TYPES[opcode]):
+        if kind == "label":
+            args.append(rand.choice(labels))
+            continue
+        type = rand.choice(["int", "string", "bool"]) if kind == "any" else type if kind == "same" else kind
+        args.append(gen_operand(rand, type, variables, index == 0 and opcode not in ("WRITE", "PUSHS")))
+    lines.append(" ".join([opcode] + args))
+    if result is not None:
+        lines.append("POPS " + rand.choice(variables[result]))
+    return lines
+
+# Generates random program, loop with a few calls of subroutine with its own frame
+# @param seed Seed of random generator
+# @return Program in IPPcode23
+def gen_program(seed):
+    rand = random.Random(seed)
+    lines = [".IPPcode23", "DEFVAR GF@n", "MOVE GF@n int@0"]
+    for type, vars in VARIABLES.items():
+        for var in vars:
+            lines += ["DEFVAR " + var, f"MOVE {var} {rand.choice(LITERALS[type])}"]
+    lines.append("LABEL loop")
+    for _ in range(rand.randint(3, 15)):
+        if rand.random() < 0.1:
+            lines.append("CALL sub")
+        else:
+            lines += gen_instr(rand, VARIABLES, ["next", "end"])
+    lines += ["LABEL next", "ADD GF@n GF@n int@1", f"JUMPIFNEQ loop GF@n int@{rand.randint(1, 20)}", "LABEL end"]
+    lines += ["WRITE " + var for vars in VARIABLES.values() for var in vars]
+    lines += ["EXIT int@0", "LABEL sub", "CREATEFRAME", "DEFVAR TF@x", "MOVE TF@x int@1", "PUSHFRAME"]
+    local = dict(VARIABLES, int=VARIABLES["int"] + ["LF@x"])
+    for _ in range(rand.randint(1, 5)):
+        lines += gen_instr(rand, local, ["return"])
+    lines += ["LABEL return", "POPFRAME", "RETURN"]
+    return "\n".join(lines)
+
+@pytest.mark.parametrize("seed", range(COUNT))
+def test_random_program(interpret_all, seed):
+    interpret_all(gen_program(seed))
@@ -0,0 +1,57 @@
+# IPP project 2
+# @brief Tests of data stack
+# @author Jakub Kratochvil (xkrato67)
+# @file test_stack.py
+
+# Variable changed after it's pushed, data stack keeps the value it had when pushed
+PUSHS_MOVE_POPS = """
+.IPPcode23
+DEFVAR GF@x
+DEFVAR GF@y
+MOVE GF@x int@1
+PUSHS GF@x
+MOVE GF@x int@9
+POPS GF@y
+WRITE GF@y
+WRITE GF@x
+"""
+
+# The same with string changed in place by SETCHAR and CONCAT
+PUSHS_SETCHAR_POPS = """
+.IPPcode23
+DEFVAR GF@s
+DEFVAR GF@t
+MOVE GF@s string@ab
+CONCAT GF@s GF@s string@c
+PUSHS GF@s
+SETCHAR GF@s int@0 string@X
+CONCAT GF@s GF@s string@d
+POPS GF@t
+WRITE GF@t
+WRITE GF@s
+"""
+
+# Frame of pushed variable is dropped and reused by the next CREATEFRAME
+PUSHS_CREATEFRAME_POPS = """
+.IPPcode23
+DEFVAR GF@y
+CREATEFRAME
+DEFVAR TF@x
+MOVE TF@x int@7
+PUSHS TF@x
+CREATEFRAME
+DEFVAR TF@x
+MOVE TF@x int@8
+POPS GF@y
+WRITE GF@y
+WRITE TF@x
+"""
+
+def test_pushs_copies_value(interpret_all):
+    assert interpret_all(PUSHS_MOVE_POPS) == (0, "19", "")
+
+def test_pushs_copies_string(interpret_all):
+    assert interpret_all(PUSHS_SETCHAR_POPS) == (0, "abcXbcd", "")
+
+def test_pushs_copies_value_of_dropped_frame(interpret_all):
+    assert interpret_all(PUSHS_CREATEFRAME_POPS) == (0, "78", "")
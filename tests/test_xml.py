@@ -0,0 +1,43 @@
+# IPP project 2
+# @brief Tests of errors in XML source
+# @author Jakub Kratochvil (xkrato67)
+# @file test_xml.py
+
+HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+
+# Invalid opcode in the first instruction, the source isn't well-formed only later
+STRUCTURE_THEN_FORMAT = HEADER + """<program language="IPPcode23">
+<instruction order="1" opcode="NOSUCH"/>
+<instruction order="2" opcode="WRITE"><arg1 type="int">1</arg1></instruction>
+<instruction order="3" opcode="WRITE"><arg1 type="int">2</arg2></instruction>
+</program>
+"""
+
+# Invalid root element, the source isn't well-formed only later
+ROOT_THEN_FORMAT = HEADER + """<programme language="IPPcode23">
+<instruction order="1" opcode="WRITE"><arg1 type="int">1</arg1></instruction>
+<instruction order="2" opcode="WRITE">
+</programme>
+"""
+
+# Well-formed source with invalid opcode after valid instruction
+STRUCTURE_ONLY = HEADER + """<program language="IPPcode23">
+<instruction order="1" opcode="WRITE"><arg1 type="int">1</arg1></instruction>
+<instruction order="2" opcode="NOSUCH"/>
+<instruction order="3" opcode="WRITE"><arg1 type="bool">yes</arg1></instruction>
+</program>
+"""
+
+def test_format_error_after_structure_error(interpret_source):
+    code, output, error = interpret_source(STRUCTURE_THEN_FORMAT)
+    assert (code, output) == (31, "")
+    assert "Invalid XML format" in error
+
+def test_format_error_after_root_error(interpret_source):
+    code, output, error = interpret_source(ROOT_THEN_FORMAT)
+    assert (code, output) == (31, "")
+
+def test_first_structure_error_is_reported(interpret_source):
+    code, output, error = interpret_source(STRUCTURE_ONLY)
+    assert (code, output) == (32, "")
+    assert error == "ERROR: Invalid opcode\n"